@@ -6,7 +6,7 @@ import os
 import sys
 from app.core.db_setup import Base
 from app.core.settings import settings
-from app.entities import project_entities, sitemap_entities, user_entities
+from app.entities import project_entities, sitemap_entities, user_entities, section_cache_entities, website_entities
 
 
 # this is the Alembic Config object, which provides
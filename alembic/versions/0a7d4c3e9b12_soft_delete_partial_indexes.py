@@ -0,0 +1,36 @@
+"""Exclude soft-deleted projects from the listing index and index tombstones
+
+Revision ID: 0a7d4c3e9b12
+Revises: f1c6a9d2b847
+Create Date: 2025-04-21 14:48:17.093162
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7d4c3e9b12'
+down_revision: Union[str, None] = 'f1c6a9d2b847'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_projects_created_by_created_at_id', table_name='projects')
+    op.create_index('ix_projects_created_by_created_at_id', 'projects',
+                    ['created_by', sa.text('created_at DESC'), sa.text('id DESC')], unique=False,
+                    postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_projects_deleted_at_tombstones', 'projects', ['deleted_at'], unique=False,
+                    postgresql_where=sa.text('deleted_at IS NOT NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_deleted_at_tombstones', table_name='projects')
+    op.drop_index('ix_projects_created_by_created_at_id', table_name='projects')
+    op.create_index('ix_projects_created_by_created_at_id', 'projects',
+                    ['created_by', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
@@ -0,0 +1,98 @@
+"""Store sitemap versions as JSON-Patch deltas with periodic snapshots
+
+Revision ID: 3e8a1c5f9d27
+Revises: b5d83f0e6a21
+Create Date: 2025-04-14 10:05:31.442907
+
+"""
+import copy
+from typing import Any, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8a1c5f9d27'
+down_revision: Union[str, None] = 'b5d83f0e6a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _apply_patch(document: Any, patch: list) -> Any:
+    """
+    Replays a stored JSON Patch. Kept inside the migration so it never depends on app code;
+    the app only ever wrote add / remove / replace operations.
+    """
+    document = copy.deepcopy(document)
+    for operation in patch:
+        tokens = [token.replace("~1", "/").replace("~0", "~") for token in operation["path"].split("/")[1:]]
+        if not tokens:
+            document = copy.deepcopy(operation.get("value"))
+            continue
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if operation["op"] in ("remove", "replace"):
+            if isinstance(parent, list):
+                parent.pop(int(last))
+            else:
+                parent.pop(last)
+        if operation["op"] in ("add", "replace"):
+            value = copy.deepcopy(operation["value"])
+            if isinstance(parent, list):
+                parent.insert(len(parent) if last == "-" else int(last), value)
+            else:
+                parent[last] = value
+        elif operation["op"] != "remove":
+            raise ValueError(f"Unsupported patch operation {operation['op']!r} in stored sitemap delta")
+    return document
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sitemap', sa.Column('version_number', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('sitemap', sa.Column('storage_kind', sa.String(length=16), server_default='snapshot', nullable=False))
+    op.add_column('sitemap', sa.Column('sitemap_patch', sa.JSON(), nullable=True))
+    # Existing rows are full copies: keep them as snapshots, numbered in creation order per project
+    op.execute("""
+        UPDATE sitemap
+        SET version_number = numbered.version_number
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY project_id ORDER BY created_at, id) AS version_number
+            FROM sitemap
+        ) AS numbered
+        WHERE sitemap.id = numbered.id
+    """)
+    op.create_index('ux_sitemap_project_id_version_number', 'sitemap', ['project_id', 'version_number'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rebuild the full copy of every dematerialized delta version before dropping the patches
+    bind = op.get_bind()
+    sitemap = sa.table('sitemap',
+                       sa.column('id', sa.Integer), sa.column('project_id', sa.Integer),
+                       sa.column('version_number', sa.Integer), sa.column('storage_kind', sa.String),
+                       sa.column('sitemap_data', sa.JSON), sa.column('sitemap_patch', sa.JSON))
+    project_ids = bind.execute(
+        sa.select(sa.distinct(sitemap.c.project_id)).where(sitemap.c.storage_kind == 'delta')
+    ).scalars().all()
+    for project_id in project_ids:
+        rows = bind.execute(
+            sa.select(sitemap.c.id, sitemap.c.storage_kind, sitemap.c.sitemap_data, sitemap.c.sitemap_patch)
+            .where(sitemap.c.project_id == project_id)
+            .order_by(sitemap.c.version_number)
+        ).all()
+        document = None
+        for row in rows:
+            if row.storage_kind == 'delta':
+                document = _apply_patch(document, row.sitemap_patch or [])
+                bind.execute(sa.update(sitemap).where(sitemap.c.id == row.id).values(sitemap_data=document))
+            else:
+                document = row.sitemap_data
+    op.drop_index('ux_sitemap_project_id_version_number', table_name='sitemap')
+    op.drop_column('sitemap', 'sitemap_patch')
+    op.drop_column('sitemap', 'storage_kind')
+    op.drop_column('sitemap', 'version_number')
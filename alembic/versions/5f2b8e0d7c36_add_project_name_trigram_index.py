@@ -0,0 +1,34 @@
+"""Add pg_trgm GIN index for project name search
+
+Revision ID: 5f2b8e0d7c36
+Revises: 0a7d4c3e9b12
+Create Date: 2025-04-22 16:09:34.551806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2b8e0d7c36'
+down_revision: Union[str, None] = '0a7d4c3e9b12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # btree_gin lets the integer created_by share the GIN index with the trigrams
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.create_index('ix_projects_created_by_project_name_trgm', 'projects', ['created_by', 'project_name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'project_name': 'gin_trgm_ops'},
+                    postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The extensions are left installed; other objects may depend on them
+    op.drop_index('ix_projects_created_by_project_name_trgm', table_name='projects')
@@ -0,0 +1,36 @@
+"""Add section_html_cache table
+
+Revision ID: 7c1e9a52b3f4
+Revises: d64ca6737642
+Create Date: 2025-04-10 11:20:14.302918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e9a52b3f4'
+down_revision: Union[str, None] = 'd64ca6737642'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('section_html_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('model_name', sa.String(), nullable=False),
+    sa.Column('html_code', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index(op.f('ix_section_html_cache_created_at'), 'section_html_cache', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_section_html_cache_created_at'), table_name='section_html_cache')
+    op.drop_table('section_html_cache')
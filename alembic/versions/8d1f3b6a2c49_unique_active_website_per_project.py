@@ -0,0 +1,40 @@
+"""Enforce a single active website per project with a partial unique index
+
+Revision ID: 8d1f3b6a2c49
+Revises: 5f2b8e0d7c36
+Create Date: 2025-04-23 09:41:17.206385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1f3b6a2c49'
+down_revision: Union[str, None] = '5f2b8e0d7c36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep only the newest active website of each project before enforcing it
+    op.execute("""
+        UPDATE website SET is_active = false
+        WHERE is_active
+          AND id NOT IN (
+              SELECT DISTINCT ON (project_id) id
+              FROM website
+              WHERE is_active
+              ORDER BY project_id, id DESC
+          )
+    """)
+    op.create_index('ux_website_project_id_active', 'website', ['project_id'], unique=True,
+                    postgresql_where=sa.text('is_active'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_website_project_id_active', table_name='website')
@@ -0,0 +1,28 @@
+"""Add (project_id, created_at, id) index for sitemap version history
+
+Revision ID: 9b2f6d4e1a83
+Revises: 3e8a1c5f9d27
+Create Date: 2025-04-15 09:12:48.205716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2f6d4e1a83'
+down_revision: Union[str, None] = '3e8a1c5f9d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_sitemap_project_id_created_at_id', 'sitemap', ['project_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sitemap_project_id_created_at_id', table_name='sitemap')
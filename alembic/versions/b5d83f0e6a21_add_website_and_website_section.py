@@ -0,0 +1,61 @@
+"""Add website and website_section tables for versioned generated sites
+
+Revision ID: b5d83f0e6a21
+Revises: 7c1e9a52b3f4
+Create Date: 2025-04-11 16:42:07.118523
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d83f0e6a21'
+down_revision: Union[str, None] = '7c1e9a52b3f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('website',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('sitemap_id', sa.Integer(), nullable=False),
+    sa.Column('sitemap_structure', sa.JSON(), nullable=False),
+    sa.Column('business_name', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['sitemap_id'], ['sitemap.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_website_id'), 'website', ['id'], unique=False)
+    op.create_index(op.f('ix_website_sitemap_id'), 'website', ['sitemap_id'], unique=False)
+    op.create_index('ix_website_project_id_is_active', 'website', ['project_id', 'is_active'], unique=False)
+    op.create_table('website_section',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('website_id', sa.Integer(), nullable=False),
+    sa.Column('page_id', sa.String(), nullable=False),
+    sa.Column('section_id', sa.String(), nullable=False),
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('html_code', sa.Text(), nullable=False),
+    sa.Column('has_error', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['website_id'], ['website.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_website_section_website_id'), 'website_section', ['website_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_website_section_website_id'), table_name='website_section')
+    op.drop_table('website_section')
+    op.drop_index('ix_website_project_id_is_active', table_name='website')
+    op.drop_index(op.f('ix_website_sitemap_id'), table_name='website')
+    op.drop_index(op.f('ix_website_id'), table_name='website')
+    op.drop_table('website')
@@ -0,0 +1,43 @@
+"""Convert sitemap.sitemap_data to JSONB with a GIN index on active versions
+
+Revision ID: c4a7e2b9f615
+Revises: 9b2f6d4e1a83
+Create Date: 2025-04-16 11:37:02.864150
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e2b9f615'
+down_revision: Union[str, None] = '9b2f6d4e1a83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('sitemap', 'sitemap_data',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=True,
+               postgresql_using='sitemap_data::jsonb')
+    op.create_index('ix_sitemap_sitemap_data_active_gin', 'sitemap', ['sitemap_data'], unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={'sitemap_data': 'jsonb_path_ops'},
+                    postgresql_where=sa.text('is_active'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sitemap_sitemap_data_active_gin', table_name='sitemap',
+                  postgresql_using='gin', postgresql_where=sa.text('is_active'))
+    op.alter_column('sitemap', 'sitemap_data',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=sa.JSON(),
+               existing_nullable=True,
+               postgresql_using='sitemap_data::json')
@@ -0,0 +1,40 @@
+"""Enforce a single active sitemap per project with a partial unique index
+
+Revision ID: e8d3b7a1c054
+Revises: c4a7e2b9f615
+Create Date: 2025-04-18 11:26:03.418529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8d3b7a1c054'
+down_revision: Union[str, None] = 'c4a7e2b9f615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep only the newest active version of each project active before enforcing it
+    op.execute("""
+        UPDATE sitemap SET is_active = false
+        WHERE is_active
+          AND id NOT IN (
+              SELECT DISTINCT ON (project_id) id
+              FROM sitemap
+              WHERE is_active
+              ORDER BY project_id, version_number DESC, id DESC
+          )
+    """)
+    op.create_index('ux_sitemap_project_id_active', 'sitemap', ['project_id'], unique=True,
+                    postgresql_where=sa.text('is_active'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_sitemap_project_id_active', table_name='sitemap')
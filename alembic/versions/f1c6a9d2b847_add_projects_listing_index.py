@@ -0,0 +1,29 @@
+"""Add (created_by, created_at DESC, id DESC) index for the project list
+
+Revision ID: f1c6a9d2b847
+Revises: e8d3b7a1c054
+Create Date: 2025-04-19 10:04:51.772310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6a9d2b847'
+down_revision: Union[str, None] = 'e8d3b7a1c054'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_projects_created_by_created_at_id', 'projects',
+                    ['created_by', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_created_by_created_at_id', table_name='projects')
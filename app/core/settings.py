@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -32,6 +33,77 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY")
 
+    # LLM Concurrency: in-flight calls per provider, adapted between these bounds
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_MIN_CONCURRENCY: int = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+
+    # LLM Routing: comma-separated provider:model targets, in preference order
+    LLM_SECTION_TARGETS: str = os.getenv("LLM_SECTION_TARGETS", "gemini:gemini-2.0-flash,openai:gpt-4o-mini")
+    LLM_SITEMAP_TARGETS: str = os.getenv("LLM_SITEMAP_TARGETS", "openai:o3-mini-2025-01-31,gemini:gemini-2.0-flash")
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "3"))
+    LLM_CIRCUIT_COOLDOWN_SECONDS: float = float(os.getenv("LLM_CIRCUIT_COOLDOWN_SECONDS", "30"))
+
+    # Fake LLM provider (targets like "fake:fake-model"), for offline runs and benchmarks
+    FAKE_LLM_SEED: int = int(os.getenv("FAKE_LLM_SEED", "0"))
+    FAKE_LLM_LATENCY_MEDIAN_SECONDS: float = float(os.getenv("FAKE_LLM_LATENCY_MEDIAN_SECONDS", "0.5"))
+    FAKE_LLM_LATENCY_SIGMA: float = float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0.4"))
+    FAKE_LLM_FAILURE_RATE: float = float(os.getenv("FAKE_LLM_FAILURE_RATE", "0"))
+    FAKE_LLM_RATE_LIMIT_RATE: float = float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0"))
+
+    # LLM Call Resilience
+    LLM_CALL_TIMEOUT_SECONDS: float = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "120"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_RETRY_BASE_DELAY_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_DELAY_SECONDS", "1"))
+    LLM_RETRY_MAX_DELAY_SECONDS: float = float(os.getenv("LLM_RETRY_MAX_DELAY_SECONDS", "20"))
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    WEBSITE_REQUEST_BUDGET_SECONDS: float = float(os.getenv("WEBSITE_REQUEST_BUDGET_SECONDS", "600"))
+
+    # Provider Rate Limits
+    GEMINI_REQUESTS_PER_MINUTE: int = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "1000"))
+    GEMINI_TOKENS_PER_MINUTE: int = int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "1000000"))
+    OPENAI_REQUESTS_PER_MINUTE: int = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+    OPENAI_TOKENS_PER_MINUTE: int = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))
+    FAKE_LLM_REQUESTS_PER_MINUTE: int = int(os.getenv("FAKE_LLM_REQUESTS_PER_MINUTE", "100000"))
+    FAKE_LLM_TOKENS_PER_MINUTE: int = int(os.getenv("FAKE_LLM_TOKENS_PER_MINUTE", "100000000"))
+
+    # Section HTML Cache
+    SECTION_CACHE_MAX_ENTRIES: int = int(os.getenv("SECTION_CACHE_MAX_ENTRIES", "2048"))
+    SECTION_CACHE_TTL_SECONDS: int = int(os.getenv("SECTION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    SECTION_CACHE_PERSIST: bool = os.getenv("SECTION_CACHE_PERSIST", "true").lower() == "true"
+
+    # Sitemap Versions (a full snapshot every N versions, JSON-Patch deltas in between)
+    SITEMAP_SNAPSHOT_INTERVAL: int = int(os.getenv("SITEMAP_SNAPSHOT_INTERVAL", "10"))
+
+    # Brief / Sitemap Reuse Cache (MinHash similarity over business name + description)
+    SITEMAP_REUSE_ENABLED: bool = os.getenv("SITEMAP_REUSE_ENABLED", "true").lower() == "true"
+    SITEMAP_REUSE_THRESHOLD: float = float(os.getenv("SITEMAP_REUSE_THRESHOLD", "0.85"))
+    SITEMAP_REUSE_MAX_ENTRIES: int = int(os.getenv("SITEMAP_REUSE_MAX_ENTRIES", "1024"))
+    SITEMAP_REUSE_TTL_SECONDS: int = int(os.getenv("SITEMAP_REUSE_TTL_SECONDS", str(24 * 3600)))
+
+    # Background Website Jobs
+    WEBSITE_JOB_WORKERS: int = int(os.getenv("WEBSITE_JOB_WORKERS", "2"))
+    WEBSITE_JOB_RETENTION_SECONDS: int = int(os.getenv("WEBSITE_JOB_RETENTION_SECONDS", "3600"))
+
+    # Project Read Cache (project + active sitemap). On by default only with Redis, which every
+    # worker shares; the in-process fallback is only safe when there is a single worker.
+    PROJECT_CACHE_ENABLED: bool = os.getenv("PROJECT_CACHE_ENABLED", "true" if os.getenv("PROJECT_CACHE_REDIS_URL") else "false").lower() == "true"
+    PROJECT_CACHE_MAX_ENTRIES: int = int(os.getenv("PROJECT_CACHE_MAX_ENTRIES", "512"))
+    PROJECT_CACHE_TTL_SECONDS: int = int(os.getenv("PROJECT_CACHE_TTL_SECONDS", "300"))
+    PROJECT_CACHE_REDIS_URL: Optional[str] = os.getenv("PROJECT_CACHE_REDIS_URL")
+
+    # Soft-deleted Project Purge (tombstones older than the grace period are hard-deleted in batches)
+    PROJECT_PURGE_ENABLED: bool = os.getenv("PROJECT_PURGE_ENABLED", "true").lower() == "true"
+    PROJECT_PURGE_INTERVAL_SECONDS: int = int(os.getenv("PROJECT_PURGE_INTERVAL_SECONDS", "300"))
+    PROJECT_PURGE_GRACE_SECONDS: int = int(os.getenv("PROJECT_PURGE_GRACE_SECONDS", "3600"))
+    PROJECT_PURGE_PROJECTS_PER_RUN: int = int(os.getenv("PROJECT_PURGE_PROJECTS_PER_RUN", "50"))
+    PROJECT_PURGE_BATCH_SIZE: int = int(os.getenv("PROJECT_PURGE_BATCH_SIZE", "200"))
+    PROJECT_PURGE_BATCH_PAUSE_SECONDS: float = float(os.getenv("PROJECT_PURGE_BATCH_PAUSE_SECONDS", "0.05"))
+
+    # Generated Page Styling ("inline" compiles one stylesheet per site from a Tailwind subset and
+    # logs classes outside it; "cdn" loads the Tailwind runtime in every page instead)
+    TAILWIND_MODE: str = os.getenv("TAILWIND_MODE", "inline")
+
     class Config:
         env_file = ".env"  
 settings = Settings()
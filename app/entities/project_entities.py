@@ -1,10 +1,22 @@
 from app.core.db_setup import Base
-from sqlalchemy import Column, Integer, String, TIMESTAMP, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Index, TIMESTAMP, func, ForeignKey, text
 from sqlalchemy.orm import relationship
 
 class Project(Base):
     __tablename__ = 'projects'
 
+    __table_args__ = (
+        # Keyset-paginated project list of a user, newest first; tombstones are left out
+        Index('ix_projects_created_by_created_at_id', "created_by", text("created_at DESC"), text("id DESC"),
+              postgresql_where=text("deleted_at IS NULL")),
+        # Name search (prefix + fuzzy) within a user's projects; needs pg_trgm and btree_gin
+        Index('ix_projects_created_by_project_name_trgm', "created_by", "project_name",
+              postgresql_using="gin", postgresql_ops={"project_name": "gin_trgm_ops"},
+              postgresql_where=text("deleted_at IS NULL")),
+        # Soft-deleted projects waiting for the purge worker
+        Index('ix_projects_deleted_at_tombstones', "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
+
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     project_name = Column(String, nullable=False, index=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
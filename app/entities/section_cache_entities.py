@@ -0,0 +1,15 @@
+from app.core.db_setup import Base
+from sqlalchemy import Column, String, Text, TIMESTAMP, func
+
+
+class SectionHtmlCacheEntry(Base):
+    __tablename__ = 'section_html_cache'
+
+    # sha256 of (model, system prompt, user prompt)
+    cache_key = Column(String(64), primary_key=True)
+    model_name = Column(String, nullable=False)
+    html_code = Column(Text, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<SectionHtmlCacheEntry(cache_key='{self.cache_key}', model='{self.model_name}')>"
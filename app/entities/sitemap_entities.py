@@ -1,18 +1,35 @@
 from app.core.db_setup import Base
-from sqlalchemy import Column, Integer, String,Boolean,Index, TIMESTAMP, JSON, func, ForeignKey, Text
+from sqlalchemy import Column, Integer, String,Boolean,Index, TIMESTAMP, JSON, func, ForeignKey, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 class Sitemap(Base):
     __tablename__ = 'sitemap'
 
-    __table_args__ = (Index('ix_sitemap_project_id_is_active', "project_id", "is_active"),)
+    __table_args__ = (
+        Index('ix_sitemap_project_id_is_active', "project_id", "is_active"),
+        Index('ux_sitemap_project_id_version_number', "project_id", "version_number", unique=True),
+        # At most one active version per project
+        Index('ux_sitemap_project_id_active', "project_id", unique=True,
+              postgresql_where=text("is_active"), sqlite_where=text("is_active")),
+        Index('ix_sitemap_project_id_created_at_id', "project_id", "created_at", "id"),
+        Index('ix_sitemap_sitemap_data_active_gin', "sitemap_data",
+              postgresql_using="gin", postgresql_ops={"sitemap_data": "jsonb_path_ops"},
+              postgresql_where=text("is_active")),
+    )
     
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
 
     project_description = Column(Text, nullable=True) 
     no_of_pages = Column(Integer, default=0)
-    sitemap_data = Column(JSON, nullable=True)     
+    # JSONB on Postgres so section/page queries run (and use the GIN index) in the database
+    sitemap_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    # Versions are stored as a full snapshot or as a JSON-Patch from the previous version;
+    # sitemap_data is only kept for snapshots and the active version (see sitemap_versions)
+    version_number = Column(Integer, nullable=False, default=1, server_default="1")
+    storage_kind = Column(String(16), nullable=False, default="snapshot", server_default="snapshot")
+    sitemap_patch = Column(JSON, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False, index=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True) 
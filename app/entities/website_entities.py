@@ -0,0 +1,53 @@
+from app.core.db_setup import Base
+from sqlalchemy import Column, Integer, String, Boolean, Index, TIMESTAMP, JSON, func, ForeignKey, Text, text
+from sqlalchemy.orm import relationship
+
+
+class Website(Base):
+    __tablename__ = 'website'
+
+    __table_args__ = (
+        Index('ix_website_project_id_is_active', "project_id", "is_active"),
+        # At most one active website per project
+        Index('ux_website_project_id_active', "project_id", unique=True,
+              postgresql_where=text("is_active"), sqlite_where=text("is_active")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    # The sitemap version this website was generated from
+    sitemap_id = Column(Integer, ForeignKey("sitemap.id", ondelete="CASCADE"), nullable=False, index=True)
+    # The SitemapStructure sent to /create-website, needed to re-assemble pages
+    sitemap_structure = Column(JSON, nullable=False)
+    business_name = Column(String, nullable=True)
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    sections = relationship(
+        "WebsiteSection",
+        back_populates="website",
+        cascade="all, delete-orphan",
+        order_by="WebsiteSection.id"
+    )
+
+    def __repr__(self):
+        return f"<Website(id={self.id}, project_id={self.project_id}, sitemap_id={self.sitemap_id})>"
+
+
+class WebsiteSection(Base):
+    __tablename__ = 'website_section'
+
+    id = Column(Integer, primary_key=True, nullable=False)
+    website_id = Column(Integer, ForeignKey("website.id", ondelete="CASCADE"), nullable=False, index=True)
+    page_id = Column(String, nullable=False)
+    section_id = Column(String, nullable=False)
+    # Hash of the prompts the section was generated from; unchanged fingerprint => reusable HTML
+    fingerprint = Column(String(64), nullable=False)
+    html_code = Column(Text, nullable=False)
+    has_error = Column(Boolean, default=False, nullable=False)
+
+    website = relationship("Website", back_populates="sections")
+
+    def __repr__(self):
+        return f"<WebsiteSection(website_id={self.website_id}, page_id='{self.page_id}', section_id='{self.section_id}')>"
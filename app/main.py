@@ -1,9 +1,15 @@
 # main.py
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.routes import user_routes, project_routes, sitemap, website_routes
 from app.core.settings import settings
 from app.core.config import setup_cors 
+from app.services.website_jobs import website_job_queue
+from app.services.project_purge import project_purge_worker
+from app.services.llm_telemetry import LLMTelemetryMiddleware
+from app.services.metrics import metrics_registry
 
 bearer_scheme_definition = {
     "BearerAuth": {
@@ -14,13 +20,25 @@ bearer_scheme_definition = {
     }
 }
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await website_job_queue.start()
+    await project_purge_worker.start()
+    yield
+    await project_purge_worker.stop()
+    await website_job_queue.stop()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
+    lifespan=lifespan,
     openapi_components={"securitySchemes": bearer_scheme_definition},
 )
 
 
 setup_cors(app)
+app.add_middleware(LLMTelemetryMiddleware)
 
 app.include_router(user_routes.router) 
 
@@ -33,4 +51,10 @@ app.include_router(website_routes.router)
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to the Sitemap Generator API"}
\ No newline at end of file
+    return {"message": "Welcome to the Sitemap Generator API"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -7,3 +9,28 @@ class CreateProjectRequest(BaseModel):
 class EditProjectRequest(BaseModel):
     project_name: str = Field(..., min_length=1, example="My Renamed Website")
 
+
+class ProjectSummary(BaseModel):
+    id: int
+    project_name: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    created_by: Optional[int] = None
+
+class ProjectListResponse(BaseModel):
+    data: List[ProjectSummary]
+    message: str
+    # Pass back as `cursor` to fetch the next (older) page; None on the last page
+    next_cursor: Optional[str] = None
+    # Only set when `include_total=true`
+    total: Optional[int] = None
+
+class ProjectSearchResult(ProjectSummary):
+    # pg_trgm word similarity of the query to the name, 0..1
+    score: float
+
+class ProjectSearchResponse(BaseModel):
+    query: str
+    data: List[ProjectSearchResult]
+    # Pass back as `offset` to fetch the next page; None on the last page
+    next_offset: Optional[int] = None
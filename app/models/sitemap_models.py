@@ -2,6 +2,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List,Dict,Any
 from enum import Enum
+from datetime import datetime
 
 
 class FontStyle(BaseModel):
@@ -137,6 +138,8 @@ class SitemapGenerator(BaseModel):
     sitemap_prompt: Optional[str] = Field(None, alias="prompt")
     page: Optional[int] = None
     language: Optional[str] = None
+    # Set to false to force fresh generation instead of reusing a near-duplicate result
+    allow_reuse: bool = Field(True, alias="allowReuse")
 
 
 class saveSitemap(BaseModel):
@@ -144,3 +147,25 @@ class saveSitemap(BaseModel):
     project_description: Optional[str] = None
     no_of_pages: Optional[int] = None
     sitemap_data: Optional[Dict[str, Any]] = None
+
+
+class SitemapVersionSummary(BaseModel):
+    id: int
+    version_number: int
+    created_at: Optional[datetime] = None
+    created_by: Optional[int] = None
+    no_of_pages: Optional[int] = None
+    is_active: bool
+
+
+class SitemapHistoryResponse(BaseModel):
+    project_id: int
+    versions: List[SitemapVersionSummary]
+    # Pass back as `cursor` to fetch the next (older) page; None on the last page
+    next_cursor: Optional[str] = None
+
+
+class SitemapVersionResponse(SitemapVersionSummary):
+    project_id: int
+    project_description: Optional[str] = None
+    sitemap_data: Optional[Dict[str, Any]] = None
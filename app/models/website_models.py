@@ -1,10 +1,14 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
+from datetime import datetime
+from enum import Enum
 
 class SectionData(BaseModel):
     id: str|int
     sectionName: str = Field(..., alias='title')
     section_description: str = Field(..., alias='description')
+    # Marks a section that is identical on every page it appears on (generated once per site)
+    is_global: bool = Field(False, alias='isGlobal')
 
 class PageData(BaseModel):
     id: str
@@ -19,6 +23,8 @@ class CreateWebsiteRequest(BaseModel):
     sitemap : SitemapStructure
     project_description: Optional[str]= None
     business_name : Optional[str] = None
+    # Generate all sections of a page in one LLM call instead of one call per section
+    batch_by_page: bool = False
 
 class WebsiteResponse(BaseModel):
     code: str
@@ -31,6 +37,32 @@ class MultiPageWebsiteResponse(BaseModel):
 class SectionHtmlResponse(BaseModel):
     html_code: str
 
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
 
+class WebsiteJobCreatedResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    project_id: int
 
+class SectionResult(BaseModel):
+    page_id: str
+    section_id: str
+    html_code: Optional[str] = None
+    has_error: bool = False
 
+class WebsiteJobStatusResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    project_id: int
+    total_sections: int
+    completed_sections: int
+    failed_sections: int
+    sections: List[SectionResult] = []
+    page_html_map: Dict[str, str] = {}
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from typing import Optional
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session, joinedload
-from app.models.project_models import CreateProjectRequest, EditProjectRequest
+from app.models.project_models import (CreateProjectRequest, EditProjectRequest, ProjectListResponse, ProjectSummary,
+                                       ProjectSearchResponse, ProjectSearchResult)
 from app.entities.project_entities import Project
 from app.entities.user_entities import User
 from app.core.db_setup import get_db
 from app.core.config import logging
 from app.services.auth_service import get_current_user
+from app.services.project_listing import list_user_projects, search_user_projects
+from app.services.project_cache import project_cache
+from app.services.etags import etag_matches, get_project_etag_state, not_modified, project_etag, set_etag
 
 
 router = APIRouter(prefix="/projects", 
@@ -59,7 +65,7 @@ async def edit_project_name(
 ):
     try:
         logging.info(f"User {current_user.id} attempting to edit project ID: {project_id}")
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = db.query(Project).filter(Project.id == project_id, Project.deleted_at.is_(None)).first()
 
         if not project:
             logging.warning(f"Edit failed: Project ID {project_id} not found.")
@@ -72,6 +78,7 @@ async def edit_project_name(
         project.project_name = data.project_name
         project.updated_by = current_user.id 
         db.commit()
+        project_cache.invalidate(project_id)
         db.refresh(project)
         logging.info(f"Project ID {project_id} name updated to '{data.project_name}' by user {current_user.id}")
         return {
@@ -92,29 +99,71 @@ async def edit_project_name(
 
 
 
+@router.get("/search", response_model=ProjectSearchResponse)
+async def search_projects(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Searches the logged-in user's projects by name: prefix matches first, then fuzzy matches by similarity."""
+    try:
+        logging.info(f"User {current_user.id} searching projects for '{q}'")
+        rows, next_offset = search_user_projects(db, current_user.id, q, limit, offset)
+        return ProjectSearchResponse(
+            query=q,
+            data=[ProjectSearchResult.model_validate(row._asdict()) for row in rows],
+            next_offset=next_offset,
+        )
+    except Exception as e:
+        logging.error(f"Error searching projects for user {current_user.id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error searching projects")
+
+
+
 @router.get("/{project_id}")
 async def get_project_details(
     project_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Project with its active sitemap, served from the project cache when possible.
+    Responses carry an ETag; send it back in `If-None-Match` to get `304 Not Modified`
+    without the sitemap being loaded again.
+    """
     try:
         logging.info(f"User {current_user.id} requesting details for project ID: {project_id}")
-        project = db.query(Project)\
-                    .options(joinedload(Project.active_sitemap))\
-                    .filter(Project.id == project_id)\
-                    .first()
-
-        if not project:
+        cached = project_cache.get_cached(project_id)
+        if cached is None and if_none_match:
+            state = get_project_etag_state(db, project_id)
+            if state and state.created_by == current_user.id:
+                etag = project_etag(project_id, state.updated_at, state.active_sitemap_id)
+                if etag_matches(if_none_match, etag):
+                    logging.info(f"Project ID {project_id} not modified since last read")
+                    return not_modified(etag)
+
+        aggregate = cached or project_cache.load(db, project_id)
+
+        if not aggregate:
             logging.warning(f"Get details failed: Project ID {project_id} not found.")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
 
-        if project.created_by != current_user.id:
-            logging.warning(f"Authorization failed: User {current_user.id} tried to access project {project_id} owned by {project.created_by}")
+        project = aggregate["project"]
+        if project["created_by"] != current_user.id:
+            logging.warning(f"Authorization failed: User {current_user.id} tried to access project {project_id} owned by {project['created_by']}")
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this project")
 
+        if etag_matches(if_none_match, aggregate["etag"]):
+            logging.info(f"Project ID {project_id} not modified since last read")
+            return not_modified(aggregate["etag"])
+
+        set_etag(response, aggregate["etag"])
         logging.info(f"Successfully retrieved details for project ID: {project_id}")
-        return project 
+        return {**project, "active_sitemap": aggregate["active_sitemap"]}
 
     except HTTPException as http_exc:
         raise http_exc
@@ -124,22 +173,32 @@ async def get_project_details(
 
 
 
-@router.get("/")
+@router.get("/", response_model=ProjectListResponse)
 async def get_user_projects(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Lists all projects created by the logged-in user."""
+    """Lists the logged-in user's projects, newest first. Follow `next_cursor` for older projects."""
     try:
         logging.info(f"User {current_user.id} requesting their projects list.")
-        projects = db.query(Project)\
-                     .filter(Project.created_by == current_user.id)\
-                     .order_by(Project.created_at.desc())\
-                     .all()
-
-        logging.info(f"Found {len(projects)} projects for user {current_user.id}.")
-        return {"data":projects, "message":f"Found {len(projects)} projects."}
+        try:
+            rows, next_cursor, total = list_user_projects(db, current_user.id, limit, cursor, include_total)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        logging.info(f"Found {len(rows)} projects for user {current_user.id}.")
+        return ProjectListResponse(
+            data=[ProjectSummary.model_validate(row._asdict()) for row in rows],
+            message=f"Found {len(rows)} projects.",
+            next_cursor=next_cursor,
+            total=total,
+        )
 
+    except HTTPException as http_exc:
+        raise http_exc
     except Exception as e:
         logging.error(f"Error listing projects for user {current_user.id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error listing projects")
@@ -154,18 +213,28 @@ async def delete_project(
 ):
     try:
         logging.info(f"User {current_user.id} attempting to delete project ID: {project_id}")
-        project = db.query(Project).filter(Project.id == project_id).first()
+        # Soft delete: one UPDATE stamps the tombstone; project_purge removes the rows later
+        deleted = db.execute(
+            update(Project)
+            .where(Project.id == project_id,
+                   Project.created_by == current_user.id,
+                   Project.deleted_at.is_(None))
+            .values(deleted_at=func.now(), deleted_by=current_user.id)
+            .returning(Project.id)
+        ).first()
+
+        if not deleted:
+            db.rollback()
+            project = db.query(Project.created_by).filter(Project.id == project_id, Project.deleted_at.is_(None)).first()
+            if not project:
+                logging.warning(f"Delete failed: Project ID {project_id} not found.")
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
 
-        if not project:
-            logging.warning(f"Delete failed: Project ID {project_id} not found.")
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-
-        # Authorization check
-        if project.created_by != current_user.id:
             logging.warning(f"Authorization failed: User {current_user.id} tried to delete project {project_id} owned by {project.created_by}")
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this project")
 
-        db.delete(project) 
+        db.commit()
+        project_cache.invalidate(project_id)
         logging.info(f"Project ID {project_id} deleted successfully by user {current_user.id}.")
         return None
 
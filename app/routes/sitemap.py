@@ -1,8 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends,status
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload 
-from app.models.sitemap_models import SitemapGenerator, ProjectBrief, saveSitemap
-from app.services.llm_service import get_llm_response, get_llm_response_without_fmt
+from app.models.sitemap_models import (SitemapGenerator, ProjectBrief, saveSitemap,
+                                       SitemapHistoryResponse, SitemapVersionResponse, SitemapVersionSummary)
+from app.services.llm_router import llm_router, LLMUnavailableError, SITEMAP_TARGETS
+from app.services.json_stream import StreamingArrayParser, repair_json
+from app.services.sitemap_reuse_cache import sitemap_reuse_cache
+from app.services.sitemap_versions import (get_swap_base, swap_active_sitemap, SitemapSwapConflict,
+                                           list_sitemap_versions, load_sitemap_data)
+from app.services.project_cache import project_cache
+from app.services.etags import etag_matches, get_project_etag_state, not_modified, set_etag, sitemap_version_etag
+from app.services.sitemap_queries import find_projects_with_section, section_usage, page_counts
+from app.core.settings import settings
+import asyncio
 import json
+from typing import AsyncIterator, Optional, Tuple
 from app.entities.sitemap_entities import Sitemap
 from app.entities.user_entities import User
 from app.entities.project_entities import Project
@@ -13,23 +25,81 @@ from app.core.config import logging
 router = APIRouter(prefix="/sitemap", tags=["Sitemap"])
 
 
-@router.post("/generate")
-async def generate_sitemap_generator(data: SitemapGenerator):
+async def generate_project_brief(user_prompt: str, system_prompt: str) -> dict:
+    try:
+        brief_result = await llm_router.complete(
+            "project_brief",
+            SITEMAP_TARGETS,
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            response_format=ProjectBrief,
+        )
+    except LLMUnavailableError as e:
+        logging.error(f"Project brief generation failed: {e}")
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="AI model is unavailable for project brief generation")
+
+    if brief_result.parsed is None:
+        logging.error(f"Project brief from {brief_result.provider}:{brief_result.model} could not be parsed")
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="AI model returned an invalid project brief")
+
+    return json.loads(brief_result.parsed.model_dump_json())
+
+
+async def generate_sitemap_json(user_prompt: str) -> Tuple[dict, bool]:
+    """Returns the generated sitemap and whether malformed or truncated output had to be repaired."""
+    try:
+        sitemap_result = await llm_router.complete("sitemap", SITEMAP_TARGETS, user_prompt=user_prompt)
+    except LLMUnavailableError as e:
+        logging.error(f"Sitemap generation failed: {e}")
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="AI model is unavailable for sitemap generation")
+    response = sitemap_result.text or ""
+
+    try:
+        sitemap, repaired = repair_json(response)
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=500, detail="Failed to parse JSON response from AI model"
+        )
+    if repaired:
+        logging.warning(f"Repaired malformed sitemap JSON from {sitemap_result.provider}:{sitemap_result.model}")
+    return sitemap, repaired
+
+
+def reuse_enabled(data: SitemapGenerator) -> bool:
+    return settings.SITEMAP_REUSE_ENABLED and data.allow_reuse
+
+
+async def resolve_project_brief(data: SitemapGenerator, user_prompt: str, system_prompt: str) -> dict:
+    """Returns a reusable brief from a near-duplicate request, or generates and remembers a new one."""
+    if reuse_enabled(data):
+        cached = sitemap_reuse_cache.get("brief", data)
+        if cached is not None:
+            return cached
+    project_brief = await generate_project_brief(user_prompt, system_prompt)
+    sitemap_reuse_cache.set("brief", data, project_brief)
+    return project_brief
+
+
+async def resolve_sitemap(data: SitemapGenerator, user_prompt: str) -> dict:
+    if reuse_enabled(data):
+        cached = sitemap_reuse_cache.get("sitemap", data)
+        if cached is not None:
+            return cached
+    sitemap, repaired = await generate_sitemap_json(user_prompt)
+    if not repaired:
+        # A repaired sitemap may be cut off; don't hand it to later near-duplicate requests
+        sitemap_reuse_cache.set("sitemap", data, sitemap)
+    return sitemap
+
+
+def build_sitemap_prompts(data: SitemapGenerator) -> Tuple[str, str, str]:
+    """Returns (brief user prompt, brief system prompt, sitemap user prompt) for a generation request."""
     prompt = """ 
     You provide assistance with project brief,
     You understand the business requirement and you are highly skillful to rewrite the business description 
     that is well detailed and crystal clear to be understood by everyone.
     """
 
-    response = get_llm_response(
-        user_prompt=f"write a project brief make it understandable {data.business_name}, {data.business_description}",
-        system_prompt=prompt,
-        response_format=ProjectBrief,
-    )
-
-    json_project = response.model_dump_json()
-    project_brief = json.loads(json_project)
-
     
     sectionCategoryCsv = """
     0|Navbar
@@ -144,26 +214,116 @@ async def generate_sitemap_generator(data: SitemapGenerator):
     Strictly avoid extra text or any unrelated response.
     """
 
-    response = get_llm_response_without_fmt(
-        user_prompt=f"""
+    brief_user_prompt = f"write a project brief make it understandable {data.business_name}, {data.business_description}"
+    sitemap_user_prompt = f"""
         Complete all the given tasks for the business: {data.business_name}.
         Write a project brief.
         Generate the sitemap.
         {sitemap_prompt}
         """
-    )
+    return brief_user_prompt, prompt, sitemap_user_prompt
 
+
+@router.post("/generate")
+async def generate_sitemap_generator(data: SitemapGenerator):
+    brief_user_prompt, brief_system_prompt, sitemap_user_prompt = build_sitemap_prompts(data)
+
+    brief_task = asyncio.create_task(resolve_project_brief(data, brief_user_prompt, brief_system_prompt))
+    sitemap_task = asyncio.create_task(resolve_sitemap(data, sitemap_user_prompt))
+    # The two prompts are independent: run them together and fail fast, cancelling the
+    # other call, as soon as either one raises.
     try:
-        formatted_response = response.replace("```json", "").replace("```", "").strip()
-        json_loads = json.loads(formatted_response)
-    except json.JSONDecodeError:
-        raise HTTPException(
-            status_code=500, detail="Failed to parse JSON response from AI model"
-        )
+        project_brief, json_loads = await asyncio.gather(brief_task, sitemap_task)
+    finally:
+        brief_task.cancel()
+        sitemap_task.cancel()
 
     return {"sitemap": json_loads, "project_brief": project_brief}
 
 
+async def stream_sitemap_events(data: SitemapGenerator) -> AsyncIterator[str]:
+    """
+    Yields NDJSON events: a `page` event for each `Pages[]` entry as soon as the model
+    has finished writing it, a `project_brief` event when the brief is ready, and a
+    final `done` event with the whole sitemap. Failures after the response has
+    started are reported as an `error` event.
+    """
+    brief_user_prompt, brief_system_prompt, sitemap_user_prompt = build_sitemap_prompts(data)
+    brief_task = asyncio.create_task(resolve_project_brief(data, brief_user_prompt, brief_system_prompt))
+    parser = StreamingArrayParser("Pages")
+    pages = []
+    brief_sent = False
+
+    def error_event(status_code: int, detail: str) -> str:
+        return json.dumps({"event": "error", "status_code": status_code, "detail": detail}) + "\n"
+
+    try:
+        cached_sitemap = sitemap_reuse_cache.get("sitemap", data) if reuse_enabled(data) else None
+        if cached_sitemap is not None:
+            for page in cached_sitemap.get("Pages", []):
+                yield json.dumps({"event": "page", "page": page}) + "\n"
+            try:
+                project_brief = await brief_task
+            except HTTPException as http_exc:
+                yield error_event(http_exc.status_code, http_exc.detail)
+                return
+            yield json.dumps({"event": "project_brief", "project_brief": project_brief}) + "\n"
+            yield json.dumps({"event": "done", "sitemap": cached_sitemap, "project_brief": project_brief, "repaired": False}) + "\n"
+            return
+
+        try:
+            async for chunk in llm_router.stream("sitemap", SITEMAP_TARGETS, user_prompt=sitemap_user_prompt):
+                for page in parser.feed(chunk):
+                    pages.append(page)
+                    yield json.dumps({"event": "page", "page": page}) + "\n"
+                if brief_task.done() and not brief_sent and brief_task.exception() is None:
+                    brief_sent = True
+                    yield json.dumps({"event": "project_brief", "project_brief": brief_task.result()}) + "\n"
+        except LLMUnavailableError as e:
+            logging.error(f"Sitemap generation failed: {e}")
+            yield error_event(status.HTTP_502_BAD_GATEWAY, "AI model is unavailable for sitemap generation")
+            return
+        except Exception as e:
+            # The stream broke off part way: keep what arrived and repair it below
+            logging.warning(f"Sitemap stream interrupted after {len(parser.text)} characters ({type(e).__name__}: {e})")
+
+        try:
+            sitemap, repaired = repair_json(parser.text)
+        except json.JSONDecodeError:
+            yield error_event(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to parse JSON response from AI model")
+            return
+        if repaired:
+            logging.warning(f"Repaired malformed sitemap JSON ({len(parser.text)} characters, {len(pages)} complete pages)")
+            if isinstance(sitemap, dict):
+                # Only pages that streamed out complete are kept; a cut-off last page is dropped
+                sitemap = {**sitemap, "Pages": pages}
+        elif isinstance(sitemap, dict):
+            sitemap_reuse_cache.set("sitemap", data, sitemap)
+
+        try:
+            project_brief = await brief_task
+        except HTTPException as http_exc:
+            yield error_event(http_exc.status_code, http_exc.detail)
+            return
+        if not brief_sent:
+            yield json.dumps({"event": "project_brief", "project_brief": project_brief}) + "\n"
+        yield json.dumps({"event": "done", "sitemap": sitemap, "project_brief": project_brief, "repaired": repaired}) + "\n"
+    finally:
+        if not brief_task.done():
+            brief_task.cancel()
+        elif not brief_task.cancelled():
+            brief_task.exception()  # retrieved, so asyncio does not log it again
+
+
+@router.post("/generate/stream")
+async def generate_sitemap_stream(data: SitemapGenerator):
+    """
+    Streaming variant of `/generate`. Responds with `application/x-ndjson` so the
+    first pages can be shown while the model is still writing the rest.
+    """
+    return StreamingResponse(stream_sitemap_events(data), media_type="application/x-ndjson")
+
+
 
 
 @router.put("/save-sitemap/{project_id}")
@@ -174,60 +334,50 @@ async def update_project_sitemap(
     current_user: User = Depends(get_current_user)
 ):
     logging.info(f"User {current_user.id} attempting to save sitemap for project ID: {project_id}")
-    sitemap_record = None
 
     try:
-        project =  db.query(Project).filter(Project.id == project_id).first()
+        if payload.sitemap_data is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="There is no changes happened to save")
 
-        if not project:
+        base = get_swap_base(db, project_id)
+
+        if not base:
             logging.warning(f"Save sitemap failed: Project ID {project_id} not found.")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
 
-        if not project:
-            logging.warning(f"Authorization failed: User {current_user.id} tried to update sitemap for project {project_id} owned by {project.created_by}")
+        if base.created_by != current_user.id:
+            logging.warning(f"Authorization failed: User {current_user.id} tried to update sitemap for project {project_id} owned by {base.created_by}")
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to modify this project's sitemap")
-        
-        current_active_sitemap = db.query(Sitemap).filter(
-            Sitemap.project_id == project_id,
-            Sitemap.is_active == True
-        ).with_for_update().first()
 
-        if current_active_sitemap:
-            logging.info(f"Deactivating previous active sitemap (ID: {current_active_sitemap.id}) for project {project_id}")
-            current_active_sitemap.is_active = False
-            db.add(current_active_sitemap)
+        if base.sitemap_id:
+            logging.info(f"Deactivating previous active sitemap (ID: {base.sitemap_id}) for project {project_id}")
 
-        if payload.sitemap_data is None:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="There is no changes happened to save")
-        
-        new_sitemap = Sitemap(
-            project_id=project_id,
+        project_name = payload.project_name.strip() if payload.project_name is not None else None
+        new_sitemap = swap_active_sitemap(
+            db,
+            project_id,
+            base,
+            payload.sitemap_data,
+            current_user.id,
+            project_name=project_name,
             project_description=payload.project_description,
-            no_of_pages=payload.no_of_pages,
-            sitemap_data=payload.sitemap_data,
-            is_active=True,
-            created_by=current_user.id,
-            updated_by=current_user.id
+            no_of_pages=payload.no_of_pages
         )
-
-        db.add(new_sitemap)
-
-        if payload.project_name is not None and payload.project_name.strip() != project.project_name:
-             project.project_name = payload.project_name.strip()
-             project.updated_by = current_user.id
-             db.add(project)
-
         db.commit()
+        project_cache.invalidate(project_id)
 
-        db.refresh(new_sitemap)
-        db.refresh(project)
         logging.info(f"Successfully saved new sitemap version (ID: {new_sitemap.id}) for project {project_id}")
         return {
             "message":"New sitemap version saved successfully",
-            "project_id":project.id,
+            "project_id":project_id,
             "sitemap_id":new_sitemap.id, 
-            "project_name":project.project_name
+            "project_name":project_name if project_name is not None else base.project_name
         }
+
+    except SitemapSwapConflict as e:
+        db.rollback()
+        logging.warning(f"Save sitemap conflict for project {project_id}: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The sitemap was changed by another save. Reload it and try again.")
     
     except HTTPException as http_exc:
         db.rollback()
@@ -238,3 +388,138 @@ async def update_project_sitemap(
         db.rollback()
         logging.error(f"Error saving sitemap for project {project_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error saving sitemap version.")
+
+
+
+def check_project_owner(db: Session, project_id: int, current_user: User) -> None:
+    """Raises 404/403 unless the project exists and belongs to the current user."""
+    owner = db.query(Project.created_by).filter(Project.id == project_id, Project.deleted_at.is_(None)).first()
+    if owner is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    if owner.created_by != current_user.id:
+        logging.warning(f"Authorization failed: User {current_user.id} tried to access sitemaps of project {project_id} owned by {owner.created_by}")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this project")
+
+
+@router.get("/history/{project_id}", response_model=SitemapHistoryResponse)
+async def get_sitemap_history(
+    project_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Lists a project's sitemap versions, newest first, as metadata only. Follow `next_cursor` for older versions."""
+    try:
+        check_project_owner(db, project_id, current_user)
+        try:
+            rows, next_cursor = list_sitemap_versions(db, project_id, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return SitemapHistoryResponse(
+            project_id=project_id,
+            versions=[SitemapVersionSummary.model_validate(row._asdict()) for row in rows],
+            next_cursor=next_cursor,
+        )
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logging.error(f"Error listing sitemap history for project {project_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error listing sitemap history.")
+
+
+@router.get("/history/{project_id}/{sitemap_id}", response_model=SitemapVersionResponse)
+async def get_sitemap_version(
+    project_id: int,
+    sitemap_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Returns one sitemap version with its full `sitemap_data`, rebuilt from deltas if needed.
+    Supports `If-None-Match` with the returned ETag.
+    """
+    try:
+        state = get_project_etag_state(db, project_id)
+        if state is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        if state.created_by != current_user.id:
+            logging.warning(f"Authorization failed: User {current_user.id} tried to access sitemaps of project {project_id} owned by {state.created_by}")
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this project")
+
+        # The version must exist and belong to this project before any 304 is answered
+        version = db.query(Sitemap.is_active).filter(Sitemap.id == sitemap_id, Sitemap.project_id == project_id).first()
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sitemap version not found")
+        etag = sitemap_version_etag(project_id, sitemap_id, version.is_active)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        sitemap = db.query(Sitemap).filter(Sitemap.id == sitemap_id, Sitemap.project_id == project_id).first()
+        if sitemap is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sitemap version not found")
+        set_etag(response, sitemap_version_etag(project_id, sitemap.id, sitemap.is_active))
+        return SitemapVersionResponse(
+            id=sitemap.id,
+            project_id=sitemap.project_id,
+            version_number=sitemap.version_number,
+            created_at=sitemap.created_at,
+            created_by=sitemap.created_by,
+            no_of_pages=sitemap.no_of_pages,
+            is_active=sitemap.is_active,
+            project_description=sitemap.project_description,
+            sitemap_data=load_sitemap_data(db, sitemap),
+        )
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logging.error(f"Error loading sitemap version {sitemap_id} of project {project_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error loading sitemap version.")
+
+
+@router.get("/analytics/projects-with-section")
+async def get_projects_with_section(
+    section_name: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Projects whose active sitemap contains a section with this exact name."""
+    try:
+        rows = find_projects_with_section(db, current_user.id, section_name, limit)
+        return {"section_name": section_name, "data": [row._asdict() for row in rows]}
+    except Exception as e:
+        logging.error(f"Error searching sitemaps for section '{section_name}' for user {current_user.id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error querying sitemaps.")
+
+
+@router.get("/analytics/section-usage")
+async def get_section_usage(
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Section names across the user's active sitemaps, with occurrence and project counts."""
+    try:
+        return {"data": [row._asdict() for row in section_usage(db, current_user.id, limit)]}
+    except Exception as e:
+        logging.error(f"Error aggregating section usage for user {current_user.id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error querying sitemaps.")
+
+
+@router.get("/analytics/page-counts")
+async def get_page_counts(
+    min_pages: Optional[int] = Query(None, ge=0),
+    max_pages: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Page and section counts of each active sitemap, optionally filtered by page count."""
+    try:
+        return {"data": [row._asdict() for row in page_counts(db, current_user.id, min_pages, max_pages, limit)]}
+    except Exception as e:
+        logging.error(f"Error counting sitemap pages for user {current_user.id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error querying sitemaps.")
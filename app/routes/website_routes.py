@@ -1,83 +1,108 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from typing import Dict,Tuple, List
+from typing import AsyncIterator, Dict,Tuple, List
 import asyncio
+import json
 from app.core.config import logging
-# from app.services.llm_service import get_llm_response,get_llm_response_without_fmt
-from app.services.geminillm_service import gemini_llm_call
+from app.services.website_service import (build_generation_units,
+                                          assemble_page_html,
+                                          build_site_styles,
+                                          SITE_STYLES_PLACEHOLDER,
+                                          is_error_section,
+                                          diff_against_previous,
+                                          save_website_version,
+                                          persist_website_in_new_session,
+                                          get_active_website)
 from app.entities.project_entities import Project
 from app.entities.sitemap_entities import Sitemap
 from app.entities.user_entities import User
 from app.core.db_setup import get_db
+from app.core.settings import settings
+from app.services.llm_resilience import request_budget
+from app.services.website_jobs import WebsiteJob, website_job_queue
 from app.services.auth_service import get_current_user
+from app.services.project_cache import project_cache, active_sitemap_view
 from app.models.website_models import (SectionData,
                                        PageData, 
                                        CreateWebsiteRequest, 
                                        WebsiteResponse, 
                                        SitemapStructure,
                                        SectionHtmlResponse,
-                                       MultiPageWebsiteResponse)
+                                       MultiPageWebsiteResponse,
+                                       WebsiteJobCreatedResponse,
+                                       WebsiteJobStatusResponse)
 
 
 
 router = APIRouter(prefix="/website", tags=["Website"])
 
 
-async def generate_section_html(
-    section: SectionData,
-    page: PageData,
-    project_context: Dict 
-) -> Tuple[str, str, str]: 
-    try:
-        logging.info(f"Generating HTML for section '{section.sectionName}' on page '{page.pageName}'")
-
-        system_prompt = f"""
-        You are an expert frontend developer creating semantic HTML, potentially using Tailwind CSS.
-        Generate the HTML code *only* for the website section described below.
-        Wrap the output in a '<section id="section-{page.id }-{section.id}">' tag.
-        Use placeholder images (e.g., https://via.placeholder.com/600x400) if needed.
-        Do not include <html>, <head>, or <body> tags. Just the <section>...</section>.
-        """
-
-        user_prompt = f"""
-        Project Context:
-        Business Name: {project_context.get('business_name', 'N/A')}
-        Project Description: {project_context.get('project_description', 'N/A')}
-
-        Page Name: {page.pageName}
-
-        Section Details:
-        Section ID: {section.id}
-        Section Name: {section.sectionName}
-        Section Description: {section.section_description}
-        # Include other details if relevant, like section_outline
-
-        Generate the HTML code for this specific section now.
-        """
-        # --- Call your LLM function ---
-        html_content =  gemini_llm_call(
-            system_instruction=system_prompt,
-            user_input=user_prompt,
-           
-        )
-        # If response_format=SectionHtmlResponse was used:
-        # if isinstance(html_content, SectionHtmlResponse):
-        #    html_content = html_content.html_code
-        # elif not isinstance(html_content, str): 
-        #     raise ValueError("LLM returned unexpected format for section HTML")
-
-        if not html_content or not isinstance(html_content, str):
-             logging.error(f"Failed to generate HTML for section {section.id} on page {page.id}: Empty or invalid response.")
-             return (str(page.id), str(section.id), f"<section id='section-{page.id}-{section.id}' class='bg-red-100 text-red-700 p-4'>Error generating content for '{section.sectionName}'.</section>")
-
-        logging.info(f"Successfully generated HTML for section {section.id} on page {page.id}")
-        return (str(page.id), str(section.id), html_content.strip())
-
-    except Exception as e:
-        logging.error(f"Error generating HTML for section {section.id} on page {page.id}: {e}", exc_info=True)
-        return (str(page.id), str(section.id), f"<section id='section-{page.id}-{section.id}' class='bg-red-100 text-red-700 p-4'>Error generating content for '{section.sectionName}': {e}</section>")
-
-
+def get_owned_sitemap(db: Session, sitemap_id: int, current_user: User) -> Sitemap:
+    """
+    Loads a sitemap (with its project) owned by the current user, or raises 404/403.
+    A project's active sitemap is served from the project cache when it is there.
+    """
+    cached = project_cache.get_by_active_sitemap(sitemap_id)
+    if cached and cached["project"]["created_by"] == current_user.id:
+        return active_sitemap_view(cached)
+
+    sitemap_db_entry = db.query(Sitemap)\
+        .options(joinedload(Sitemap.project))\
+        .join(Sitemap.project) \
+        .filter(Sitemap.id == sitemap_id) \
+        .filter(Project.created_by == current_user.id, Project.deleted_at.is_(None)) \
+        .first()
+
+    # --- Correct Check for Existence and Permissions ---
+    if not sitemap_db_entry:
+        exists = db.query(Sitemap.id).join(Sitemap.project)\
+            .filter(Sitemap.id == sitemap_id, Project.deleted_at.is_(None)).first()
+        if not exists:
+             raise HTTPException(
+                 status_code=status.HTTP_404_NOT_FOUND,
+                 detail=f"Sitemap with ID {sitemap_id} not found."
+             )
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have permission to access the project associated with this sitemap."
+            )
+    return sitemap_db_entry
+
+
+def build_project_context(data: CreateWebsiteRequest, sitemap_db_entry: Sitemap) -> Dict:
+    return {
+        "business_name": data.business_name or sitemap_db_entry.project.project_name, # From loaded project
+        "project_description": data.project_description or sitemap_db_entry.project_description # From sitemap record
+    }
+
+
+def plan_section_generation(sitemap: SitemapStructure) -> Tuple[List[PageData], Dict[str, List[str]]]:
+    """
+    Returns the pages that have sections to generate and, per page id, the ordered
+    section ids used later to assemble the page.
+    """
+    if not sitemap or not sitemap.Pages:
+         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                             detail="Sitemap data is missing or empty in the request payload.")
+
+    page_section_map: Dict[str, List[str]] = {}
+    valid_pages_for_gen: List[PageData] = []
+    for page in sitemap.Pages:
+        page_id_str = str(page.id)
+        page_section_map[page_id_str] = []
+        if page.sections:
+            valid_pages_for_gen.append(page)
+            for section in page.sections:
+                page_section_map[page_id_str].append(str(section.id))
+        else:
+             logging.warning(f"Page '{page.pageName}' (ID: {page.id}) has no sections. Skipping generation for this page.")
+
+    if not valid_pages_for_gen:
+         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                             detail="No sections found in any page of the provided sitemap data.")
+    return valid_pages_for_gen, page_section_map
 
 
 @router.post("/create-website", response_model=MultiPageWebsiteResponse)
@@ -89,113 +114,41 @@ async def create_website(
     sitemap_id_from_request = data.project_id
     try:
         # --- Verify Ownership and Fetch Data ---
-        sitemap_db_entry = db.query(Sitemap)\
-            .options(joinedload(Sitemap.project))\
-            .join(Sitemap.project) \
-            .filter(Sitemap.id == sitemap_id_from_request) \
-            .filter(Project.created_by == current_user.id) \
-            .first()
-
-        # --- Correct Check for Existence and Permissions ---
-        if not sitemap_db_entry:
-            exists = db.query(Sitemap.id).filter(Sitemap.id == sitemap_id_from_request).first()
-            if not exists:
-                 raise HTTPException(
-                     status_code=status.HTTP_404_NOT_FOUND,
-                     detail=f"Sitemap with ID {sitemap_id_from_request} not found."
-                 )
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You do not have permission to access the project associated with this sitemap."
-                )
+        sitemap_db_entry = get_owned_sitemap(db, sitemap_id_from_request, current_user)
 
         # --- Validate Incoming Sitemap Structure ---
-        sitemap: SitemapStructure = data.sitemap
-        if not sitemap or not sitemap.Pages:
-             raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                                 detail="Sitemap data is missing or empty in the request payload.")
+        valid_pages_for_gen, page_section_map = plan_section_generation(data.sitemap)
 
         actual_project_id = sitemap_db_entry.project_id 
         logging.info(f"Starting multi-page website generation for sitemap {sitemap_id_from_request} (Project ID: {actual_project_id}) by user {current_user.id}")
 
-        tasks = []
-        page_section_map: Dict[str, List[str]] = {}
+        project_context = build_project_context(data, sitemap_db_entry)
 
-        project_context = {
-            "business_name": data.business_name or sitemap_db_entry.project.project_name, # From loaded project
-            "project_description": data.project_description or sitemap_db_entry.project_description # From sitemap record
-        }
+        # --- Only regenerate sections that changed since the last generated version ---
+        fingerprints, section_html_map, to_generate = diff_against_previous(db, actual_project_id, valid_pages_for_gen, project_context)
+        tasks = build_generation_units(to_generate, project_context, data.batch_by_page)
 
-        valid_pages_for_gen = [] 
-        for page in sitemap.Pages:
-            page_id_str = str(page.id)
-            page_section_map[page_id_str] = []
-            if page.sections:
-                valid_pages_for_gen.append(page)
-                for section in page.sections:
-                    section_id_str = str(section.id)
-                    page_section_map[page_id_str].append(section_id_str)
-                    tasks.append(generate_section_html(section, page, project_context))
-            else:
-                 logging.warning(f"Page '{page.pageName}' (ID: {page.id}) has no sections. Skipping generation for this page.")
-
-        if not tasks:
-             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                                 detail="No sections found in any page of the provided sitemap data.")
-
-        # --- Execute Generation Tasks Concurrently ---
-        logging.info(f"Generating HTML for {len(tasks)} sections across {len(valid_pages_for_gen)} pages concurrently...")
-        results: List[Tuple[str, str, str]] = await asyncio.gather(*tasks, return_exceptions=False)
+        # --- Execute Generation Tasks Concurrently, within the overall time budget ---
+        logging.info(f"Generating HTML for {len(to_generate)} sections across {len(valid_pages_for_gen)} pages concurrently ({len(tasks)} generation units)...")
+        with request_budget(settings.WEBSITE_REQUEST_BUDGET_SECONDS):
+            results: List[List[Tuple[str, str, str]]] = await asyncio.gather(*tasks, return_exceptions=False)
 
         # --- Process Results ---
-        section_html_map: Dict[Tuple[str, str], str] = {} # (page_id, section_id) -> html_string
+        # section_html_map: (page_id, section_id) -> html_string, pre-filled with reused sections
         successful_generations = 0
-        for page_id, section_id, html_content in results:
-            section_html_map[(page_id, section_id)] = html_content
-            if "Error generating content for" not in html_content:
-                successful_generations += 1
-        logging.info(f"Finished gathering results. Successfully generated content for {successful_generations}/{len(tasks)} sections.")
+        for unit_results in results:
+            for page_id, section_id, html_content in unit_results:
+                section_html_map[(page_id, section_id)] = html_content
+                if not is_error_section(html_content):
+                    successful_generations += 1
+        logging.info(f"Finished gathering results. Successfully generated content for {successful_generations}/{len(to_generate)} sections.")
 
         final_page_html_map: Dict[str, str] = {}
+        site_styles = build_site_styles(section_html_map.values())
 
         for page in valid_pages_for_gen:
             page_id_str = str(page.id)
-            page_html_parts = []
-
-            # HTML Boilerplate
-            page_html_parts.append("<!DOCTYPE html>")
-            page_html_parts.append("<html lang='en'>")
-            page_html_parts.append("<head>")
-            page_html_parts.append("  <meta charset='UTF-8'>")
-            # page_html_parts.append("  <meta name='viewport' content='width=device-width, initial-scale=1.0'>")
-            page_html_parts.append('  <script src="https://cdn.tailwindcss.com"></script>')
-            page_html_parts.append(f"  <title>{project_context.get('business_name', '')}</title>")
-            page_html_parts.append("</head>")
-            page_html_parts.append("<body class='bg-gray-100 font-sans'>")
-
-            # page_html_parts.append(f"\n<!-- Start Page Content: {page.pageName} (ID: {page_id_str}) -->")
-            # page_html_parts.append(f"<main id='page-content-{page_id_str}' class='container mx-auto p-4 md:p-8'>")
-            # page_html_parts.append(f"  <h1 class='text-3xl md:text-4xl font-bold mb-6 md:mb-8 text-gray-800'>{page.pageName}</h1>")
-
-            if page_id_str in page_section_map:
-                for section_id_str in page_section_map[page_id_str]:
-                    html_content = section_html_map.get((page_id_str, section_id_str))
-                    if html_content:
-                        page_html_parts.append(f"\n    <!-- Section ID: {section_id_str} -->")
-                        page_html_parts.append(f"    {html_content}")
-                    else:
-                        logging.error(f"Critical: Missing HTML map entry for generated section {section_id_str} on page {page_id_str}")
-                        original_section_title = next((s.title for s in page.sections if str(s.id) == section_id_str), 'Unknown Section')
-                        page_html_parts.append(f"    <section id='section-{page_id_str}-{section_id_str}' class='bg-red-200 p-4 border border-red-400 text-red-800'>Internal error assembling content for section '{original_section_title}'.</section>")
-
-            page_html_parts.append("</main>")
-            page_html_parts.append(f"<!-- End Page Content: {page.pageName} -->\n")
-
-            page_html_parts.append("</body>")
-            page_html_parts.append("</html>")
-
-            final_page_html_map[page_id_str] = "\n".join(page_html_parts)
+            final_page_html_map[page_id_str] = assemble_page_html(page, page_section_map[page_id_str], section_html_map, project_context, site_styles)
             logging.info(f"Assembled HTML for page '{page.pageName}' (ID: {page_id_str})")
 
         if not final_page_html_map:
@@ -203,6 +156,7 @@ async def create_website(
              raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                  detail="Failed to generate or assemble HTML content for the pages.")
 
+        save_website_version(db, actual_project_id, sitemap_db_entry.id, data.sitemap, fingerprints, section_html_map, project_context, current_user.id)
         logging.info(f"Successfully generated and assembled {len(final_page_html_map)} pages for project {actual_project_id}")
 
         return MultiPageWebsiteResponse(page_html_map=final_page_html_map, project_id=actual_project_id)
@@ -215,4 +169,189 @@ async def create_website(
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Invalid data format: {str(ve)}")
     except Exception as e:
         logging.error(f"Unexpected error creating website for sitemap {sitemap_id_from_request} by user {current_user.id}: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error during website creation.")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error during website creation.")
+
+
+async def stream_website_events(
+    data: CreateWebsiteRequest,
+    sitemap_id: int,
+    valid_pages_for_gen: List[PageData],
+    page_section_map: Dict[str, List[str]],
+    project_context: Dict,
+    project_id: int,
+    fingerprints: Dict[Tuple[str, str], str],
+    reused_html: Dict[Tuple[str, str], str],
+    to_generate: List[Tuple[PageData, SectionData]],
+    user_id: int
+) -> AsyncIterator[str]:
+    """
+    Yields NDJSON events: one `section` event per section (unchanged sections first,
+    then each regenerated one as soon as it finishes), a `page` event with the
+    assembled HTML once all sections of a page are done, a `styles` event and a final
+    `done` event. The site's stylesheet depends on every section, so pages carry
+    `SITE_STYLES_PLACEHOLDER` in their <head> and the `styles` event sends the markup
+    that replaces it, once for the whole site. The website version is persisted
+    before `done` is sent.
+    """
+    pages_by_id = {str(page.id): page for page in valid_pages_for_gen}
+    remaining: Dict[str, int] = {page_id: len(page_section_map[page_id]) for page_id in pages_by_id}
+    section_html_map: Dict[Tuple[str, str], str] = {}
+
+    def record(page_id: str, section_id: str, html_content: str) -> List[str]:
+        events = [json.dumps({"event": "section", "page_id": page_id, "section_id": section_id, "html": html_content}) + "\n"]
+        section_html_map[(page_id, section_id)] = html_content
+        remaining[page_id] -= 1
+        if remaining[page_id] == 0:
+            page = pages_by_id[page_id]
+            page_html = assemble_page_html(page, page_section_map[page_id], section_html_map, project_context, SITE_STYLES_PLACEHOLDER)
+            logging.info(f"Assembled HTML for page '{page.pageName}' (ID: {page_id})")
+            events.append(json.dumps({"event": "page", "page_id": page_id, "html": page_html}) + "\n")
+        return events
+
+    with request_budget(settings.WEBSITE_REQUEST_BUDGET_SECONDS):
+        tasks = [
+            asyncio.create_task(unit)
+            for unit in build_generation_units(to_generate, project_context, data.batch_by_page)
+        ]
+    try:
+        for (page_id, section_id), html_content in reused_html.items():
+            for event in record(page_id, section_id, html_content):
+                yield event
+
+        for next_done in asyncio.as_completed(tasks):
+            for page_id, section_id, html_content in await next_done:
+                for event in record(page_id, section_id, html_content):
+                    yield event
+
+        site_styles = build_site_styles(section_html_map.values())
+        yield json.dumps({"event": "styles", "placeholder": SITE_STYLES_PLACEHOLDER, "html": site_styles}) + "\n"
+
+        await asyncio.to_thread(persist_website_in_new_session, project_id, sitemap_id, data.sitemap, fingerprints, section_html_map, project_context, user_id)
+        yield json.dumps({"event": "done", "project_id": project_id, "pages": len(pages_by_id)}) + "\n"
+    finally:
+        # Client went away or generation failed: don't leave LLM calls running.
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+@router.post("/create-website/stream")
+async def create_website_stream(
+    data: CreateWebsiteRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Streaming variant of `/create-website`. Responds with `application/x-ndjson`,
+    emitting each section as it completes instead of waiting for the whole site.
+    """
+    sitemap_id_from_request = data.project_id
+    try:
+        sitemap_db_entry = get_owned_sitemap(db, sitemap_id_from_request, current_user)
+        valid_pages_for_gen, page_section_map = plan_section_generation(data.sitemap)
+        project_context = build_project_context(data, sitemap_db_entry)
+        actual_project_id = sitemap_db_entry.project_id
+        fingerprints, reused_html, to_generate = diff_against_previous(db, actual_project_id, valid_pages_for_gen, project_context)
+    except HTTPException as http_exc:
+        logging.error(f"HTTPException during streamed website creation for sitemap {sitemap_id_from_request}: {http_exc.detail}", exc_info=False)
+        raise http_exc
+
+    logging.info(f"Streaming multi-page website generation for sitemap {sitemap_id_from_request} (Project ID: {actual_project_id}) by user {current_user.id}")
+    return StreamingResponse(
+        stream_website_events(
+            data, sitemap_db_entry.id, valid_pages_for_gen, page_section_map, project_context,
+            actual_project_id, fingerprints, reused_html, to_generate, current_user.id
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/jobs", response_model=WebsiteJobCreatedResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_website_job(
+    data: CreateWebsiteRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queues a website generation and returns immediately with a job id.
+    Poll `GET /website/jobs/{job_id}` for progress and results.
+    """
+    sitemap_id_from_request = data.project_id
+    try:
+        sitemap_db_entry = get_owned_sitemap(db, sitemap_id_from_request, current_user)
+        valid_pages_for_gen, page_section_map = plan_section_generation(data.sitemap)
+        project_context = build_project_context(data, sitemap_db_entry)
+        actual_project_id = sitemap_db_entry.project_id
+        fingerprints, reused_html, to_generate = diff_against_previous(db, actual_project_id, valid_pages_for_gen, project_context)
+
+        job = website_job_queue.submit(WebsiteJob(
+            user_id=current_user.id,
+            project_id=actual_project_id,
+            sitemap_id=sitemap_db_entry.id,
+            sitemap=data.sitemap,
+            pages=valid_pages_for_gen,
+            page_section_map=page_section_map,
+            project_context=project_context,
+            fingerprints=fingerprints,
+            reused_html=reused_html,
+            to_generate=to_generate,
+            batch_by_page=data.batch_by_page,
+        ))
+        return WebsiteJobCreatedResponse(job_id=job.id, status=job.status, project_id=actual_project_id)
+
+    except HTTPException as http_exc:
+        logging.error(f"HTTPException while queueing website job for sitemap {sitemap_id_from_request}: {http_exc.detail}", exc_info=False)
+        raise http_exc
+    except Exception as e:
+        logging.error(f"Unexpected error queueing website job for sitemap {sitemap_id_from_request} by user {current_user.id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error queueing website generation.")
+
+
+@router.get("/jobs/{job_id}", response_model=WebsiteJobStatusResponse)
+async def get_website_job(
+    job_id: str,
+    include_html: bool = True,
+    current_user: User = Depends(get_current_user)
+):
+    """Reports job status, per-section progress and whatever HTML is ready so far."""
+    job = website_job_queue.get(job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job.to_response(include_html=include_html)
+
+
+@router.get("/{project_id}", response_model=MultiPageWebsiteResponse)
+async def get_generated_website(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Returns the last generated website of a project from storage, without calling the LLM."""
+    try:
+        project = db.query(Project).filter(Project.id == project_id, Project.deleted_at.is_(None)).first()
+        if not project:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        if project.created_by != current_user.id:
+            logging.warning(f"Authorization failed: User {current_user.id} tried to access website of project {project_id} owned by {project.created_by}")
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this project")
+
+        website = get_active_website(db, project_id)
+        if not website:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No website has been generated for this project yet")
+
+        sitemap = SitemapStructure.model_validate(website.sitemap_structure)
+        section_html_map = {(stored.page_id, stored.section_id): stored.html_code for stored in website.sections}
+        project_context = {"business_name": website.business_name or project.project_name}
+
+        page_html_map: Dict[str, str] = {}
+        site_styles = build_site_styles(section_html_map.values())
+        for page in sitemap.Pages:
+            if page.sections:
+                page_html_map[str(page.id)] = assemble_page_html(page, [str(s.id) for s in page.sections], section_html_map, project_context, site_styles)
+        return MultiPageWebsiteResponse(page_html_map=page_html_map, project_id=project_id)
+
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logging.error(f"Error loading generated website for project {project_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error loading website")
@@ -0,0 +1,59 @@
+"""
+Strong ETags for project and sitemap reads.
+
+A project's representation only changes when the project row is updated or a new
+sitemap version becomes active, so its ETag is derived from
+`(projects.updated_at, active sitemap id)`. Conditional requests are answered from a
+metadata-only query, before any `sitemap_data` is loaded or serialized.
+"""
+import hashlib
+from typing import Any, Optional
+from fastapi import Response, status
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from app.entities.project_entities import Project
+from app.entities.sitemap_entities import Sitemap
+
+# Clients may keep the representation but must revalidate it before every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def project_etag(project_id: int, updated_at: Any, active_sitemap_id: Optional[int]) -> str:
+    return make_etag("project", project_id, updated_at.isoformat() if updated_at else None, active_sitemap_id)
+
+
+def sitemap_version_etag(project_id: int, sitemap_id: int, is_active: bool) -> str:
+    # A version's content never changes; only whether it is the active one does
+    return make_etag("sitemap", project_id, sitemap_id, bool(is_active))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so a `W/` prefix on either side is ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def get_project_etag_state(db: Session, project_id: int) -> Optional[Any]:
+    """Owner, `updated_at` and active sitemap id of a project; None if it does not exist."""
+    return db.query(Project.created_by, Project.updated_at, Sitemap.id.label("active_sitemap_id"))\
+        .outerjoin(Sitemap, and_(Sitemap.project_id == Project.id, Sitemap.is_active == True))\
+        .filter(Project.id == project_id, Project.deleted_at.is_(None))\
+        .first()
@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from datetime import datetime, timezone
+from enum import Enum
+from types import UnionType
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Type, Union, get_args, get_origin
+from pydantic import BaseModel, ValidationError
+from app.core.settings import settings
+from app.models.sitemap_models import ProjectBrief
+from app.services.llm_providers import LLMProvider, LLMResult
+from app.services.rate_limiter import estimate_tokens
+
+
+class FakeProviderError(Exception):
+    """Simulated provider failure; `status_code` mimics the real clients' errors."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    Offline stand-in for a real provider, selected with targets such as `fake:fake-model`.
+
+    Latency is log-normal around `FAKE_LLM_LATENCY_MEDIAN_SECONDS` (scaled by the number
+    of sections requested), and calls fail with 429 / 503 at the configured rates.
+    Outcomes are seeded from `FAKE_LLM_SEED` and the prompt, so a run is reproducible
+    whatever order concurrent calls happen in. Outputs are canned section HTML, sitemap
+    JSON or an instance of the requested response model, depending on what the prompt asks for.
+    """
+
+    name = "fake"
+
+    def __init__(self):
+        self._prompt_calls: Dict[str, int] = {}
+
+    def _rng(self, system_prompt: Optional[str], user_prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{system_prompt}\x00{user_prompt}".encode("utf-8")).hexdigest()
+        call_number = self._prompt_calls.get(digest, 0)
+        self._prompt_calls[digest] = call_number + 1
+        return random.Random(f"{settings.FAKE_LLM_SEED}:{digest}:{call_number}")
+
+    def _latency(self, rng: random.Random) -> float:
+        return rng.lognormvariate(math.log(settings.FAKE_LLM_LATENCY_MEDIAN_SECONDS), settings.FAKE_LLM_LATENCY_SIGMA)
+
+    def _maybe_fail(self, rng: random.Random) -> None:
+        roll = rng.random()
+        if roll < settings.FAKE_LLM_RATE_LIMIT_RATE:
+            raise FakeProviderError("Simulated rate limit", status_code=429)
+        if roll < settings.FAKE_LLM_RATE_LIMIT_RATE + settings.FAKE_LLM_FAILURE_RATE:
+            raise FakeProviderError("Simulated provider error", status_code=503)
+
+    async def complete(self, model, system_prompt, user_prompt, response_format=None) -> LLMResult:
+        rng = self._rng(system_prompt, user_prompt)
+        section_ids = requested_section_ids(system_prompt or "", user_prompt)
+
+        await asyncio.sleep(self._latency(rng) * max(1.0, 0.6 * len(section_ids)))
+        self._maybe_fail(rng)
+
+        parsed = None
+        if response_format is not None:
+            parsed = fake_structured_output(response_format)
+            text = parsed.model_dump_json()
+        elif section_ids:
+            text = "\n".join(fake_section_html(page_id, section_id, rng) for page_id, section_id in section_ids)
+        else:
+            text = fake_sitemap_json(user_prompt)
+
+        return LLMResult(
+            text=text,
+            provider=self.name,
+            model=model,
+            parsed=parsed,
+            input_tokens=estimate_tokens(system_prompt, user_prompt),
+            output_tokens=estimate_tokens(text),
+        )
+
+    async def stream(self, model, system_prompt, user_prompt) -> AsyncIterator[str]:
+        """Streams canned sitemap JSON: a short time to first token, then evenly paced chunks."""
+        rng = self._rng(system_prompt, user_prompt)
+        latency = self._latency(rng)
+        await asyncio.sleep(latency * 0.2)
+        self._maybe_fail(rng)
+
+        text = fake_sitemap_json(user_prompt)
+        chunk_size = 48
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        for chunk in chunks:
+            await asyncio.sleep(latency * 0.8 / len(chunks))
+            yield chunk
+
+
+def requested_section_ids(system_prompt: str, user_prompt: str) -> List[tuple]:
+    """Reads the `section-{page}-{section}` ids a section prompt (single or batched) asks for."""
+    match = re.search(r'section-(.+?)-([^"\s]+)">', system_prompt)
+    if not match:
+        return []
+    page_id, section_id = match.groups()
+    if section_id == "SECTION_ID":
+        return [(page_id, sid) for sid in re.findall(r"Section ID: (\S+)", user_prompt)]
+    return [(page_id, section_id)]
+
+
+def fake_section_html(page_id: str, section_id: str, rng: random.Random) -> str:
+    color = rng.choice(["blue", "indigo", "emerald", "rose", "amber", "slate"])
+    cards = "\n".join(
+        f"""    <div class="p-6 bg-white rounded-lg shadow-md hover:shadow-lg">
+      <h3 class="text-xl font-semibold text-{color}-700 mb-2">Feature {index + 1}</h3>
+      <p class="text-gray-600 leading-relaxed">Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>
+    </div>"""
+        for index in range(rng.randint(2, 6))
+    )
+    return f"""<section id="section-{page_id}-{section_id}" class="py-16 px-4 md:px-8 bg-{color}-50">
+  <div class="container mx-auto max-w-6xl">
+    <h2 class="text-3xl md:text-4xl font-bold text-center text-gray-900 mb-8">Section {section_id}</h2>
+    <div class="grid grid-cols-1 md:grid-cols-3 gap-6">
+{cards}
+    </div>
+  </div>
+</section>"""
+
+
+def fake_sitemap_json(user_prompt: str) -> str:
+    match = re.search(r"Please write a (\d+)", user_prompt)
+    page_count = int(match.group(1)) if match else 3
+    pages = [
+        {
+            "pageId": str(index + 1),
+            "pageName": "Home" if index == 0 else f"Page {index + 1}",
+            "sections": [
+                {"sectionName": name, "section_description": f"{name} for page {index + 1}", "section_outline": ""}
+                for name in ("Navbar", "Hero Header Section", "Feature Section", "CTA Section", "Footer")
+            ],
+        }
+        for index in range(page_count)
+    ]
+    return "```json\n" + json.dumps({"Sitemap": ", ".join(p["pageName"] for p in pages), "Pages": pages}) + "\n```"
+
+
+# Hand-written outputs for models whose generic placeholder values would be unrealistic
+CANNED_OUTPUTS: Dict[Type[BaseModel], Dict[str, Any]] = {
+    ProjectBrief: {
+        "business_name": "Fake Business",
+        "business_description": "A business description produced by the fake LLM provider.",
+        "website_goal": "Generate leads",
+        "target_audience": "Small businesses",
+        "VisualBrandGuidelines": {
+            "Logo_typeface": [{
+                "name": "Inter",
+                "logo_name": "Fake",
+                "style": {"description": "Clean sans-serif"},
+                "best_for": "Modern brands",
+                "link": "https://fonts.google.com/specimen/Inter",
+                "example": {"css": {"selector": ".logo", "properties": {"font_family": "Inter", "font_size": "24px"}}},
+            }],
+            "font": {"font_family": "Inter", "base_fontsize": 16, "font_weight": [400, 700], "line_height": 24, "typescale_ratio": "1.250"},
+            "colors": {
+                "colors": {"primary_color": "#1d4ed8", "secondary_color": "#f59e0b"},
+                "ColorPalette": 3,
+                "ColorPalette_description": "Complementary",
+            },
+        },
+        "pageCount": 3,
+        "language": "en",
+    },
+}
+
+
+def _placeholder(annotation: Any, name: str) -> Any:
+    """A valid stand-in value for a field annotated with `annotation`."""
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin in (Union, UnionType):
+        options = [arg for arg in args if arg is not type(None)]
+        return _placeholder(options[0], name) if options else None
+    if origin is Literal:
+        return args[0]
+    if origin in (list, set, frozenset, tuple):
+        return [_placeholder(args[0], name)] if args else []
+    if origin is dict:
+        return {}
+    if isinstance(annotation, type):
+        if issubclass(annotation, Enum):
+            return next(iter(annotation)).value
+        if issubclass(annotation, BaseModel):
+            return _placeholder_data(annotation)
+        if issubclass(annotation, bool):
+            return True
+        if issubclass(annotation, (int, float)):
+            return annotation(1)
+        if issubclass(annotation, str):
+            return f"Fake {name}"
+        if issubclass(annotation, datetime):
+            return datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return None
+
+
+def _placeholder_data(model: Type[BaseModel]) -> Dict[str, Any]:
+    return {field.alias or name: _placeholder(field.annotation, name) for name, field in model.model_fields.items()}
+
+
+def fake_structured_output(response_format: Type[BaseModel]) -> BaseModel:
+    """
+    A canned instance of `response_format`: the hand-written one if there is one,
+    otherwise every field filled with a placeholder of its type.
+    """
+    data = CANNED_OUTPUTS.get(response_format)
+    if data is None:
+        data = _placeholder_data(response_format)
+    try:
+        return response_format.model_validate(data)
+    except ValidationError as e:
+        raise TypeError(f"Fake LLM provider cannot build a canned {response_format.__name__}: {e}") from e
@@ -1,17 +1,60 @@
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Type
+from pydantic import BaseModel
 from google import genai
 from google.genai import types
 from app.core.settings import settings
 
-client = genai.Client(api_key=settings.GEMINI_API_KEY)
+GEMINI_MODEL = "gemini-2.0-flash"
+# Budgeted output size for one call, settled against real usage afterwards
+GEMINI_OUTPUT_TOKEN_ESTIMATE = 2048
 
 
-def gemini_llm_call(system_instruction:str, user_input:str):
 
-    response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        config=types.GenerateContentConfig(
-            system_instruction=system_instruction
-        ),
-        contents= user_input
+@lru_cache(maxsize=1)
+def get_client() -> genai.Client:
+    """Creates the Gemini client on first use, so importing this module needs no network setup."""
+    return genai.Client(api_key=settings.GEMINI_API_KEY)
+
+
+async def gemini_llm_call_async(
+    system_instruction: Optional[str],
+    user_input: str,
+    model: str = GEMINI_MODEL,
+    response_schema: Optional[Type[BaseModel]] = None
+):
+    """
+    Generates content through the client's native async API, so concurrent calls
+    overlap instead of stalling the event loop. Rate limiting is
+    left to the caller. With `response_schema`, Gemini is asked for JSON matching that model.
+    """
+    config = types.GenerateContentConfig(system_instruction=system_instruction)
+    if response_schema is not None:
+        config.response_mime_type = "application/json"
+        config.response_schema = response_schema
+
+    return await get_client().aio.models.generate_content(
+        model=model,
+        config=config,
+        contents=user_input
+    )
+
+
+async def gemini_llm_stream_async(
+    system_instruction: Optional[str],
+    user_input: str,
+    model: str = GEMINI_MODEL
+) -> AsyncIterator[str]:
+    """
+    Streams the text of a completion chunk by chunk.
+    """
+    config = types.GenerateContentConfig(system_instruction=system_instruction)
+
+    stream = await get_client().aio.models.generate_content_stream(
+        model=model,
+        config=config,
+        contents=user_input
     )
-    return response
+    async for chunk in stream:
+        if chunk.text:
+            yield chunk.text
@@ -0,0 +1,218 @@
+"""
+Minimal RFC 6902 JSON Patch: `make_patch` diffs two JSON documents and
+`apply_patch` replays a patch (add / remove / replace / move / copy / test).
+"""
+import copy
+from typing import Any, Dict, List
+
+JsonPatch = List[Dict[str, Any]]
+
+
+class JsonPatchError(Exception):
+    """Raised when a patch does not apply to the given document."""
+
+
+def _escape(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _split_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer '{pointer}'")
+    return [_unescape(token) for token in pointer[1:].split("/")]
+
+
+def make_patch(source: Any, target: Any) -> JsonPatch:
+    """
+    Returns a patch turning `source` into `target`. Objects are diffed key by key and
+    arrays are aligned on their unchanged elements, so inserting or removing one page
+    or section yields a single operation instead of rewriting every later element.
+    """
+    patch: JsonPatch = []
+    _diff(source, target, "", patch)
+    return patch
+
+
+def _diff(source: Any, target: Any, path: str, patch: JsonPatch) -> None:
+    if _same(source, target):
+        return
+    if isinstance(source, dict) and isinstance(target, dict):
+        for key in source:
+            if key not in target:
+                patch.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in target.items():
+            if key in source:
+                _diff(source[key], value, f"{path}/{_escape(key)}", patch)
+            else:
+                patch.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": copy.deepcopy(value)})
+        return
+    if isinstance(source, list) and isinstance(target, list):
+        _diff_list(source, target, path, patch)
+        return
+    patch.append({"op": "replace", "path": path, "value": copy.deepcopy(target)})
+
+
+def _diff_list(source: list, target: list, path: str, patch: JsonPatch) -> None:
+    """
+    Aligns the arrays on their longest common subsequence of equal elements, then
+    patches each gap between matches: paired elements are diffed recursively and the
+    rest removed or added. Gaps are handled back to front, so source indices used in
+    paths stay valid while earlier elements are still untouched.
+    """
+    matches = _common_subsequence(source, target)
+    gaps = []
+    source_index = target_index = 0
+    for matched_source, matched_target in matches + [(len(source), len(target))]:
+        if matched_source > source_index or matched_target > target_index:
+            gaps.append((source_index, matched_source, target_index, matched_target))
+        source_index, target_index = matched_source + 1, matched_target + 1
+
+    for source_start, source_end, target_start, target_end in reversed(gaps):
+        shared = min(source_end - source_start, target_end - target_start)
+        for offset in range(shared):
+            _diff(source[source_start + offset], target[target_start + offset], f"{path}/{source_start + offset}", patch)
+        for index in reversed(range(source_start + shared, source_end)):
+            patch.append({"op": "remove", "path": f"{path}/{index}"})
+        for offset in range(shared, target_end - target_start):
+            patch.append({"op": "add", "path": f"{path}/{source_start + offset}", "value": copy.deepcopy(target[target_start + offset])})
+
+
+_MAX_LCS_CELLS = 250_000
+
+
+def _common_subsequence(source: list, target: list) -> List[tuple]:
+    """Index pairs of a longest common subsequence; trims shared ends first to keep the table small."""
+    prefix = 0
+    while prefix < min(len(source), len(target)) and _same(source[prefix], target[prefix]):
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(source), len(target)) - prefix and _same(source[-1 - suffix], target[-1 - suffix]):
+        suffix += 1
+
+    middle_source = source[prefix:len(source) - suffix]
+    middle_target = target[prefix:len(target) - suffix]
+    middle = []
+    if middle_source and middle_target and len(middle_source) * len(middle_target) <= _MAX_LCS_CELLS:
+        rows, cols = len(middle_source), len(middle_target)
+        lengths = [[0] * (cols + 1) for _ in range(rows + 1)]
+        for i in range(rows - 1, -1, -1):
+            for j in range(cols - 1, -1, -1):
+                if _same(middle_source[i], middle_target[j]):
+                    lengths[i][j] = lengths[i + 1][j + 1] + 1
+                else:
+                    lengths[i][j] = max(lengths[i + 1][j], lengths[i][j + 1])
+        i = j = 0
+        while i < rows and j < cols:
+            if _same(middle_source[i], middle_target[j]):
+                middle.append((prefix + i, prefix + j))
+                i += 1
+                j += 1
+            elif lengths[i + 1][j] >= lengths[i][j + 1]:
+                i += 1
+            else:
+                j += 1
+
+    return ([(index, index) for index in range(prefix)]
+            + middle
+            + [(len(source) - suffix + index, len(target) - suffix + index) for index in range(suffix)])
+
+
+def _same(left: Any, right: Any) -> bool:
+    """JSON equality: unlike `==`, 1, 1.0 and true differ, also inside containers."""
+    if left != right or type(left) is not type(right):
+        return False
+    if isinstance(left, dict):
+        return all(_same(value, right[key]) for key, value in left.items())
+    if isinstance(left, list):
+        return all(_same(a, b) for a, b in zip(left, right))
+    return True
+
+
+def apply_patch(document: Any, patch: JsonPatch) -> Any:
+    """Applies `patch` to a copy of `document` and returns the result."""
+    document = copy.deepcopy(document)
+    for operation in patch:
+        op = operation.get("op")
+        path = operation.get("path")
+        if path is None:
+            raise JsonPatchError(f"Patch operation without a path: {operation}")
+        if op == "add":
+            document = _add(document, path, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            document, _ = _remove(document, path)
+        elif op == "replace":
+            document, _ = _remove(document, path)
+            document = _add(document, path, copy.deepcopy(operation["value"]))
+        elif op == "move":
+            document, value = _remove(document, operation["from"])
+            document = _add(document, path, value)
+        elif op == "copy":
+            document = _add(document, path, copy.deepcopy(_get(document, operation["from"])))
+        elif op == "test":
+            if _get(document, path) != operation["value"]:
+                raise JsonPatchError(f"Test failed at '{path}'")
+        else:
+            raise JsonPatchError(f"Unsupported patch operation '{op}'")
+    return document
+
+
+def _resolve_parent(document: Any, path: str):
+    tokens = _split_pointer(path)
+    if not tokens:
+        return None, None
+    parent = document
+    for token in tokens[:-1]:
+        parent = _child(parent, token)
+    return parent, tokens[-1]
+
+
+def _child(container: Any, token: str) -> Any:
+    try:
+        if isinstance(container, list):
+            return container[int(token)]
+        return container[token]
+    except (KeyError, IndexError, ValueError, TypeError):
+        raise JsonPatchError(f"Path segment '{token}' not found")
+
+
+def _get(document: Any, path: str) -> Any:
+    value = document
+    for token in _split_pointer(path):
+        value = _child(value, token)
+    return value
+
+
+def _add(document: Any, path: str, value: Any) -> Any:
+    parent, token = _resolve_parent(document, path)
+    if token is None:
+        return value
+    if isinstance(parent, list):
+        index = len(parent) if token == "-" else int(token)
+        if not 0 <= index <= len(parent):
+            raise JsonPatchError(f"Index {index} out of range at '{path}'")
+        parent.insert(index, value)
+    elif isinstance(parent, dict):
+        parent[token] = value
+    else:
+        raise JsonPatchError(f"Cannot add at '{path}'")
+    return document
+
+
+def _remove(document: Any, path: str):
+    parent, token = _resolve_parent(document, path)
+    if token is None:
+        return None, document
+    if isinstance(parent, list):
+        try:
+            return document, parent.pop(int(token))
+        except (IndexError, ValueError):
+            raise JsonPatchError(f"Index '{token}' out of range at '{path}'")
+    if isinstance(parent, dict) and token in parent:
+        return document, parent.pop(token)
+    raise JsonPatchError(f"Nothing to remove at '{path}'")
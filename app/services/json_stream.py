@@ -0,0 +1,169 @@
+"""
+Incremental parsing for JSON that an LLM is still writing.
+
+`StreamingArrayParser` is fed text as it streams in and hands back each element of
+a top-level array (e.g. the sitemap's `Pages`) as soon as that element is complete.
+`repair_json` turns the final, possibly fenced or truncated, text into a value by
+closing whatever the model left open.
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class _Scanner:
+    """
+    Character-level JSON tokenizer state: string/escape flags and the stack of open
+    containers. It only tracks structure, so it never fails on malformed input.
+    """
+
+    def __init__(self):
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escaped = False
+        self.string_start = 0
+
+    def step(self, text: str, index: int) -> Optional[str]:
+        """Consumes `text[index]`; returns the structural character if it was one."""
+        char = text[index]
+        if self.in_string:
+            if self.escaped:
+                self.escaped = False
+            elif char == "\\":
+                self.escaped = True
+            elif char == '"':
+                self.in_string = False
+                return '"'
+            return None
+        if char == '"':
+            self.in_string = True
+            self.string_start = index
+            return None
+        if char in "{[":
+            self.stack.append(char)
+            return char
+        if char in "}]":
+            if self.stack:
+                self.stack.pop()
+            return char
+        if char in ",:":
+            return char
+        return None
+
+
+class StreamingArrayParser:
+    """
+    Emits the elements of the array stored under `key` in the root object while the
+    document is still streaming. Text before the root object (such as a ```json
+    fence) and after it is ignored; the key is matched case-insensitively.
+    """
+
+    def __init__(self, key: str):
+        self.key = key.lower()
+        self.text = ""
+        self._position = 0
+        self._scanner = _Scanner()
+        self._started = False
+        self._finished = False
+        self._last_root_string: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._element_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Adds streamed text and returns the array elements completed by it."""
+        self.text += chunk
+        completed = []
+        scanner = self._scanner
+        while self._position < len(self.text) and not self._finished:
+            index = self._position
+            self._position += 1
+            if not self._started:
+                if self.text[index] != "{":
+                    continue
+                self._started = True
+
+            token = scanner.step(self.text, index)
+            if token is None:
+                continue
+            depth = len(scanner.stack)
+            if token == '"' and depth == 1:
+                try:
+                    self._last_root_string = json.loads(self.text[scanner.string_start:index + 1])
+                except json.JSONDecodeError:
+                    self._last_root_string = None
+            elif token == "[" and depth == 2 and self._array_depth is None and isinstance(self._last_root_string, str) \
+                    and self._last_root_string.lower() == self.key:
+                self._array_depth = depth
+            elif token in "{[" and self._array_depth is not None and depth == self._array_depth + 1:
+                self._element_start = index
+            elif token in "}]" and self._element_start is not None and depth == self._array_depth:
+                try:
+                    completed.append(json.loads(self.text[self._element_start:index + 1]))
+                except json.JSONDecodeError:
+                    pass
+                self._element_start = None
+            elif token == "]" and depth == 1 and self._array_depth is not None:
+                self._array_depth = -1
+            elif token == "}" and depth == 0:
+                self._finished = True
+        return completed
+
+
+def strip_code_fences(text: str) -> str:
+    """Drops a surrounding ```json ... ``` fence and any prose around the JSON value."""
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        return text.strip()
+    text = text[min(starts):]
+    fence = text.rfind("```")
+    if fence != -1:
+        text = text[:fence]
+    return text.strip()
+
+
+def _close(prefix: str, stack: List[str]) -> str:
+    prefix = prefix.rstrip()
+    if prefix.endswith(","):
+        prefix = prefix[:-1]
+    elif prefix.endswith(":"):
+        prefix += " null"
+    return prefix + "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+
+def repair_json(text: str, max_attempts: int = 64) -> Tuple[Any, bool]:
+    """
+    Parses LLM output that may be fenced or cut off mid-value. Returns the value and
+    whether a repair was needed. Truncated output is closed at the end first; if that
+    still does not parse, it is cut back to earlier element boundaries until it does.
+    Raises `json.JSONDecodeError` when nothing parseable can be recovered.
+    """
+    text = strip_code_fences(text)
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError as e:
+        error = e
+
+    scanner = _Scanner()
+    # (cut index, open containers at that point): places where the text can end cleanly
+    boundaries: List[Tuple[int, List[str]]] = []
+    for index in range(len(text)):
+        token = scanner.step(text, index)
+        if token == ",":
+            boundaries.append((index, list(scanner.stack)))
+        elif token in ("{", "["):
+            boundaries.append((index + 1, list(scanner.stack)))
+        elif token in ("}", "]") and scanner.stack:
+            boundaries.append((index + 1, list(scanner.stack)))
+
+    candidates = []
+    tail = text
+    if scanner.in_string:
+        tail = (tail[:-1] if scanner.escaped else tail) + '"'
+    candidates.append(_close(tail, scanner.stack))
+    candidates.extend(_close(text[:cut], stack) for cut, stack in reversed(boundaries[-max_attempts:]))
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate), True
+        except json.JSONDecodeError:
+            continue
+    raise error
@@ -0,0 +1,24 @@
+"""
+Opaque cursors for keyset pagination over `(created_at, id)`, newest first.
+
+A page is fetched with `WHERE (created_at, id) < cursor ORDER BY created_at DESC, id DESC`,
+so each page is one index range scan however deep into the listing it is.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for a cursor that was not produced by `encode_cursor`."""
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
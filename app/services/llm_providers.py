@@ -0,0 +1,100 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional, Type
+from pydantic import BaseModel
+from app.services.geminillm_service import gemini_llm_call_async, gemini_llm_stream_async, GEMINI_OUTPUT_TOKEN_ESTIMATE
+from app.services.llm_service import openai_llm_call_async, openai_llm_stream_async, OPENAI_OUTPUT_TOKEN_ESTIMATE
+
+
+class LLMResult:
+    """Provider-independent outcome of one LLM call."""
+
+    def __init__(
+        self,
+        text: Optional[str],
+        provider: str,
+        model: str,
+        parsed: Optional[BaseModel] = None,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None
+    ):
+        self.text = text
+        self.provider = provider
+        self.model = model
+        self.parsed = parsed
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+
+
+class LLMProvider(ABC):
+    """A backend that can serve plain-text and structured completions."""
+
+    name: str
+    # Output tokens budgeted against the provider's rate limit before a call's real usage is known
+    output_token_estimate: int = 2048
+
+    @abstractmethod
+    async def complete(
+        self,
+        model: str,
+        system_prompt: Optional[str],
+        user_prompt: str,
+        response_format: Optional[Type[BaseModel]] = None
+    ) -> LLMResult:
+        """Runs one completion; with `response_format`, `LLMResult.parsed` holds the parsed model."""
+
+    @abstractmethod
+    def stream(self, model: str, system_prompt: Optional[str], user_prompt: str) -> AsyncIterator[str]:
+        """Yields the text of a plain completion as the provider produces it."""
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+    output_token_estimate = GEMINI_OUTPUT_TOKEN_ESTIMATE
+
+    async def complete(self, model, system_prompt, user_prompt, response_format=None) -> LLMResult:
+        response = await gemini_llm_call_async(
+            system_instruction=system_prompt,
+            user_input=user_prompt,
+            model=model,
+            response_schema=response_format,
+        )
+        parsed = None
+        if response_format is not None:
+            parsed = response.parsed if isinstance(response.parsed, response_format) else response_format.model_validate_json(response.text)
+        usage = response.usage_metadata
+        return LLMResult(
+            text=response.text,
+            provider=self.name,
+            model=model,
+            parsed=parsed,
+            input_tokens=usage.prompt_token_count if usage else None,
+            output_tokens=usage.candidates_token_count if usage else None,
+        )
+
+    def stream(self, model, system_prompt, user_prompt) -> AsyncIterator[str]:
+        return gemini_llm_stream_async(system_instruction=system_prompt, user_input=user_prompt, model=model)
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+    output_token_estimate = OPENAI_OUTPUT_TOKEN_ESTIMATE
+
+    async def complete(self, model, system_prompt, user_prompt, response_format=None) -> LLMResult:
+        response = await openai_llm_call_async(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            model=model,
+            response_format=response_format,
+        )
+        message = response.choices[0].message
+        return LLMResult(
+            text=message.content,
+            provider=self.name,
+            model=model,
+            parsed=getattr(message, "parsed", None),
+            input_tokens=response.usage.prompt_tokens if response.usage else None,
+            output_tokens=response.usage.completion_tokens if response.usage else None,
+        )
+
+    def stream(self, model, system_prompt, user_prompt) -> AsyncIterator[str]:
+        return openai_llm_stream_async(user_prompt=user_prompt, system_prompt=system_prompt, model=model)
@@ -0,0 +1,212 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import AsyncExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncContextManager, Awaitable, Callable, Deque, Dict, Iterator, Optional, Tuple
+from app.core.config import logging
+from app.core.settings import settings
+from app.services.rate_limiter import is_rate_limit_error
+
+
+class RequestBudget:
+    """Wall-clock deadline shared by every LLM call made on behalf of one request."""
+
+    def __init__(self, seconds: float):
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+
+# Copied into every task spawned while it is set, so all section tasks see the same budget
+current_budget: ContextVar[Optional[RequestBudget]] = ContextVar("current_budget", default=None)
+
+
+@contextmanager
+def request_budget(seconds: float) -> Iterator[RequestBudget]:
+    """Applies an overall time budget to the LLM calls started inside the block."""
+    budget = RequestBudget(seconds)
+    token = current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        current_budget.reset(token)
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies, used to pick the hedging delay."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if len(self._samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+_latency_trackers: Dict[str, LatencyTracker] = {}
+
+
+def get_latency_tracker(operation: str) -> LatencyTracker:
+    tracker = _latency_trackers.get(operation)
+    if tracker is None:
+        tracker = _latency_trackers[operation] = LatencyTracker()
+    return tracker
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Timeouts, rate limits, server errors and connection problems are worth retrying."""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)) or is_rate_limit_error(exc):
+        return True
+    status_code = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if isinstance(status_code, int):
+        return status_code >= 500
+    # Client-library network errors (httpx, openai, genai) without a status code
+    return "Connection" in type(exc).__name__ or "Timeout" in type(exc).__name__
+
+
+class BudgetExhaustedError(asyncio.TimeoutError):
+    """The request's time budget ran out; raised so the provider is not blamed for it."""
+
+
+async def _admitted_call(
+    func: Callable[..., Awaitable[Any]],
+    args: tuple,
+    kwargs: dict,
+    admission: Optional[Callable[[], AsyncContextManager]],
+    budget: Optional[RequestBudget],
+    admitted: asyncio.Event
+) -> Tuple[Any, float]:
+    """
+    Waits for `admission` (bounded only by the request budget), then awaits the call
+    with the per-attempt timeout. Returns the result and the time spent in the call itself.
+    """
+    async with AsyncExitStack() as stack:
+        if admission is not None:
+            try:
+                async with asyncio.timeout(budget.remaining() if budget is not None else None):
+                    await stack.enter_async_context(admission())
+            except TimeoutError:
+                raise BudgetExhaustedError("Request time budget ran out while waiting for a provider slot")
+
+        timeout = settings.LLM_CALL_TIMEOUT_SECONDS
+        limited_by_budget = budget is not None and budget.remaining() < timeout
+        if limited_by_budget:
+            timeout = budget.remaining()
+            if timeout <= 0:
+                raise BudgetExhaustedError("Request time budget ran out before the provider call started")
+
+        admitted.set()
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(func(*args, **kwargs), timeout=timeout)
+        except asyncio.TimeoutError:
+            if limited_by_budget:
+                raise BudgetExhaustedError("Request time budget ran out during the provider call")
+            raise
+        return result, time.monotonic() - started
+
+
+async def _hedged(
+    call: Callable[[asyncio.Event], Awaitable[Any]],
+    hedge_after: Optional[float],
+    call_stats: "CallStats"
+) -> Any:
+    """
+    Runs `call`; if it has not finished `hedge_after` seconds after it was admitted,
+    starts a duplicate and returns whichever succeeds first, cancelling the other.
+    `call` sets the event it is given once it holds its slot and the provider call starts.
+    """
+    admitted = asyncio.Event()
+    primary = asyncio.ensure_future(call(admitted))
+    pending = {primary}
+    try:
+        if hedge_after is not None:
+            admitted_wait = asyncio.ensure_future(admitted.wait())
+            try:
+                await asyncio.wait({primary, admitted_wait}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                admitted_wait.cancel()
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=hedge_after)
+            if not primary.done():
+                logging.info(f"LLM call exceeded p95 latency ({hedge_after:.1f}s); sending hedged request")
+                call_stats.hedged = True
+                pending.add(asyncio.ensure_future(call(asyncio.Event())))
+
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class CallStats:
+    """Filled in by `resilient_call` so callers can report how a call went."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.hedged = False
+        # Time the successful call spent with the provider, excluding waits for a slot
+        self.latency: Optional[float] = None
+
+
+async def resilient_call(
+    operation: str,
+    func: Callable[..., Awaitable[Any]],
+    *args,
+    admission: Optional[Callable[[], AsyncContextManager]] = None,
+    call_stats: Optional[CallStats] = None,
+    **kwargs
+) -> Any:
+    """
+    Awaits `func(*args, **kwargs)` with a per-attempt timeout, bounded retries with
+    exponential backoff and full jitter, optional hedging past the p95 latency of
+    `operation`, and the caller's overall `request_budget` if one is active.
+
+    Each attempt (and hedge) first enters `admission()`, e.g. a rate-limiter slot.
+    Waiting there is local queueing, not provider time: only the request budget bounds
+    it, and the timeout, hedging delay and recorded latency start once it is admitted.
+    Running out of budget raises `BudgetExhaustedError` and is never retried.
+    """
+    call_stats = call_stats if call_stats is not None else CallStats()
+    tracker = get_latency_tracker(operation)
+    budget = current_budget.get()
+    max_attempts = settings.LLM_MAX_RETRIES + 1
+
+    for attempt in range(1, max_attempts + 1):
+        if budget is not None and budget.remaining() <= 0:
+            raise BudgetExhaustedError(f"Request time budget exhausted before {operation} attempt {attempt}")
+
+        hedge_after = tracker.percentile(0.95) if settings.LLM_HEDGE_ENABLED else None
+        call_stats.attempts = attempt
+        try:
+            result, latency = await _hedged(
+                lambda admitted: _admitted_call(func, args, kwargs, admission, budget, admitted),
+                hedge_after,
+                call_stats,
+            )
+            tracker.record(latency)
+            call_stats.latency = latency
+            return result
+        except Exception as e:
+            if attempt == max_attempts or isinstance(e, BudgetExhaustedError) or not is_retryable_error(e):
+                raise
+            delay = random.uniform(0, min(settings.LLM_RETRY_MAX_DELAY_SECONDS, settings.LLM_RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1)))
+            if budget is not None and delay >= budget.remaining():
+                raise
+            logging.warning(f"{operation} attempt {attempt}/{max_attempts} failed ({type(e).__name__}: {e}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
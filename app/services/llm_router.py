@@ -0,0 +1,212 @@
+import asyncio
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Type
+from pydantic import BaseModel
+from app.core.config import logging
+from app.core.settings import settings
+from app.services.llm_providers import LLMProvider, LLMResult, GeminiProvider, OpenAIProvider
+from app.services.fake_llm_provider import FakeLLMProvider
+from app.services.llm_resilience import resilient_call, CallStats, BudgetExhaustedError
+from app.services.llm_telemetry import record_llm_call
+from app.services.rate_limiter import estimate_tokens, get_provider_limiter
+
+
+class LLMUnavailableError(Exception):
+    """Raised when every configured provider failed for a call."""
+
+
+class LLMTarget:
+    """A provider/model pair, written as `provider:model` in settings."""
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+    @classmethod
+    def parse_list(cls, spec: str) -> List["LLMTarget"]:
+        targets = []
+        for item in spec.split(","):
+            item = item.strip()
+            if item:
+                provider, _, model = item.partition(":")
+                targets.append(cls(provider.strip(), model.strip()))
+        return targets
+
+
+class TargetHealth:
+    """
+    Rolling health of one provider/model: smoothed error rate and latency per operation.
+    Repeated failures open a circuit that takes the target out of rotation for a cooldown.
+    """
+
+    def __init__(self):
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.latency: Dict[str, float] = {}
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() >= self.open_until
+
+    def record_success(self, operation: str, latency: float) -> None:
+        self.consecutive_failures = 0
+        self.error_rate *= 0.9
+        previous = self.latency.get(operation)
+        self.latency[operation] = latency if previous is None else 0.8 * previous + 0.2 * latency
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.error_rate = 0.9 * self.error_rate + 0.1
+        if self.consecutive_failures >= settings.LLM_CIRCUIT_FAILURE_THRESHOLD:
+            self.open_until = time.monotonic() + settings.LLM_CIRCUIT_COOLDOWN_SECONDS
+
+
+class LLMRouter:
+    """
+    Sends each call to the fastest healthy target among the ones a caller allows,
+    failing over to the next target when a call fails after its retries.
+
+    Targets without latency data keep their configured order, so the first target
+    is the default until others have been measured through failover. Every provider
+    call holds a slot of that provider's limiter, which is the only concurrency cap,
+    so a throttled provider never holds back calls to another one. Time spent waiting
+    for a slot counts against neither the call timeout nor the target's latency and health.
+    """
+
+    def __init__(self, providers: Dict[str, LLMProvider]):
+        self.providers = providers
+        self._health: Dict[str, TargetHealth] = {}
+
+    def health(self, target: LLMTarget) -> TargetHealth:
+        health = self._health.get(target.key)
+        if health is None:
+            health = self._health[target.key] = TargetHealth()
+        return health
+
+    def rank(self, targets: List[LLMTarget], operation: str) -> List[LLMTarget]:
+        def sort_key(indexed):
+            index, target = indexed
+            health = self.health(target)
+            return (not health.is_healthy(), health.latency.get(operation, float("inf")), index)
+
+        return [target for _, target in sorted(enumerate(targets), key=sort_key)]
+
+    async def complete(
+        self,
+        operation: str,
+        targets: List[LLMTarget],
+        user_prompt: str,
+        system_prompt: Optional[str] = None,
+        response_format: Optional[Type[BaseModel]] = None
+    ) -> LLMResult:
+        last_error: Optional[BaseException] = None
+        for target in self.rank(targets, operation):
+            provider = self.providers.get(target.provider)
+            if provider is None:
+                logging.error(f"Unknown LLM provider '{target.provider}' in target {target.key}")
+                continue
+            health = self.health(target)
+            limiter = get_provider_limiter(provider.name)
+            estimated_tokens = estimate_tokens(system_prompt, user_prompt) + provider.output_token_estimate
+            call_stats = CallStats()
+            started = time.monotonic()
+            try:
+                result = await resilient_call(
+                    f"{target.key}:{operation}",
+                    provider.complete,
+                    target.model,
+                    system_prompt,
+                    user_prompt,
+                    response_format,
+                    admission=lambda: limiter.slot(estimated_tokens),
+                    call_stats=call_stats,
+                )
+            except BudgetExhaustedError as e:
+                # Out of time, most likely while queued locally; no other target would fare better
+                record_llm_call(operation, target.provider, target.model, time.monotonic() - started, call_stats.attempts, exc=e)
+                raise LLMUnavailableError(f"Request time budget exhausted during {operation}") from e
+            except Exception as e:
+                health.record_failure()
+                record_llm_call(operation, target.provider, target.model, time.monotonic() - started, call_stats.attempts, exc=e)
+                last_error = e
+                logging.warning(f"LLM target {target.key} failed for {operation} ({type(e).__name__}: {e}); trying next target")
+                continue
+            health.record_success(operation, call_stats.latency)
+            if result.input_tokens is not None and result.output_tokens is not None:
+                limiter.settle(estimated_tokens, result.input_tokens + result.output_tokens)
+            record_llm_call(operation, target.provider, target.model, time.monotonic() - started, call_stats.attempts, result.input_tokens, result.output_tokens)
+            return result
+
+        raise LLMUnavailableError(f"All LLM targets failed for {operation}: {last_error}")
+
+    async def stream(
+        self,
+        operation: str,
+        targets: List[LLMTarget],
+        user_prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streams a plain completion from the best available target.
+
+        Failover happens only until the first chunk arrives; once text has been
+        yielded, a failure mid-stream is raised to the caller, which already holds
+        the partial output.
+        """
+        last_error: Optional[BaseException] = None
+        for target in self.rank(targets, operation):
+            provider = self.providers.get(target.provider)
+            if provider is None:
+                logging.error(f"Unknown LLM provider '{target.provider}' in target {target.key}")
+                continue
+            health = self.health(target)
+            received: List[str] = []
+            limiter = get_provider_limiter(provider.name)
+            estimated_tokens = estimate_tokens(system_prompt, user_prompt) + provider.output_token_estimate
+            async with limiter.slot(estimated_tokens) as call, aclosing(provider.stream(target.model, system_prompt, user_prompt)) as chunks:
+                # Timed from here so the wait for a limiter slot does not count as provider latency
+                started = time.monotonic()
+                try:
+                    first_chunk = await asyncio.wait_for(anext(chunks, ""), timeout=settings.LLM_CALL_TIMEOUT_SECONDS)
+                except Exception as e:
+                    call.record_failure(e)
+                    health.record_failure()
+                    record_llm_call(operation, target.provider, target.model, time.monotonic() - started, 1, exc=e)
+                    last_error = e
+                    logging.warning(f"LLM target {target.key} failed to start streaming {operation} ({type(e).__name__}: {e}); trying next target")
+                    continue
+
+                try:
+                    received.append(first_chunk)
+                    yield first_chunk
+                    async for chunk in chunks:
+                        received.append(chunk)
+                        yield chunk
+                    call.actual_tokens = estimate_tokens(system_prompt, user_prompt) + estimate_tokens("".join(received))
+                except Exception as e:
+                    health.record_failure()
+                    record_llm_call(operation, target.provider, target.model, time.monotonic() - started, 1,
+                                    estimate_tokens(system_prompt, user_prompt), estimate_tokens("".join(received)), exc=e)
+                    raise
+            latency = time.monotonic() - started
+            health.record_success(operation, latency)
+            record_llm_call(operation, target.provider, target.model, latency, 1,
+                            estimate_tokens(system_prompt, user_prompt), estimate_tokens("".join(received)))
+            return
+
+        raise LLMUnavailableError(f"All LLM targets failed for {operation}: {last_error}")
+
+
+llm_router = LLMRouter(providers={
+    GeminiProvider.name: GeminiProvider(),
+    OpenAIProvider.name: OpenAIProvider(),
+    FakeLLMProvider.name: FakeLLMProvider(),
+})
+
+SECTION_TARGETS = LLMTarget.parse_list(settings.LLM_SECTION_TARGETS)
+SITEMAP_TARGETS = LLMTarget.parse_list(settings.LLM_SITEMAP_TARGETS)
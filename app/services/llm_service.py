@@ -1,56 +1,72 @@
 from app.core.settings import settings
-from app.core.config import logging
-from typing import Optional
-from openai import OpenAI
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Type
+from pydantic import BaseModel
+from openai import AsyncOpenAI
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+OPENAI_MODEL = "o3-mini-2025-01-31"
+# Budgeted output size for one call, settled against real usage afterwards
+OPENAI_OUTPUT_TOKEN_ESTIMATE = 4096
 
 
 
-# Configure logging
+@lru_cache(maxsize=1)
+def get_async_client() -> AsyncOpenAI:
+    """Creates the async OpenAI client on first use; it is shared by every coroutine in the process."""
+    return AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
 
-def get_llm_response(user_prompt: str, system_prompt: str, response_format) -> Optional[dict]:
+def _build_messages(user_prompt: str, system_prompt: Optional[str]) -> list:
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": user_prompt})
+    return messages
+
+
+async def openai_llm_call_async(
+    user_prompt: str,
+    system_prompt: Optional[str] = None,
+    model: str = OPENAI_MODEL,
+    response_format: Optional[Type[BaseModel]] = None
+):
     """
-    Sends a request to OpenAI's chat completion API with a system prompt and user input.
-    
-    :param user_prompt: The prompt provided by the user.
-    :param system_prompt: Instructions to guide the LLM response.
-    :param response_format: Expected response format.
-    :return: Parsed LLM response or None in case of failure.
+    Chat completion on the async client, so concurrent calls overlap without holding a
+    worker thread each. Uses structured parsing when `response_format` is set. Retries,
+    failover and rate limiting are left to the caller; errors propagate.
+
+    :return: The OpenAI completion object.
     """
-    try:
-        response = client.beta.chat.completions.parse(
-            model="o3-mini-2025-01-31",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+    messages = _build_messages(user_prompt, system_prompt)
+    client = get_async_client()
+
+    if response_format is not None:
+        return await client.beta.chat.completions.parse(
+            model=model,
+            messages=messages,
             response_format=response_format
         )
-        res = response.choices[0].message.parsed
-        return res
-    except Exception as e:
-        logging.error(f"Error during OpenAI API call: {e}")
-        return None
+    return await client.chat.completions.create(
+        model=model,
+        messages=messages,
+    )
 
 
-def get_llm_response_without_fmt(user_prompt: str) -> Optional[str]:
+async def openai_llm_stream_async(
+    user_prompt: str,
+    system_prompt: Optional[str] = None,
+    model: str = OPENAI_MODEL
+) -> AsyncIterator[str]:
     """
-    Sends a request to OpenAI's chat completion API without a system prompt or response format.
-    
-    :param user_prompt: The prompt provided by the user.
-    :return: Raw LLM response content or None in case of failure.
+    Streams the text of a chat completion delta by delta.
     """
-    try:
-        response = client.chat.completions.create(
-            model="o3-mini-2025-01-31",
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ],
-        )
-        res = response.choices[0].message.content
-        return res
-    except Exception as e:
-        logging.error(f"Error during OpenAI API call: {e}")
-        return None
+    messages = _build_messages(user_prompt, system_prompt)
+
+    stream = await get_async_client().chat.completions.create(
+        model=model,
+        messages=messages,
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from app.core.config import logging
+from app.services.metrics import metrics_registry
+from app.services.rate_limiter import is_rate_limit_error
+
+# USD per million (input, output) tokens; unknown models are reported with zero cost
+MODEL_PRICES_PER_MILLION: Dict[str, Tuple[float, float]] = {
+    "gemini-2.0-flash": (0.10, 0.40),
+    "o3-mini-2025-01-31": (1.10, 4.40),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+LLM_LABELS = ("route", "provider", "model", "operation")
+
+llm_calls_total = metrics_registry.counter(
+    "llm_calls_total", "LLM calls by outcome.", LLM_LABELS + ("outcome",))
+llm_call_latency_seconds = metrics_registry.histogram(
+    "llm_call_latency_seconds", "LLM call latency including retries.", LLM_LABELS)
+llm_tokens_total = metrics_registry.counter(
+    "llm_tokens_total", "Tokens sent to and received from LLM providers.", LLM_LABELS + ("direction",))
+llm_retries_total = metrics_registry.counter(
+    "llm_retries_total", "Retried LLM call attempts.", LLM_LABELS)
+llm_cost_usd_total = metrics_registry.counter(
+    "llm_cost_usd_total", "Estimated LLM spend in USD.", LLM_LABELS)
+
+
+class RequestLLMUsage:
+    """LLM usage accumulated over one HTTP request, logged when the response completes."""
+
+    def __init__(self, route: str):
+        self.route = route
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+        self.llm_seconds = 0.0
+
+
+current_route: ContextVar[str] = ContextVar("current_route", default="background")
+current_usage: ContextVar[Optional[RequestLLMUsage]] = ContextVar("current_usage", default=None)
+
+
+def call_outcome(exc: Optional[BaseException]) -> str:
+    if exc is None:
+        return "success"
+    if is_rate_limit_error(exc):
+        return "rate_limited"
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    return "error"
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICES_PER_MILLION.get(model, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def record_llm_call(
+    operation: str,
+    provider: str,
+    model: str,
+    latency: float,
+    attempts: int,
+    input_tokens: Optional[int] = None,
+    output_tokens: Optional[int] = None,
+    exc: Optional[BaseException] = None
+) -> None:
+    """Exports one (possibly retried) provider call as metrics and adds it to the request summary."""
+    labels = {"route": current_route.get(), "provider": provider, "model": model, "operation": operation}
+    input_tokens = input_tokens or 0
+    output_tokens = output_tokens or 0
+    retries = max(0, attempts - 1)
+    cost = estimate_cost(model, input_tokens, output_tokens)
+
+    llm_calls_total.inc(outcome=call_outcome(exc), **labels)
+    llm_call_latency_seconds.observe(latency, **labels)
+    llm_tokens_total.inc(input_tokens, direction="input", **labels)
+    llm_tokens_total.inc(output_tokens, direction="output", **labels)
+    if retries:
+        llm_retries_total.inc(retries, **labels)
+    if cost:
+        llm_cost_usd_total.inc(cost, **labels)
+
+    usage = current_usage.get()
+    if usage is not None:
+        usage.calls += 1
+        usage.failures += 1 if exc is not None else 0
+        usage.retries += retries
+        usage.input_tokens += input_tokens
+        usage.output_tokens += output_tokens
+        usage.cost_usd += cost
+        usage.llm_seconds += latency
+
+
+class LLMTelemetryMiddleware:
+    """
+    ASGI middleware that tags LLM calls with the request path and logs a per-request
+    usage summary once the response, including any streamed body, has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        usage = RequestLLMUsage(route=f"{scope['method']} {scope['path']}")
+        route_token = current_route.set(usage.route)
+        usage_token = current_usage.set(usage)
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(route_token)
+            current_usage.reset(usage_token)
+            if usage.calls:
+                logging.info(
+                    f"LLM usage for {usage.route}: {usage.calls} calls ({usage.failures} failed, {usage.retries} retries), "
+                    f"{usage.input_tokens} input / {usage.output_tokens} output tokens, ~${usage.cost_usd:.4f}, "
+                    f"{usage.llm_seconds:.1f}s LLM time over {time.monotonic() - started:.1f}s wall time"
+                )
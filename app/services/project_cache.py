@@ -0,0 +1,204 @@
+import json
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+from cachetools import TTLCache
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session, joinedload
+from app.core.config import logging
+from app.core.settings import settings
+from app.entities.project_entities import Project
+from app.services.etags import project_etag
+from app.services.metrics import metrics_registry
+
+project_cache_lookups_total = metrics_registry.counter(
+    "project_cache_lookups_total", "Project + active sitemap cache lookups by outcome.", ("outcome",))
+
+
+class MemoryBackend:
+    """
+    Per-process LRU with TTL. Each worker keeps its own copy and only sees its own
+    invalidations, so this is for single-worker deployments.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self._values: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self._generations: TTLCache = TTLCache(maxsize=4 * max_entries, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._values.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._values[key] = value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+    def generation(self, key: str) -> int:
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def bump_generation(self, key: str) -> None:
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+
+class RedisBackend:
+    """Redis store shared by all workers, so an invalidation is seen by every process."""
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "brikly:project-cache:"):
+        import redis  # optional dependency, only needed when PROJECT_CACHE_REDIS_URL is set
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        # from_url connects lazily; fail here rather than on every request if Redis is down
+        self._client.ping()
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        self._client.set(self.prefix + key, json.dumps(value), ex=self.ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+    def generation(self, key: str) -> int:
+        return int(self._client.get(f"{self.prefix}gen:{key}") or 0)
+
+    def bump_generation(self, key: str) -> None:
+        pipeline = self._client.pipeline()
+        pipeline.incr(f"{self.prefix}gen:{key}")
+        pipeline.expire(f"{self.prefix}gen:{key}", self.ttl_seconds)
+        pipeline.execute()
+
+
+# Fields served by GET /projects/{id}; storage internals such as a sitemap's
+# version_number, storage_kind and sitemap_patch are never cached or returned
+PROJECT_FIELDS = ("id", "project_name", "created_at", "created_by", "updated_at", "updated_by", "deleted_at", "deleted_by")
+ACTIVE_SITEMAP_FIELDS = (
+    "id", "project_id", "project_description", "no_of_pages", "sitemap_data", "is_active",
+    "created_at", "created_by", "updated_at", "updated_by", "deleted_at", "deleted_by",
+)
+
+
+def _fields(entity: Any, fields: tuple) -> Dict[str, Any]:
+    return jsonable_encoder({field: getattr(entity, field) for field in fields})
+
+
+class ProjectCache:
+    """
+    Read-through cache of a project together with its active sitemap.
+
+    Values are JSON-safe dicts `{"project", "active_sitemap", "etag"}`, keyed by project
+    id, plus a `sitemap id -> project id` entry so the active sitemap can be found by
+    its own id. The rows only change through sitemap saves and project edits and
+    deletes, which call `invalidate` after committing. A load that raced with an
+    invalidation is discarded instead of caching the rows it read before the write.
+    Backend errors are logged and treated as misses; the database stays the source of truth.
+    """
+
+    def __init__(self, enabled: bool, max_entries: int, ttl_seconds: int, redis_url: Optional[str] = None):
+        self.enabled = enabled
+        self._backend: Any = MemoryBackend(max_entries, ttl_seconds)
+        if enabled and redis_url:
+            try:
+                self._backend = RedisBackend(redis_url, ttl_seconds)
+                logging.info("Project cache is shared through Redis")
+            except Exception as e:
+                # A per-process fallback would serve other workers' stale rows, so run uncached instead
+                logging.error(f"PROJECT_CACHE_REDIS_URL is set but Redis is unavailable ({e}); project cache disabled")
+                self.enabled = False
+
+    def get_cached(self, project_id: int) -> Optional[Dict[str, Any]]:
+        """The cached aggregate, without touching the database."""
+        if not self.enabled:
+            return None
+        try:
+            value = self._backend.get(f"project:{project_id}")
+        except Exception as e:
+            logging.warning(f"Project cache read failed for project {project_id}: {e}")
+            value = None
+        project_cache_lookups_total.inc(outcome="hit" if value is not None else "miss")
+        return value
+
+    def get_by_active_sitemap(self, sitemap_id: int) -> Optional[Dict[str, Any]]:
+        """The cached aggregate whose active sitemap is `sitemap_id`, if any."""
+        if not self.enabled:
+            return None
+        try:
+            project_id = self._backend.get(f"sitemap:{sitemap_id}")
+        except Exception as e:
+            logging.warning(f"Project cache read failed for sitemap {sitemap_id}: {e}")
+            project_id = None
+        if project_id is None:
+            project_cache_lookups_total.inc(outcome="miss")
+            return None
+        value = self.get_cached(project_id)
+        if value is None or not value["active_sitemap"] or value["active_sitemap"]["id"] != sitemap_id:
+            return None
+        return value
+
+    def load(self, db: Session, project_id: int) -> Optional[Dict[str, Any]]:
+        """Reads the aggregate from the database and caches it. None if there is no live project."""
+        key = f"project:{project_id}"
+        generation = self._generation(key)
+        project = db.query(Project)\
+                    .options(joinedload(Project.active_sitemap))\
+                    .filter(Project.id == project_id, Project.deleted_at.is_(None))\
+                    .first()
+        if project is None:
+            return None
+
+        active_sitemap = project.active_sitemap
+        value = {
+            "project": _fields(project, PROJECT_FIELDS),
+            "active_sitemap": _fields(active_sitemap, ACTIVE_SITEMAP_FIELDS) if active_sitemap else None,
+            "etag": project_etag(project.id, project.updated_at, active_sitemap.id if active_sitemap else None),
+        }
+        if self.enabled:
+            try:
+                self._backend.set(key, value)
+                if active_sitemap:
+                    self._backend.set(f"sitemap:{active_sitemap.id}", project_id)
+                if self._backend.generation(key) != generation:
+                    # invalidated while we were reading; what we loaded may predate the write
+                    self._backend.delete(key)
+            except Exception as e:
+                logging.warning(f"Project cache write failed for project {project_id}: {e}")
+        return value
+
+    def invalidate(self, project_id: int) -> None:
+        if not self.enabled:
+            return
+        key = f"project:{project_id}"
+        try:
+            self._backend.bump_generation(key)
+            self._backend.delete(key)
+        except Exception as e:
+            logging.error(f"Project cache invalidation failed for project {project_id}: {e}")
+
+    def _generation(self, key: str) -> Optional[int]:
+        try:
+            return self._backend.generation(key) if self.enabled else None
+        except Exception:
+            return None
+
+
+def active_sitemap_view(value: Dict[str, Any]) -> SimpleNamespace:
+    """The cached active sitemap with its `project`, readable like the ORM entities."""
+    return SimpleNamespace(**value["active_sitemap"], project=SimpleNamespace(**value["project"]))
+
+
+project_cache = ProjectCache(
+    enabled=settings.PROJECT_CACHE_ENABLED,
+    max_entries=settings.PROJECT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PROJECT_CACHE_TTL_SECONDS,
+    redis_url=settings.PROJECT_CACHE_REDIS_URL,
+)
@@ -0,0 +1,81 @@
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import func, literal, tuple_
+from sqlalchemy.orm import Session
+from app.entities.project_entities import Project
+from app.services.keyset import decode_cursor, encode_cursor
+
+# Columns shown in the project list; sitemaps and audit columns are left out
+PROJECT_LIST_COLUMNS = (
+    Project.id,
+    Project.project_name,
+    Project.created_at,
+    Project.updated_at,
+    Project.created_by,
+)
+
+
+def list_user_projects(
+    db: Session,
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> Tuple[List[Any], Optional[str], Optional[int]]:
+    """
+    Returns one page of the user's projects, newest first, the cursor for the next page
+    and, if asked for, the user's total project count. Pages are keyed on
+    (created_at, id) and read from `ix_projects_created_by_created_at_id`, so a page
+    costs the same however many projects the user has.
+    """
+    query = db.query(*PROJECT_LIST_COLUMNS).filter(Project.created_by == user_id, Project.deleted_at.is_(None))
+    if cursor:
+        created_at, project_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Project.created_at, Project.id) < tuple_(created_at, project_id))
+    rows = query.order_by(Project.created_at.desc(), Project.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    total = None
+    if include_total:
+        total = db.query(func.count(Project.id)).filter(Project.created_by == user_id, Project.deleted_at.is_(None)).scalar()
+    return rows, next_cursor, total
+
+# Queries shorter than a trigram only use prefix matching; fuzzy matches would be noise
+MIN_FUZZY_QUERY_LENGTH = 3
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_user_projects(db: Session, user_id: int, query: str, limit: int, offset: int = 0) -> Tuple[List[Any], Optional[int]]:
+    """
+    Ranked search over the names of the user's projects: prefix matches (ILIKE 'q%')
+    first, then fuzzy matches by pg_trgm word similarity (`q <% project_name`), best
+    first. Both predicates are answered by the trigram GIN index
+    `ix_projects_created_by_project_name_trgm`, which also carries `created_by`, so
+    only the user's own matching rows are visited. Returns the page and the offset
+    of the next one (None on the last page).
+    """
+    query = query.strip()
+    prefix_match = Project.project_name.ilike(_escape_like(query) + "%", escape="\\")
+    similarity = func.word_similarity(literal(query), Project.project_name)
+    matches = prefix_match
+    if len(query) >= MIN_FUZZY_QUERY_LENGTH:
+        matches = prefix_match | literal(query).op("<%")(Project.project_name)
+
+    rows = db.query(*PROJECT_LIST_COLUMNS, similarity.label("score"))\
+        .filter(Project.created_by == user_id, Project.deleted_at.is_(None), matches)\
+        .order_by(prefix_match.desc(), similarity.desc(), Project.created_at.desc(), Project.id.desc())\
+        .offset(offset)\
+        .limit(limit + 1)\
+        .all()
+
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+    return rows, next_offset
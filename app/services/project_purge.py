@@ -0,0 +1,126 @@
+import asyncio
+import time
+from datetime import timedelta
+from typing import Any, List, Optional
+from sqlalchemy import Select, delete, func, select
+from sqlalchemy.orm import Session
+from app.core.config import logging
+from app.core.db_setup import SessionLocal
+from app.core.settings import settings
+from app.entities.project_entities import Project
+from app.entities.sitemap_entities import Sitemap
+from app.entities.website_entities import Website, WebsiteSection
+from app.services.metrics import metrics_registry
+
+project_purge_rows_total = metrics_registry.counter(
+    "project_purge_rows_total", "Rows hard-deleted by the soft-deleted project purge, by table.", ("table",))
+
+
+class ProjectPurgeWorker:
+    """
+    Background task that hard-deletes soft-deleted projects.
+
+    Deleting a project only stamps `deleted_at`. Every `interval_seconds` this worker
+    takes up to `projects_per_run` projects deleted more than `grace_seconds` ago and
+    removes their website sections, websites and sitemap versions, children first, in
+    DELETEs of at most `batch_size` rows, each committed on its own with a short pause
+    in between. Locks are held and WAL is written a small batch at a time instead of
+    in one cascade, and the project row goes last so nothing is left orphaned.
+    Purging is idempotent, so an interrupted run is simply picked up by the next one.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        interval_seconds: int,
+        grace_seconds: int,
+        projects_per_run: int,
+        batch_size: int,
+        batch_pause_seconds: float
+    ):
+        self.enabled = enabled
+        self.interval_seconds = interval_seconds
+        self.grace_seconds = grace_seconds
+        self.projects_per_run = projects_per_run
+        self.batch_size = batch_size
+        self.batch_pause_seconds = batch_pause_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if not self.enabled:
+            logging.info("Project purge worker disabled")
+            return
+        self._task = asyncio.create_task(self._loop(), name="project-purge-worker")
+        logging.info(f"Started project purge worker (every {self.interval_seconds}s, grace {self.grace_seconds}s)")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                purged = await asyncio.to_thread(self.purge_once)
+                if purged:
+                    logging.info(f"Purged {purged} soft-deleted projects")
+            except Exception as e:
+                logging.error(f"Project purge run failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    def purge_once(self) -> int:
+        """Purges one run's worth of expired tombstones; returns how many projects were removed."""
+        db = SessionLocal()
+        try:
+            project_ids = db.scalars(self.expired_tombstones()).all()
+            for project_id in project_ids:
+                self._purge_project(db, project_id)
+            return len(project_ids)
+        finally:
+            db.close()
+
+    def expired_tombstones(self) -> Select:
+        """Ids of projects deleted more than `grace_seconds` ago, oldest first, at most one run's worth."""
+        return select(Project.id)\
+            .where(Project.deleted_at.is_not(None), Project.deleted_at < func.now() - timedelta(seconds=self.grace_seconds))\
+            .order_by(Project.deleted_at)\
+            .limit(self.projects_per_run)
+
+    def _purge_project(self, db: Session, project_id: int) -> None:
+        website_ids = select(Website.id).where(Website.project_id == project_id)
+        self._delete_in_batches(db, WebsiteSection, WebsiteSection.website_id.in_(website_ids))
+        self._delete_in_batches(db, Website, Website.project_id == project_id)
+        self._delete_in_batches(db, Sitemap, Sitemap.project_id == project_id)
+        # Guarded on deleted_at in case the tombstone was cleared in the meantime
+        self._delete_rows(db, Project, [Project.id == project_id, Project.deleted_at.is_not(None)])
+
+    def _delete_in_batches(self, db: Session, model: Any, condition: Any) -> None:
+        while self._delete_rows(db, model, [condition], limit=self.batch_size) == self.batch_size:
+            time.sleep(self.batch_pause_seconds)
+
+    @staticmethod
+    def _delete_rows(db: Session, model: Any, conditions: List[Any], limit: Optional[int] = None) -> int:
+        batch = select(model.id).where(*conditions)
+        if limit is not None:
+            batch = batch.limit(limit)
+        try:
+            deleted = db.execute(delete(model).where(model.id.in_(batch))).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if deleted:
+            project_purge_rows_total.inc(deleted, table=model.__tablename__)
+        return deleted
+
+
+project_purge_worker = ProjectPurgeWorker(
+    enabled=settings.PROJECT_PURGE_ENABLED,
+    interval_seconds=settings.PROJECT_PURGE_INTERVAL_SECONDS,
+    grace_seconds=settings.PROJECT_PURGE_GRACE_SECONDS,
+    projects_per_run=settings.PROJECT_PURGE_PROJECTS_PER_RUN,
+    batch_size=settings.PROJECT_PURGE_BATCH_SIZE,
+    batch_pause_seconds=settings.PROJECT_PURGE_BATCH_PAUSE_SECONDS,
+)
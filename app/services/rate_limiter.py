@@ -0,0 +1,187 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from app.core.config import logging
+from app.core.settings import settings
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True for provider 429 / quota errors from either the OpenAI or the Gemini client."""
+    for attr in ("status_code", "code", "status"):
+        if getattr(exc, attr, None) in (429, "429", "RESOURCE_EXHAUSTED"):
+            return True
+    return "RateLimit" in type(exc).__name__
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return max(1, sum(len(text) for text in texts if text) // 4)
+
+
+class TokenBucket:
+    """
+    Refills `rate_per_minute` units per minute up to `capacity`. `acquire` waits until
+    enough units are available; `adjust` settles estimates once real usage is known
+    and may push the balance negative, which delays later callers.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate_per_second)
+
+    def adjust(self, delta: float) -> None:
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - delta)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit: grows by roughly one slot per limit's worth of successful
+    calls, and is multiplied by `decrease_factor` on a rate-limit error or when a call
+    takes more than `latency_spike_factor` times the smoothed latency.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        decrease_factor: float = 0.5,
+        latency_spike_factor: float = 3.0
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency: Optional[float], rate_limited: bool) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            if rate_limited:
+                self._decrease("rate limited")
+            elif latency is not None:
+                if self.latency_ewma is not None and latency > self.latency_spike_factor * self.latency_ewma:
+                    self._decrease(f"latency spike {latency:.1f}s vs {self.latency_ewma:.1f}s avg")
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            self._condition.notify_all()
+
+    def _decrease(self, reason: str) -> None:
+        previous = self.limit
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        logging.warning(f"LLM concurrency limit lowered from {previous:.1f} to {self.limit:.1f}: {reason}")
+
+
+class ProviderLimiter:
+    """Request/token budgets plus adaptive concurrency for one LLM provider."""
+
+    def __init__(self, name: str, requests_per_minute: int, tokens_per_minute: int, min_concurrency: int, max_concurrency: int):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial_limit=max_concurrency,
+            min_limit=min_concurrency,
+            max_limit=max_concurrency,
+        )
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int) -> AsyncIterator["ProviderCall"]:
+        """
+        Waits for request, token and concurrency budget, then yields a `ProviderCall`
+        the caller can use to report actual token usage. An exception raised out of the
+        slot counts as a failed call; a caller that handles the error inside the slot
+        reports it with `ProviderCall.record_failure` instead.
+        """
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+        await self.concurrency.acquire()
+        call = ProviderCall(estimated_tokens)
+        started = time.monotonic()
+        failed = False
+        rate_limited = False
+        try:
+            yield call
+        except BaseException as e:
+            failed = True
+            rate_limited = is_rate_limit_error(e)
+            raise
+        finally:
+            failed = failed or call.failed
+            rate_limited = rate_limited or call.rate_limited
+            # Only successful calls feed the latency signal
+            latency = None if failed else time.monotonic() - started
+            if call.actual_tokens is not None:
+                self.settle(estimated_tokens, call.actual_tokens)
+            await self.concurrency.release(latency, rate_limited)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Corrects the token budget once a call's real usage is known."""
+        self.tokens.adjust(actual_tokens - estimated_tokens)
+
+
+class ProviderCall:
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens: Optional[int] = None
+        self.failed = False
+        self.rate_limited = False
+
+    def record_failure(self, exc: BaseException) -> None:
+        """Marks the call as failed, so it neither counts as a latency sample nor hides a 429."""
+        self.failed = True
+        self.rate_limited = self.rate_limited or is_rate_limit_error(exc)
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+
+PROVIDER_LIMITS = {
+    "gemini": (settings.GEMINI_REQUESTS_PER_MINUTE, settings.GEMINI_TOKENS_PER_MINUTE),
+    "openai": (settings.OPENAI_REQUESTS_PER_MINUTE, settings.OPENAI_TOKENS_PER_MINUTE),
+    "fake": (settings.FAKE_LLM_REQUESTS_PER_MINUTE, settings.FAKE_LLM_TOKENS_PER_MINUTE),
+}
+
+
+def get_provider_limiter(provider: str) -> ProviderLimiter:
+    """Returns the process-wide limiter for `provider`, creating it on first use."""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        requests_per_minute, tokens_per_minute = PROVIDER_LIMITS[provider]
+        limiter = ProviderLimiter(
+            name=provider,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            min_concurrency=settings.LLM_MIN_CONCURRENCY,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        )
+        _limiters[provider] = limiter
+    return limiter
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+from datetime import timedelta
+from typing import Optional
+from cachetools import TTLCache
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from app.core.db_setup import SessionLocal
+from app.core.settings import settings
+from app.core.config import logging
+from app.entities.section_cache_entities import SectionHtmlCacheEntry
+
+
+def make_cache_key(system_prompt: str, user_prompt: str, model_name: str) -> str:
+    """Content address for a section: identical prompts on the same model map to the same key."""
+    digest = hashlib.sha256()
+    for part in (model_name, system_prompt, user_prompt):
+        encoded = part.encode("utf-8")
+        # length-prefix each part so ("ab", "c") and ("a", "bc") never collide
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class SectionHtmlCache:
+    """
+    Two-tier cache for generated section HTML.
+
+    The in-process tier is an LRU bounded by `max_entries` and `ttl_seconds`.
+    On a miss it falls back to the `section_html_cache` table, which survives
+    restarts and is shared by every worker. Database errors are logged and
+    treated as misses so caching can never fail a generation.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, persist: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self._memory: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+
+    async def get(self, cache_key: str) -> Optional[str]:
+        html_code = self._memory.get(cache_key)
+        if html_code is not None:
+            return html_code
+        if not self.persist:
+            return None
+        try:
+            html_code = await asyncio.to_thread(self._db_get, cache_key)
+        except Exception as e:
+            logging.warning(f"Section cache lookup failed for key {cache_key}: {e}")
+            return None
+        if html_code is not None:
+            self._memory[cache_key] = html_code
+        return html_code
+
+    async def set(self, cache_key: str, html_code: str, model_name: str) -> None:
+        self._memory[cache_key] = html_code
+        if not self.persist:
+            return
+        try:
+            await asyncio.to_thread(self._db_set, cache_key, html_code, model_name)
+        except Exception as e:
+            logging.warning(f"Section cache write failed for key {cache_key}: {e}")
+
+    def _db_get(self, cache_key: str) -> Optional[str]:
+        db = SessionLocal()
+        try:
+            row = db.query(SectionHtmlCacheEntry.html_code)\
+                    .filter(SectionHtmlCacheEntry.cache_key == cache_key)\
+                    .filter(SectionHtmlCacheEntry.created_at >= func.now() - timedelta(seconds=self.ttl_seconds))\
+                    .first()
+            return row.html_code if row else None
+        finally:
+            db.close()
+
+    def _db_set(self, cache_key: str, html_code: str, model_name: str) -> None:
+        stmt = insert(SectionHtmlCacheEntry).values(
+            cache_key=cache_key,
+            model_name=model_name,
+            html_code=html_code,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SectionHtmlCacheEntry.cache_key],
+            set_={"html_code": stmt.excluded.html_code, "created_at": func.now()},
+        )
+        db = SessionLocal()
+        try:
+            db.execute(stmt)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+section_html_cache = SectionHtmlCache(
+    max_entries=settings.SECTION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SECTION_CACHE_TTL_SECONDS,
+    persist=settings.SECTION_CACHE_PERSIST,
+)
@@ -0,0 +1,84 @@
+"""
+Questions about sitemap contents answered inside Postgres over the JSONB
+`sitemap_data` of active versions, instead of loading rows into Python.
+
+Sitemaps follow the generator's shape: {"Pages": [{"sections": [{"sectionName": ...}]}]}.
+"""
+from typing import Any, List, Optional
+from sqlalchemy import cast, func, literal, literal_column, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH
+from sqlalchemy.orm import Session
+from app.entities.project_entities import Project
+from app.entities.sitemap_entities import Sitemap
+
+_sitemap_json = type_coerce(Sitemap.sitemap_data, JSONB)
+
+
+def _path(jsonpath: str):
+    # Lax-mode jsonpath skips pages/sections of the wrong shape instead of erroring
+    return cast(literal(jsonpath), JSONPATH)
+
+
+def find_projects_with_section(db: Session, user_id: int, section_name: str, limit: int = 50) -> List[Any]:
+    """
+    Projects whose active sitemap has a section named exactly `section_name`. The
+    containment test (`@>`) is answered by the GIN index on active sitemaps.
+    """
+    containment = {"Pages": [{"sections": [{"sectionName": section_name}]}]}
+    query = (
+        select(Sitemap.project_id, Project.project_name, Sitemap.id.label("sitemap_id"))
+        .join(Project, Project.id == Sitemap.project_id)
+        .where(Sitemap.is_active == True,
+               Project.created_by == user_id,
+               Project.deleted_at.is_(None),
+               _sitemap_json.contains(containment))
+        .order_by(Sitemap.project_id)
+        .limit(limit)
+    )
+    return db.execute(query).all()
+
+
+def section_usage(db: Session, user_id: int, limit: int = 50) -> List[Any]:
+    """How often each section name appears across the user's active sitemaps, most used first."""
+    names = (
+        select(Sitemap.project_id, func.jsonb_path_query(_sitemap_json, _path("$.Pages[*].sections[*].sectionName")).label("name"))
+        .join(Project, Project.id == Sitemap.project_id)
+        .where(Sitemap.is_active == True, Project.created_by == user_id, Project.deleted_at.is_(None))
+        .subquery()
+    )
+    section_name = names.c.name.op("#>>")(literal_column("'{}'"))
+    query = (
+        select(section_name.label("section_name"),
+               func.count().label("occurrences"),
+               func.count(func.distinct(names.c.project_id)).label("projects"))
+        .group_by(section_name)
+        .order_by(func.count().desc(), section_name)
+        .limit(limit)
+    )
+    return db.execute(query).all()
+
+
+def page_counts(
+    db: Session,
+    user_id: int,
+    min_pages: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    limit: int = 50
+) -> List[Any]:
+    """Page and section counts of each active sitemap, optionally filtered by page count."""
+    page_count = func.jsonb_array_length(func.jsonb_path_query_array(_sitemap_json, _path("$.Pages[*]")))
+    section_count = func.jsonb_array_length(func.jsonb_path_query_array(_sitemap_json, _path("$.Pages[*].sections[*]")))
+
+    query = (
+        select(Sitemap.project_id, Project.project_name, Sitemap.id.label("sitemap_id"),
+               page_count.label("page_count"), section_count.label("section_count"))
+        .join(Project, Project.id == Sitemap.project_id)
+        .where(Sitemap.is_active == True, Project.created_by == user_id, Project.deleted_at.is_(None))
+        .order_by(Sitemap.project_id)
+        .limit(limit)
+    )
+    if min_pages is not None:
+        query = query.where(page_count >= min_pages)
+    if max_pages is not None:
+        query = query.where(page_count <= max_pages)
+    return db.execute(query).all()
@@ -0,0 +1,157 @@
+import copy
+import hashlib
+import itertools
+import random
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+from cachetools import TTLCache
+from app.core.config import logging
+from app.core.settings import settings
+from app.models.sitemap_models import SitemapGenerator
+from app.services.metrics import metrics_registry
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+sitemap_reuse_lookups_total = metrics_registry.counter(
+    "sitemap_reuse_lookups_total", "Brief/sitemap reuse cache lookups by outcome.", ("kind", "outcome"))
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercases and collapses punctuation/whitespace so cosmetic edits don't change the text."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).split())
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashed character `size`-grams of `text`."""
+    if len(text) <= size:
+        grams = {text}
+    else:
+        grams = {text[i:i + size] for i in range(len(text) - size + 1)}
+    return {int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "big") for gram in grams}
+
+
+class MinHasher:
+    """MinHash signatures over hashed shingles, from fixed random permutations."""
+
+    def __init__(self, num_permutations: int = NUM_PERMUTATIONS, seed: int = 1):
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_permutations)
+        ]
+
+    def signature(self, shingle_hashes: Set[int]) -> Tuple[int, ...]:
+        if not shingle_hashes:
+            return tuple([_MAX_HASH] * len(self.permutations))
+        return tuple(
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in shingle_hashes)
+            for a, b in self.permutations
+        )
+
+    @staticmethod
+    def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of the two shingle sets."""
+        return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+class _Entry:
+    def __init__(self, signature: Tuple[int, ...], value: Any):
+        self.signature = signature
+        self.value = value
+
+
+class SimilarityReuseCache:
+    """
+    Reuses generated project briefs and sitemaps across near-duplicate requests.
+
+    Requests are compared on `business_name` + `business_description`, normalized and
+    shingled, with MinHash signatures indexed by LSH bands so a lookup only scores
+    the few entries that share a band. A stored value is returned when its estimated
+    similarity reaches `threshold` and its scope matches: briefs only depend on the
+    business text, while sitemaps must also agree on page count, language and prompt.
+    Entries expire after `ttl_seconds` and the least recently used are evicted past
+    `max_entries`.
+    """
+
+    def __init__(self, threshold: float, max_entries: int, ttl_seconds: int):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._hasher = MinHasher()
+        self._entries: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self._bands: Dict[Tuple[str, int, Tuple[int, ...]], Set[int]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def business_text(data: SitemapGenerator) -> str:
+        return f"{normalize_text(data.business_name)} | {normalize_text(data.business_description)}"
+
+    @staticmethod
+    def scope(kind: str, data: SitemapGenerator) -> str:
+        if kind == "brief":
+            return kind
+        return f"{kind}|{data.page}|{normalize_text(data.language)}|{normalize_text(data.sitemap_prompt)}"
+
+    def _band_keys(self, scope: str, signature: Tuple[int, ...]) -> List[Tuple[str, int, Tuple[int, ...]]]:
+        return [(scope, band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]) for band in range(LSH_BANDS)]
+
+    def get(self, kind: str, data: SitemapGenerator) -> Optional[Any]:
+        scope = self.scope(kind, data)
+        signature = self._hasher.signature(shingles(self.business_text(data)))
+        best_value, best_similarity = None, 0.0
+        with self._lock:
+            for band_key in self._band_keys(scope, signature):
+                entry_ids = self._bands.get(band_key)
+                if not entry_ids:
+                    continue
+                for entry_id in list(entry_ids):
+                    entry = self._entries.get(entry_id)
+                    if entry is None:
+                        # expired or evicted since it was indexed
+                        entry_ids.discard(entry_id)
+                        continue
+                    similarity = MinHasher.similarity(signature, entry.signature)
+                    if similarity > best_similarity:
+                        best_value, best_similarity = entry.value, similarity
+                if not entry_ids:
+                    del self._bands[band_key]
+
+        if best_value is not None and best_similarity >= self.threshold:
+            sitemap_reuse_lookups_total.inc(kind=kind, outcome="hit")
+            logging.info(f"Reusing cached {kind} for '{data.business_name}' (similarity {best_similarity:.2f})")
+            return copy.deepcopy(best_value)
+        sitemap_reuse_lookups_total.inc(kind=kind, outcome="miss")
+        return None
+
+    def set(self, kind: str, data: SitemapGenerator, value: Any) -> None:
+        scope = self.scope(kind, data)
+        signature = self._hasher.signature(shingles(self.business_text(data)))
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = _Entry(signature, copy.deepcopy(value))
+            for band_key in self._band_keys(scope, signature):
+                self._bands.setdefault(band_key, set()).add(entry_id)
+            if len(self._bands) > 4 * LSH_BANDS * self.max_entries:
+                self._prune()
+
+    def _prune(self) -> None:
+        """Drops band postings of entries the TTL cache has already let go."""
+        for band_key in list(self._bands):
+            live = {entry_id for entry_id in self._bands[band_key] if entry_id in self._entries}
+            if live:
+                self._bands[band_key] = live
+            else:
+                del self._bands[band_key]
+
+
+sitemap_reuse_cache = SimilarityReuseCache(
+    threshold=settings.SITEMAP_REUSE_THRESHOLD,
+    max_entries=settings.SITEMAP_REUSE_MAX_ENTRIES,
+    ttl_seconds=settings.SITEMAP_REUSE_TTL_SECONDS,
+)
@@ -0,0 +1,191 @@
+import json
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import and_, case, exists, func, insert, literal, null, select, true, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import logging
+from app.core.settings import settings
+from app.entities.project_entities import Project
+from app.entities.sitemap_entities import Sitemap
+from app.services.json_patch import JsonPatch, apply_patch, make_patch
+from app.services.keyset import decode_cursor, encode_cursor
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+
+def choose_storage(version_number: int, previous_data: Any, sitemap_data: Any) -> Tuple[str, Optional[JsonPatch]]:
+    """
+    Decides how a new version is stored: a snapshot for the first version, every
+    `SITEMAP_SNAPSHOT_INTERVAL` versions after it (bounding how many patches a read
+    replays), or whenever the patch would not be much smaller than the document.
+    Otherwise a JSON-Patch from the previous version.
+    """
+    interval = settings.SITEMAP_SNAPSHOT_INTERVAL
+    if previous_data is None or interval <= 1 or (version_number - 1) % interval == 0:
+        return SNAPSHOT, None
+    patch = make_patch(previous_data, sitemap_data)
+    if len(json.dumps(patch)) * 2 >= len(json.dumps(sitemap_data)):
+        return SNAPSHOT, None
+    return DELTA, patch
+
+
+def load_sitemap_data(db: Session, sitemap: Sitemap) -> Optional[Any]:
+    """
+    Returns the full sitemap JSON of any version. Snapshots and the active version
+    are stored materialized; other versions are rebuilt from the nearest earlier
+    snapshot by replaying the patches in between.
+    """
+    if sitemap.storage_kind != DELTA or sitemap.sitemap_data is not None:
+        return sitemap.sitemap_data
+
+    snapshot_version = db.query(func.max(Sitemap.version_number))\
+        .filter(Sitemap.project_id == sitemap.project_id,
+                Sitemap.version_number < sitemap.version_number,
+                Sitemap.storage_kind == SNAPSHOT)\
+        .scalar()
+    if snapshot_version is None:
+        logging.error(f"No snapshot found to rebuild sitemap version {sitemap.version_number} of project {sitemap.project_id}")
+        return None
+
+    chain = db.query(Sitemap.storage_kind, Sitemap.sitemap_data, Sitemap.sitemap_patch)\
+        .filter(Sitemap.project_id == sitemap.project_id,
+                Sitemap.version_number >= snapshot_version,
+                Sitemap.version_number <= sitemap.version_number)\
+        .order_by(Sitemap.version_number)\
+        .all()
+    document = chain[0].sitemap_data
+    for row in chain[1:]:
+        document = apply_patch(document, row.sitemap_patch or [])
+    return document
+
+
+class SitemapSwapConflict(Exception):
+    """Raised when another save replaced the project's active sitemap first."""
+
+
+def get_swap_base(db: Session, project_id: int) -> Optional[Any]:
+    """
+    The project's owner and name plus its active version (id, number, storage kind and
+    materialized data), in one query. None if the project does not exist; the sitemap
+    columns are None if it has no active version yet.
+    """
+    return db.query(Project.created_by, Project.project_name,
+                    Sitemap.id.label("sitemap_id"), Sitemap.version_number,
+                    Sitemap.storage_kind, Sitemap.sitemap_data)\
+        .outerjoin(Sitemap, and_(Sitemap.project_id == Project.id, Sitemap.is_active == True))\
+        .filter(Project.id == project_id, Project.deleted_at.is_(None))\
+        .first()
+
+
+def swap_active_sitemap(
+    db: Session,
+    project_id: int,
+    base: Any,
+    sitemap_data: Any,
+    user_id: int,
+    project_name: Optional[str] = None,
+    **columns
+) -> Any:
+    """
+    Replaces the active version read in `base` (see `get_swap_base`) with a new one in a
+    single statement, without committing:
+
+        WITH deactivated AS (UPDATE sitemap ... WHERE id = :active_id AND is_active RETURNING id),
+             renamed AS (UPDATE projects ... RETURNING id)
+        INSERT INTO sitemap (...) SELECT ... WHERE EXISTS (SELECT id FROM deactivated)
+        RETURNING id, version_number
+
+    No row lock is taken. If a concurrent save deactivated that version first, the
+    UPDATE matches nothing and nothing is inserted, so the new version (and any patch
+    computed against `base`) is never stored on top of the wrong predecessor. A race on
+    a project's first version is caught by the partial unique index on active versions.
+    Either case raises `SitemapSwapConflict`; returns the new row's id and version_number.
+    """
+    version_number = (base.version_number or 0) + 1
+    storage_kind, patch = choose_storage(version_number, base.sitemap_data, sitemap_data)
+
+    next_version = select(func.coalesce(func.max(Sitemap.version_number), 0) + 1)\
+        .where(Sitemap.project_id == project_id)\
+        .scalar_subquery()
+    values = {
+        Sitemap.project_id: literal(project_id, Sitemap.project_id.type),
+        Sitemap.version_number: next_version,
+        Sitemap.storage_kind: literal(storage_kind, Sitemap.storage_kind.type),
+        Sitemap.sitemap_patch: literal(patch, Sitemap.sitemap_patch.type) if patch is not None else null(),
+        Sitemap.sitemap_data: literal(sitemap_data, Sitemap.sitemap_data.type),
+        Sitemap.is_active: true(),
+        Sitemap.created_by: literal(user_id, Sitemap.created_by.type),
+        Sitemap.updated_by: literal(user_id, Sitemap.updated_by.type),
+    }
+    for name, value in columns.items():
+        column = getattr(Sitemap, name)
+        values[column] = literal(value, column.type)
+    source = select(*values.values())
+
+    ctes = []
+    if base.sitemap_id is not None:
+        deactivated = update(Sitemap)\
+            .where(Sitemap.id == base.sitemap_id, Sitemap.is_active == True)\
+            .values(is_active=False,
+                    # a delta keeps only its patch once it stops being the active version
+                    sitemap_data=case((Sitemap.storage_kind == DELTA, null()), else_=Sitemap.sitemap_data),
+                    updated_by=user_id)\
+            .returning(Sitemap.id)\
+            .cte("deactivated")
+        ctes.append(deactivated)
+        source = source.where(exists(select(deactivated.c.id)))
+    if project_name is not None and project_name != base.project_name:
+        renamed = update(Project)\
+            .where(Project.id == project_id)\
+            .values(project_name=project_name, updated_by=user_id)\
+            .returning(Project.id)\
+            .cte("renamed")
+        ctes.append(renamed)
+
+    statement = insert(Sitemap)\
+        .from_select(list(values.keys()), source)\
+        .returning(Sitemap.id, Sitemap.version_number)
+    if ctes:
+        statement = statement.add_cte(*ctes)
+
+    try:
+        new_version = db.execute(statement).first()
+    except IntegrityError as e:
+        raise SitemapSwapConflict(f"Concurrent sitemap save for project {project_id}: {e.orig}")
+    if new_version is None:
+        raise SitemapSwapConflict(f"Active sitemap {base.sitemap_id} of project {project_id} was replaced concurrently")
+
+    logging.info(f"Storing sitemap version {new_version.version_number} of project {project_id} as {storage_kind}"
+                 + (f" ({len(patch)} patch operations)" if patch is not None else ""))
+    return new_version
+
+
+# Metadata columns of a version; listing history never touches sitemap_data / sitemap_patch
+VERSION_SUMMARY_COLUMNS = (
+    Sitemap.id,
+    Sitemap.version_number,
+    Sitemap.created_at,
+    Sitemap.created_by,
+    Sitemap.no_of_pages,
+    Sitemap.is_active,
+)
+
+
+def list_sitemap_versions(db: Session, project_id: int, limit: int, cursor: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """
+    Returns one page of version metadata, newest first, and the cursor for the next page.
+    Pages are keyed on (created_at, id) so each one is a single range scan of
+    `ix_sitemap_project_id_created_at_id`, however deep into the history it is.
+    """
+    query = db.query(*VERSION_SUMMARY_COLUMNS).filter(Sitemap.project_id == project_id)
+    if cursor:
+        created_at, sitemap_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Sitemap.created_at, Sitemap.id) < tuple_(created_at, sitemap_id))
+    rows = query.order_by(Sitemap.created_at.desc(), Sitemap.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
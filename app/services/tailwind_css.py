@@ -0,0 +1,556 @@
+"""
+Build-time replacement for the Tailwind CDN script.
+
+Generated sections use Tailwind utility classes. Instead of shipping the Tailwind JIT
+runtime to every visitor, pages get a small stylesheet compiled here from the classes
+they actually use. The compiler covers the Tailwind v3 utilities that show up in
+generated marketing pages (layout, flex/grid, spacing, sizing, typography, colours with
+opacity, borders and dividers, shadows, filters, gradients, transforms, transitions,
+line clamping) with responsive, state, group-hover and dark variants. Classes it does
+not know are reported and skipped; the rest of the stylesheet is still emitted.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+BREAKPOINTS = [("sm", "640px"), ("md", "768px"), ("lg", "1024px"), ("xl", "1280px"), ("2xl", "1536px")]
+
+PSEUDO_VARIANTS = {
+    "hover": ":hover",
+    "focus": ":focus",
+    "focus-within": ":focus-within",
+    "focus-visible": ":focus-visible",
+    "active": ":active",
+    "visited": ":visited",
+    "disabled": ":disabled",
+    "first": ":first-child",
+    "last": ":last-child",
+    "odd": ":nth-child(odd)",
+    "even": ":nth-child(even)",
+    "placeholder": "::placeholder",
+}
+
+_SHADES = ("50", "100", "200", "300", "400", "500", "600", "700", "800", "900", "950")
+_PALETTE_HEX = {
+    "slate": "f8fafc f1f5f9 e2e8f0 cbd5e1 94a3b8 64748b 475569 334155 1e293b 0f172a 020617",
+    "gray": "f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827 030712",
+    "zinc": "fafafa f4f4f5 e4e4e7 d4d4d8 a1a1aa 71717a 52525b 3f3f46 27272a 18181b 09090b",
+    "neutral": "fafafa f5f5f5 e5e5e5 d4d4d4 a3a3a3 737373 525252 404040 262626 171717 0a0a0a",
+    "stone": "fafaf9 f5f5f4 e7e5e4 d6d3d1 a8a29e 78716c 57534e 44403c 292524 1c1917 0c0a09",
+    "red": "fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d 450a0a",
+    "orange": "fff7ed ffedd5 fed7aa fdba74 fb923c f97316 ea580c c2410c 9a3412 7c2d12 431407",
+    "amber": "fffbeb fef3c7 fde68a fcd34d fbbf24 f59e0b d97706 b45309 92400e 78350f 451a03",
+    "yellow": "fefce8 fef9c3 fef08a fde047 facc15 eab308 ca8a04 a16207 854d0e 713f12 422006",
+    "lime": "f7fee7 ecfccb d9f99d bef264 a3e635 84cc16 65a30d 4d7c0f 3f6212 365314 1a2e05",
+    "green": "f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d 052e16",
+    "emerald": "ecfdf5 d1fae5 a7f3d0 6ee7b7 34d399 10b981 059669 047857 065f46 064e3b 022c22",
+    "teal": "f0fdfa ccfbf1 99f6e4 5eead4 2dd4bf 14b8a6 0d9488 0f766e 115e59 134e4a 042f2e",
+    "cyan": "ecfeff cffafe a5f3fc 67e8f9 22d3ee 06b6d4 0891b2 0e7490 155e75 164e63 083344",
+    "sky": "f0f9ff e0f2fe bae6fd 7dd3fc 38bdf8 0ea5e9 0284c7 0369a1 075985 0c4a6e 082f49",
+    "blue": "eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a 172554",
+    "indigo": "eef2ff e0e7ff c7d2fe a5b4fc 818cf8 6366f1 4f46e5 4338ca 3730a3 312e81 1e1b4b",
+    "violet": "f5f3ff ede9fe ddd6fe c4b5fd a78bfa 8b5cf6 7c3aed 6d28d9 5b21b6 4c1d95 2e1065",
+    "purple": "faf5ff f3e8ff e9d5ff d8b4fe c084fc a855f7 9333ea 7e22ce 6b21a8 581c87 3b0764",
+    "fuchsia": "fdf4ff fae8ff f5d0fe f0abfc e879f9 d946ef c026d3 a21caf 86198f 701a75 4a044e",
+    "pink": "fdf2f8 fce7f3 fbcfe8 f9a8d4 f472b6 ec4899 db2777 be185d 9d174d 831843 500724",
+    "rose": "fff1f2 ffe4e6 fecdd3 fda4af fb7185 f43f5e e11d48 be123c 9f1239 881337 4c0519",
+}
+COLORS: Dict[str, str] = {"white": "#ffffff", "black": "#000000"}
+for _name, _hexes in _PALETTE_HEX.items():
+    for _shade, _hex in zip(_SHADES, _hexes.split()):
+        COLORS[f"{_name}-{_shade}"] = f"#{_hex}"
+SPECIAL_COLORS = {"transparent": "transparent", "current": "currentColor", "inherit": "inherit"}
+
+FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"), "sm": ("0.875rem", "1.25rem"), "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"), "xl": ("1.25rem", "1.75rem"), "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"), "4xl": ("2.25rem", "2.5rem"), "5xl": ("3rem", "1"),
+    "6xl": ("3.75rem", "1"), "7xl": ("4.5rem", "1"), "8xl": ("6rem", "1"), "9xl": ("8rem", "1"),
+}
+FONT_WEIGHTS = {
+    "thin": "100", "extralight": "200", "light": "300", "normal": "400", "medium": "500",
+    "semibold": "600", "bold": "700", "extrabold": "800", "black": "900",
+}
+FONT_FAMILIES = {
+    "sans": 'ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", "Segoe UI Emoji"',
+    "serif": 'ui-serif, Georgia, Cambria, "Times New Roman", Times, serif',
+    "mono": 'ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", monospace',
+}
+LEADING = {"none": "1", "tight": "1.25", "snug": "1.375", "normal": "1.5", "relaxed": "1.625", "loose": "2"}
+TRACKING = {"tighter": "-0.05em", "tight": "-0.025em", "normal": "0em", "wide": "0.025em", "wider": "0.05em", "widest": "0.1em"}
+RADII = {
+    "none": "0px", "sm": "0.125rem", "": "0.25rem", "md": "0.375rem", "lg": "0.5rem",
+    "xl": "0.75rem", "2xl": "1rem", "3xl": "1.5rem", "full": "9999px",
+}
+SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "": "0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / 0.25)",
+    "inner": "inset 0 2px 4px 0 rgb(0 0 0 / 0.05)",
+    "none": "0 0 #0000",
+}
+BLURS = {"none": "0", "sm": "4px", "": "8px", "md": "12px", "lg": "16px", "xl": "24px", "2xl": "40px", "3xl": "64px"}
+MAX_WIDTHS = {
+    "none": "none", "xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem",
+    "2xl": "42rem", "3xl": "48rem", "4xl": "56rem", "5xl": "64rem", "6xl": "72rem", "7xl": "80rem",
+    "full": "100%", "min": "min-content", "max": "max-content", "fit": "fit-content", "prose": "65ch",
+    **{f"screen-{name}": width for name, width in BREAKPOINTS},
+}
+GRADIENT_DIRECTIONS = {
+    "t": "to top", "tr": "to top right", "r": "to right", "br": "to bottom right",
+    "b": "to bottom", "bl": "to bottom left", "l": "to left", "tl": "to top left",
+}
+DISPLAY = {
+    "block": "block", "inline-block": "inline-block", "inline": "inline", "flex": "flex",
+    "inline-flex": "inline-flex", "grid": "grid", "inline-grid": "inline-grid", "table": "table",
+    "contents": "contents", "list-item": "list-item", "hidden": "none",
+}
+STATIC = {
+    "container": ["width: 100%"],
+    "relative": ["position: relative"], "absolute": ["position: absolute"], "fixed": ["position: fixed"],
+    "sticky": ["position: sticky"], "static": ["position: static"],
+    "flex-row": ["flex-direction: row"], "flex-row-reverse": ["flex-direction: row-reverse"],
+    "flex-col": ["flex-direction: column"], "flex-col-reverse": ["flex-direction: column-reverse"],
+    "flex-wrap": ["flex-wrap: wrap"], "flex-nowrap": ["flex-wrap: nowrap"],
+    "flex-1": ["flex: 1 1 0%"], "flex-auto": ["flex: 1 1 auto"], "flex-initial": ["flex: 0 1 auto"], "flex-none": ["flex: none"],
+    "grow": ["flex-grow: 1"], "flex-grow": ["flex-grow: 1"], "grow-0": ["flex-grow: 0"],
+    "shrink": ["flex-shrink: 1"], "shrink-0": ["flex-shrink: 0"], "flex-shrink-0": ["flex-shrink: 0"],
+    "items-start": ["align-items: flex-start"], "items-end": ["align-items: flex-end"],
+    "items-center": ["align-items: center"], "items-baseline": ["align-items: baseline"], "items-stretch": ["align-items: stretch"],
+    "justify-start": ["justify-content: flex-start"], "justify-end": ["justify-content: flex-end"],
+    "justify-center": ["justify-content: center"], "justify-between": ["justify-content: space-between"],
+    "justify-around": ["justify-content: space-around"], "justify-evenly": ["justify-content: space-evenly"],
+    "justify-items-center": ["justify-items: center"], "place-items-center": ["place-items: center"],
+    "content-center": ["align-content: center"], "content-between": ["align-content: space-between"],
+    "self-auto": ["align-self: auto"], "self-start": ["align-self: flex-start"], "self-end": ["align-self: flex-end"],
+    "self-center": ["align-self: center"], "self-stretch": ["align-self: stretch"],
+    "col-span-full": ["grid-column: 1 / -1"], "col-auto": ["grid-column: auto"],
+    "text-left": ["text-align: left"], "text-center": ["text-align: center"], "text-right": ["text-align: right"], "text-justify": ["text-align: justify"],
+    "uppercase": ["text-transform: uppercase"], "lowercase": ["text-transform: lowercase"],
+    "capitalize": ["text-transform: capitalize"], "normal-case": ["text-transform: none"],
+    "italic": ["font-style: italic"], "not-italic": ["font-style: normal"],
+    "underline": ["text-decoration-line: underline"], "line-through": ["text-decoration-line: line-through"], "no-underline": ["text-decoration-line: none"],
+    "antialiased": ["-webkit-font-smoothing: antialiased", "-moz-osx-font-smoothing: grayscale"],
+    "truncate": ["overflow: hidden", "text-overflow: ellipsis", "white-space: nowrap"],
+    "whitespace-normal": ["white-space: normal"], "whitespace-nowrap": ["white-space: nowrap"], "whitespace-pre-line": ["white-space: pre-line"],
+    "break-words": ["overflow-wrap: break-word"], "break-all": ["word-break: break-all"],
+    "list-none": ["list-style-type: none"], "list-disc": ["list-style-type: disc"], "list-decimal": ["list-style-type: decimal"],
+    "list-inside": ["list-style-position: inside"], "list-outside": ["list-style-position: outside"],
+    "border-solid": ["border-style: solid"], "border-dashed": ["border-style: dashed"], "border-dotted": ["border-style: dotted"], "border-none": ["border-style: none"],
+    "overflow-hidden": ["overflow: hidden"], "overflow-auto": ["overflow: auto"], "overflow-visible": ["overflow: visible"], "overflow-scroll": ["overflow: scroll"],
+    "overflow-x-auto": ["overflow-x: auto"], "overflow-y-auto": ["overflow-y: auto"], "overflow-x-hidden": ["overflow-x: hidden"], "overflow-y-hidden": ["overflow-y: hidden"],
+    "object-cover": ["object-fit: cover"], "object-contain": ["object-fit: contain"], "object-fill": ["object-fit: fill"], "object-center": ["object-position: center"],
+    "aspect-square": ["aspect-ratio: 1 / 1"], "aspect-video": ["aspect-ratio: 16 / 9"], "aspect-auto": ["aspect-ratio: auto"],
+    "cursor-pointer": ["cursor: pointer"], "cursor-default": ["cursor: default"], "cursor-not-allowed": ["cursor: not-allowed"],
+    "pointer-events-none": ["pointer-events: none"], "pointer-events-auto": ["pointer-events: auto"], "select-none": ["user-select: none"],
+    "outline-none": ["outline: 2px solid transparent", "outline-offset: 2px"],
+    "visible": ["visibility: visible"], "invisible": ["visibility: hidden"],
+    "align-top": ["vertical-align: top"], "align-middle": ["vertical-align: middle"],
+    "align-bottom": ["vertical-align: bottom"], "align-baseline": ["vertical-align: baseline"],
+    "resize-none": ["resize: none"], "scroll-smooth": ["scroll-behavior: smooth"],
+    "line-clamp-none": ["overflow: visible", "display: block", "-webkit-box-orient: horizontal", "-webkit-line-clamp: none"],
+    "sr-only": ["position: absolute", "width: 1px", "height: 1px", "padding: 0", "margin: -1px", "overflow: hidden",
+                "clip: rect(0, 0, 0, 0)", "white-space: nowrap", "border-width: 0"],
+    "bg-cover": ["background-size: cover"], "bg-contain": ["background-size: contain"], "bg-center": ["background-position: center"],
+    "bg-no-repeat": ["background-repeat: no-repeat"], "bg-fixed": ["background-attachment: fixed"],
+    "transition": ["transition-property: color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, transform, filter, backdrop-filter",
+                   "transition-timing-function: cubic-bezier(0.4, 0, 0.2, 1)", "transition-duration: 150ms"],
+    "transition-all": ["transition-property: all", "transition-timing-function: cubic-bezier(0.4, 0, 0.2, 1)", "transition-duration: 150ms"],
+    "transition-colors": ["transition-property: color, background-color, border-color, text-decoration-color, fill, stroke",
+                          "transition-timing-function: cubic-bezier(0.4, 0, 0.2, 1)", "transition-duration: 150ms"],
+    "transition-opacity": ["transition-property: opacity", "transition-timing-function: cubic-bezier(0.4, 0, 0.2, 1)", "transition-duration: 150ms"],
+    "transition-shadow": ["transition-property: box-shadow", "transition-timing-function: cubic-bezier(0.4, 0, 0.2, 1)", "transition-duration: 150ms"],
+    "transition-transform": ["transition-property: transform", "transition-timing-function: cubic-bezier(0.4, 0, 0.2, 1)", "transition-duration: 150ms"],
+    "transition-none": ["transition-property: none"],
+    "ease-linear": ["transition-timing-function: linear"], "ease-in": ["transition-timing-function: cubic-bezier(0.4, 0, 1, 1)"],
+    "ease-out": ["transition-timing-function: cubic-bezier(0, 0, 0.2, 1)"], "ease-in-out": ["transition-timing-function: cubic-bezier(0.4, 0, 0.2, 1)"],
+    "transform": ["transform: var(--tw-transform)"], "transform-none": ["transform: none"],
+    "mx-auto": ["margin-left: auto", "margin-right: auto"], "my-auto": ["margin-top: auto", "margin-bottom: auto"],
+    "ml-auto": ["margin-left: auto"], "mr-auto": ["margin-right: auto"], "mt-auto": ["margin-top: auto"], "mb-auto": ["margin-bottom: auto"],
+    "m-auto": ["margin: auto"],
+    "border": ["border-width: 1px"], "border-t": ["border-top-width: 1px"], "border-b": ["border-bottom-width: 1px"],
+    "border-l": ["border-left-width: 1px"], "border-r": ["border-right-width: 1px"],
+    "border-x": ["border-left-width: 1px", "border-right-width: 1px"], "border-y": ["border-top-width: 1px", "border-bottom-width: 1px"],
+    "ring": ["box-shadow: 0 0 0 3px var(--tw-ring-color)"],
+}
+
+SPACING_PROPERTIES = {
+    "p": ["padding"], "px": ["padding-left", "padding-right"], "py": ["padding-top", "padding-bottom"],
+    "pt": ["padding-top"], "pr": ["padding-right"], "pb": ["padding-bottom"], "pl": ["padding-left"],
+    "m": ["margin"], "mx": ["margin-left", "margin-right"], "my": ["margin-top", "margin-bottom"],
+    "mt": ["margin-top"], "mr": ["margin-right"], "mb": ["margin-bottom"], "ml": ["margin-left"],
+    "gap": ["gap"], "gap-x": ["column-gap"], "gap-y": ["row-gap"],
+    "top": ["top"], "right": ["right"], "bottom": ["bottom"], "left": ["left"],
+    "inset": ["inset"], "inset-x": ["left", "right"], "inset-y": ["top", "bottom"],
+    "w": ["width"], "h": ["height"], "min-w": ["min-width"], "min-h": ["min-height"], "max-h": ["max-height"],
+    "size": ["width", "height"],
+}
+# Classes that only mark an element for `group-*` variants and produce no CSS themselves
+MARKER_CLASSES = {"group", "peer"}
+SIBLING_SELECTOR = " > :not([hidden]) ~ :not([hidden])"
+
+BORDER_SIDES = {"": ["border-width"], "t": ["border-top-width"], "r": ["border-right-width"], "b": ["border-bottom-width"],
+                "l": ["border-left-width"], "x": ["border-left-width", "border-right-width"], "y": ["border-top-width", "border-bottom-width"]}
+RADIUS_SIDES = {"": ["border-radius"], "t": ["border-top-left-radius", "border-top-right-radius"],
+                "r": ["border-top-right-radius", "border-bottom-right-radius"],
+                "b": ["border-bottom-right-radius", "border-bottom-left-radius"],
+                "l": ["border-top-left-radius", "border-bottom-left-radius"],
+                "tl": ["border-top-left-radius"], "tr": ["border-top-right-radius"],
+                "br": ["border-bottom-right-radius"], "bl": ["border-bottom-left-radius"]}
+
+BASE_CSS = """*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb;--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-scale-x:1;--tw-scale-y:1;--tw-transform:translate(var(--tw-translate-x),var(--tw-translate-y)) rotate(var(--tw-rotate)) scale(var(--tw-scale-x),var(--tw-scale-y));--tw-ring-color:rgb(59 130 246 / 0.5)}
+html{line-height:1.5;-webkit-text-size-adjust:100%;font-family:ui-sans-serif,system-ui,sans-serif}
+body{margin:0;line-height:inherit}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+button,input,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;color:inherit;margin:0;padding:0;background-color:transparent;background-image:none}
+button,[role="button"]{cursor:pointer}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}"""
+
+
+def extract_classes(html: str) -> Set[str]:
+    """Returns every class token used in `class` / `className` attributes."""
+    classes: Set[str] = set()
+    for match in re.finditer(r"""\bclass(?:Name)?\s*=\s*(["'])(.*?)\1""", html, re.DOTALL):
+        classes.update(match.group(2).split())
+    return classes
+
+
+def _spacing_value(token: str) -> Optional[str]:
+    if token == "px":
+        return "1px"
+    if token == "0":
+        return "0px"
+    if re.fullmatch(r"\d+(\.5)?", token):
+        return f"{float(token) / 4:g}rem"
+    if re.fullmatch(r"\d+/\d+", token):
+        numerator, denominator = token.split("/")
+        return f"{int(numerator) / int(denominator) * 100:g}%"
+    return {"full": "100%", "auto": "auto", "screen": "100vh", "min": "min-content", "max": "max-content", "fit": "fit-content"}.get(token)
+
+
+def _arbitrary(token: str) -> Optional[str]:
+    if token.startswith("[") and token.endswith("]"):
+        return token[1:-1].replace("_", " ")
+    return None
+
+
+def _color(token: str) -> Optional[str]:
+    """Resolves `blue-500`, `black/50`, `[#0a0a0a]` to a CSS colour."""
+    value = _arbitrary(token)
+    if value is not None:
+        return value
+    name, _, opacity = token.partition("/")
+    if name in SPECIAL_COLORS and not opacity:
+        return SPECIAL_COLORS[name]
+    hex_value = COLORS.get(name)
+    if hex_value is None:
+        return None
+    if not opacity:
+        return hex_value
+    if not opacity.isdigit():
+        return None
+    red, green, blue = (int(hex_value[i:i + 2], 16) for i in (1, 3, 5))
+    return f"rgb({red} {green} {blue} / {int(opacity) / 100:g})"
+
+
+def _utility(name: str) -> Optional[Tuple[str, List[str]]]:
+    """
+    Returns `(selector_suffix, declarations)` for one utility without variants,
+    or None if the utility is not supported.
+    """
+    negative = name.startswith("-")
+    if negative:
+        name = name[1:]
+
+    def negate(value: str) -> str:
+        return f"calc({value} * -1)" if negative and value not in ("0px", "auto") else value
+
+    if name in STATIC and not negative:
+        return "", STATIC[name]
+    if name in DISPLAY and not negative:
+        return "", [f"display: {DISPLAY[name]}"]
+
+    # space-x-4 / space-y-4 apply to siblings
+    match = re.fullmatch(r"space-([xy])-(.+)", name)
+    if match:
+        value = _spacing_value(match.group(2))
+        if value is None:
+            return None
+        side = "margin-left" if match.group(1) == "x" else "margin-top"
+        return SIBLING_SELECTOR, [f"{side}: {negate(value)}"]
+    # divide-y / divide-x-2 / divide-gray-200 put borders between siblings
+    match = re.fullmatch(r"divide-([xy])(?:-(\d+))?", name)
+    if match:
+        side = "border-left-width" if match.group(1) == "x" else "border-top-width"
+        return SIBLING_SELECTOR, [f"{side}: {match.group(2) or 1}px"]
+    match = re.fullmatch(r"divide-(solid|dashed|dotted|none)", name)
+    if match:
+        return SIBLING_SELECTOR, [f"border-style: {match.group(1)}"]
+    if name.startswith("divide-"):
+        color = _color(name[7:])
+        return (SIBLING_SELECTOR, [f"border-color: {color}"]) if color else None
+
+    match = re.fullmatch(r"(p|px|py|pt|pr|pb|pl|m|mx|my|mt|mr|mb|ml|gap|gap-x|gap-y|top|right|bottom|left|inset|inset-x|inset-y|w|h|min-w|min-h|max-h|size)-(.+)", name)
+    if match:
+        prefix, token = match.groups()
+        value = _arbitrary(token) or _spacing_value(token)
+        if prefix in ("w", "min-w") and token == "screen":
+            value = "100vw"
+        if prefix in ("h", "min-h", "max-h") and token in ("dvh", "svh"):
+            value = f"100{token}"
+        if value is None:
+            return None
+        return "", [f"{prop}: {negate(value)}" for prop in SPACING_PROPERTIES[prefix]]
+
+    if name.startswith("max-w-"):
+        value = _arbitrary(name[6:]) or MAX_WIDTHS.get(name[6:])
+        return ("", [f"max-width: {value}"]) if value else None
+
+    match = re.fullmatch(r"grid-(cols|rows)-(\d+|none)", name)
+    if match:
+        kind, count = match.groups()
+        prop = "grid-template-columns" if kind == "cols" else "grid-template-rows"
+        return "", [f"{prop}: {'none' if count == 'none' else f'repeat({count}, minmax(0, 1fr))'}"]
+    match = re.fullmatch(r"(col|row)-span-(\d+)", name)
+    if match:
+        kind, count = match.groups()
+        return "", [f"grid-{'column' if kind == 'col' else 'row'}: span {count} / span {count}"]
+    match = re.fullmatch(r"(col|row)-(start|end)-(\d+)", name)
+    if match:
+        kind, edge, line = match.groups()
+        return "", [f"grid-{'column' if kind == 'col' else 'row'}-{edge}: {line}"]
+    match = re.fullmatch(r"order-(\d+|first|last|none)", name)
+    if match:
+        value = {"first": "-9999", "last": "9999", "none": "0"}.get(match.group(1), match.group(1))
+        return "", [f"order: {value}"]
+
+    if name.startswith("text-"):
+        token = name[5:]
+        if token in FONT_SIZES:
+            size, line_height = FONT_SIZES[token]
+            return "", [f"font-size: {size}", f"line-height: {line_height}"]
+        value = _arbitrary(token)
+        if value is not None and re.fullmatch(r"[\d.]+(px|rem|em|vw|%)", value):
+            return "", [f"font-size: {value}"]
+        color = _color(token)
+        return ("", [f"color: {color}"]) if color else None
+    if name.startswith("font-"):
+        token = name[5:]
+        if token in FONT_WEIGHTS:
+            return "", [f"font-weight: {FONT_WEIGHTS[token]}"]
+        if token in FONT_FAMILIES:
+            return "", [f"font-family: {FONT_FAMILIES[token]}"]
+        return None
+    if name.startswith("leading-"):
+        token = name[8:]
+        value = LEADING.get(token) or (_spacing_value(token) if token.isdigit() else None) or _arbitrary(token)
+        return ("", [f"line-height: {value}"]) if value else None
+    match = re.fullmatch(r"line-clamp-(\d+)", name)
+    if match:
+        return "", ["overflow: hidden", "display: -webkit-box", "-webkit-box-orient: vertical",
+                    f"-webkit-line-clamp: {match.group(1)}"]
+    match = re.fullmatch(r"underline-offset-(\d+)", name)
+    if match:
+        return "", [f"text-underline-offset: {match.group(1)}px"]
+    if name.startswith("placeholder-"):
+        color = _color(name[12:])
+        return ("::placeholder", [f"color: {color}"]) if color else None
+    if name.startswith("tracking-"):
+        value = TRACKING.get(name[9:])
+        return ("", [f"letter-spacing: {value}"]) if value else None
+
+    if name.startswith("bg-gradient-to-"):
+        direction = GRADIENT_DIRECTIONS.get(name[15:])
+        return ("", [f"background-image: linear-gradient({direction}, var(--tw-gradient-stops))"]) if direction else None
+    match = re.fullmatch(r"(from|via|to)-(.+)", name)
+    if match:
+        stop, token = match.groups()
+        color = _color(token)
+        if color is None:
+            return None
+        if stop == "from":
+            return "", [f"--tw-gradient-from: {color}", "--tw-gradient-to: transparent",
+                        "--tw-gradient-stops: var(--tw-gradient-from), var(--tw-gradient-to)"]
+        if stop == "via":
+            return "", ["--tw-gradient-to: transparent",
+                        f"--tw-gradient-stops: var(--tw-gradient-from), {color}, var(--tw-gradient-to)"]
+        return "", [f"--tw-gradient-to: {color}"]
+    if name.startswith("bg-"):
+        token = name[3:]
+        if token.startswith("[url("):
+            return "", [f"background-image: {_arbitrary(token)}"]
+        color = _color(token)
+        return ("", [f"background-color: {color}"]) if color else None
+
+    match = re.fullmatch(r"border(?:-([trblxy]))?-(\d+)", name)
+    if match:
+        side, width = match.groups()
+        return "", [f"{prop}: {width}px" for prop in BORDER_SIDES[side or ""]]
+    if name.startswith("border-"):
+        color = _color(name[7:])
+        return ("", [f"border-color: {color}"]) if color else None
+    match = re.fullmatch(r"rounded(?:-(t|r|b|l|tl|tr|br|bl))?(?:-(none|sm|md|lg|xl|2xl|3xl|full))?", name)
+    if match:
+        side, size = match.groups()
+        return "", [f"{prop}: {RADII[size or '']}" for prop in RADIUS_SIDES[side or ""]]
+
+    match = re.fullmatch(r"shadow(?:-(sm|md|lg|xl|2xl|inner|none))?", name)
+    if match:
+        return "", [f"box-shadow: {SHADOWS[match.group(1) or '']}"]
+    match = re.fullmatch(r"ring-(\d+)", name)
+    if match:
+        return "", [f"box-shadow: 0 0 0 {match.group(1)}px var(--tw-ring-color)"]
+    if name.startswith("ring-"):
+        color = _color(name[5:])
+        return ("", [f"--tw-ring-color: {color}"]) if color else None
+    match = re.fullmatch(r"(backdrop-)?blur(?:-(none|sm|md|lg|xl|2xl|3xl))?", name)
+    if match:
+        value = f"blur({BLURS[match.group(2) or '']})"
+        if match.group(1):
+            return "", [f"-webkit-backdrop-filter: {value}", f"backdrop-filter: {value}"]
+        return "", [f"filter: {value}"]
+    match = re.fullmatch(r"(fill|stroke)-(.+)", name)
+    if match:
+        prop, token = match.groups()
+        if prop == "stroke" and token.isdigit():
+            return "", [f"stroke-width: {token}"]
+        color = _color(token)
+        return ("", [f"{prop}: {color}"]) if color else None
+    match = re.fullmatch(r"opacity-(\d+)", name)
+    if match:
+        return "", [f"opacity: {int(match.group(1)) / 100:g}"]
+    match = re.fullmatch(r"z-(\d+|auto)", name)
+    if match:
+        return "", [f"z-index: {'-' if negative and match.group(1) != 'auto' else ''}{match.group(1)}"]
+
+    match = re.fullmatch(r"(duration|delay)-(\d+)", name)
+    if match:
+        prop = "transition-duration" if match.group(1) == "duration" else "transition-delay"
+        return "", [f"{prop}: {match.group(2)}ms"]
+    match = re.fullmatch(r"scale(?:-([xy]))?-(\d+)", name)
+    if match:
+        axis, percent = match.groups()
+        value = f"{int(percent) / 100:g}"
+        axes = [axis] if axis else ["x", "y"]
+        return "", [f"--tw-scale-{a}: {value}" for a in axes] + ["transform: var(--tw-transform)"]
+    match = re.fullmatch(r"translate-([xy])-(.+)", name)
+    if match:
+        axis, token = match.groups()
+        value = _arbitrary(token) or _spacing_value(token)
+        return ("", [f"--tw-translate-{axis}: {negate(value)}", "transform: var(--tw-transform)"]) if value else None
+    match = re.fullmatch(r"rotate-(\d+)", name)
+    if match:
+        return "", [f"--tw-rotate: {'-' if negative else ''}{match.group(1)}deg", "transform: var(--tw-transform)"]
+
+    return None
+
+
+_AXIS_UTILITY = re.compile(r"-?((px|py|mx|my|gap-x|gap-y|inset-x|inset-y)-|border-[xy]|rounded-[trbl](-|$)|scale-[xy]|via-)")
+_SIDE_UTILITY = re.compile(r"-?((pt|pr|pb|pl|mt|mr|mb|ml|top|right|bottom|left)-|border-[trbl](-|$)|rounded-(tl|tr|br|bl)|to-)")
+
+
+def _utility_rank(utility: str) -> int:
+    """Orders shorthands before axis utilities before single sides, as Tailwind does, so `p-4 pt-0` works."""
+    if _SIDE_UTILITY.match(utility):
+        return 2
+    if _AXIS_UTILITY.match(utility):
+        return 1
+    return 0
+
+
+def _split_variants(class_name: str) -> Tuple[List[str], str]:
+    """Splits `md:hover:bg-[url(a:b)]` into (["md", "hover"], "bg-[url(a:b)]"), ignoring colons inside brackets."""
+    parts, depth, current = [], 0, ""
+    for char in class_name:
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        if char == ":" and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    return parts, current
+
+
+def _escape_class(class_name: str) -> str:
+    return re.sub(r"([^a-zA-Z0-9_-])", r"\\\1", class_name)
+
+
+@lru_cache(maxsize=8192)
+def compile_class(class_name: str) -> Optional[Tuple[int, Tuple[int, int, str], str]]:
+    """
+    Compiles one class into `(breakpoint_index, sort_key, rule)`, where index 0 means
+    no media query and 1.. follow `BREAKPOINTS`. `dark:` rules are wrapped in their own
+    media query. Returns None for unsupported classes.
+    """
+    variants, utility = _split_variants(class_name.lstrip("!"))
+    compiled = _utility(utility)
+    if compiled is None:
+        return None
+    suffix, declarations = compiled
+
+    breakpoint_index = 0
+    pseudo = ""
+    group_prefix = ""
+    dark = False
+    breakpoint_names = [name for name, _ in BREAKPOINTS]
+    for variant in variants:
+        if variant in breakpoint_names:
+            breakpoint_index = breakpoint_names.index(variant) + 1
+        elif variant in PSEUDO_VARIANTS:
+            pseudo += PSEUDO_VARIANTS[variant]
+        elif variant.startswith("group-") and variant[6:] in PSEUDO_VARIANTS:
+            group_prefix = f".group{PSEUDO_VARIANTS[variant[6:]]} "
+        elif variant == "dark":
+            dark = True
+        else:
+            return None
+
+    important = " !important" if class_name.startswith("!") else ""
+    body = ";".join(f"{declaration}{important}" for declaration in declarations)
+    rule = f"{group_prefix}.{_escape_class(class_name)}{pseudo}{suffix}{{{body}}}"
+    if dark:
+        rule = f"@media (prefers-color-scheme: dark){{{rule}}}"
+    variant_rank = 2 if dark else 1 if pseudo or group_prefix else 0
+    return breakpoint_index, (variant_rank, _utility_rank(utility), class_name), rule
+
+
+def compile_stylesheet(classes: Iterable[str]) -> Tuple[str, List[str]]:
+    """
+    Builds a minimal stylesheet for `classes`. Returns the CSS and the sorted list of
+    classes that could not be compiled.
+    """
+    buckets: List[List[Tuple[Tuple[int, int, str], str]]] = [[] for _ in range(len(BREAKPOINTS) + 1)]
+    unsupported: List[str] = []
+    needs_container = False
+    for class_name in sorted(set(classes)):
+        if class_name in MARKER_CLASSES:
+            continue
+        compiled = compile_class(class_name)
+        if compiled is None:
+            unsupported.append(class_name)
+            continue
+        breakpoint_index, sort_key, rule = compiled
+        buckets[breakpoint_index].append((sort_key, rule))
+        needs_container = needs_container or class_name == "container"
+
+    ordered = [[rule for _, rule in sorted(bucket)] for bucket in buckets]
+    parts = [BASE_CSS, *ordered[0]]
+    for index, (_, width) in enumerate(BREAKPOINTS, start=1):
+        media_rules = ordered[index]
+        if needs_container:
+            media_rules.insert(0, f".container{{max-width:{width}}}")
+        if media_rules:
+            parts.append(f"@media (min-width: {width}){{{''.join(media_rules)}}}")
+    return "\n".join(parts), unsupported
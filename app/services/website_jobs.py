@@ -0,0 +1,188 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.core.config import logging
+from app.core.settings import settings
+from app.services.llm_resilience import request_budget
+from app.services.llm_telemetry import current_route
+from app.models.website_models import (PageData,
+                                       SectionData,
+                                       SitemapStructure,
+                                       JobStatus,
+                                       SectionResult,
+                                       WebsiteJobStatusResponse)
+from app.services.website_service import (build_generation_units,
+                                          assemble_page_html,
+                                          build_site_styles,
+                                          is_error_section,
+                                          persist_website_in_new_session)
+
+
+class WebsiteJob:
+    """State of one queued website generation, updated in place by a worker."""
+
+    def __init__(
+        self,
+        user_id: int,
+        project_id: int,
+        sitemap_id: int,
+        sitemap: SitemapStructure,
+        pages: List[PageData],
+        page_section_map: Dict[str, List[str]],
+        project_context: Dict,
+        fingerprints: Dict[Tuple[str, str], str],
+        reused_html: Dict[Tuple[str, str], str],
+        to_generate: List[Tuple[PageData, SectionData]],
+        batch_by_page: bool = False
+    ):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.project_id = project_id
+        self.sitemap_id = sitemap_id
+        self.sitemap = sitemap
+        self.pages = pages
+        self.page_section_map = page_section_map
+        self.project_context = project_context
+        self.fingerprints = fingerprints
+        self.to_generate = to_generate
+        self.batch_by_page = batch_by_page
+        self.section_html_map: Dict[Tuple[str, str], str] = dict(reused_html)
+        self.page_html_map: Dict[str, str] = {}
+        self.status = JobStatus.QUEUED
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self._finished_monotonic: Optional[float] = None
+
+    @property
+    def total_sections(self) -> int:
+        return len(self.fingerprints)
+
+    def mark_finished(self, status: JobStatus, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = datetime.now()
+        self._finished_monotonic = time.monotonic()
+
+    def is_expired(self, retention_seconds: int) -> bool:
+        return self._finished_monotonic is not None and time.monotonic() - self._finished_monotonic > retention_seconds
+
+    def to_response(self, include_html: bool = True) -> WebsiteJobStatusResponse:
+        sections = [
+            SectionResult(
+                page_id=page_id,
+                section_id=section_id,
+                html_code=html_content if include_html else None,
+                has_error=is_error_section(html_content),
+            )
+            for (page_id, section_id), html_content in self.section_html_map.items()
+        ]
+        return WebsiteJobStatusResponse(
+            job_id=self.id,
+            status=self.status,
+            project_id=self.project_id,
+            total_sections=self.total_sections,
+            completed_sections=len(sections),
+            failed_sections=sum(1 for s in sections if s.has_error),
+            sections=sections,
+            page_html_map=self.page_html_map if include_html else {},
+            error=self.error,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+        )
+
+
+class WebsiteJobQueue:
+    """
+    In-process job queue with a fixed pool of worker tasks.
+
+    Jobs live in memory only: they survive dropped client connections but not a
+    process restart. Finished jobs are kept for `retention_seconds` so clients can
+    collect the result, then pruned. Completed sites are also persisted as a
+    website version, so the result stays reachable through GET /website/{project_id}.
+    """
+
+    def __init__(self, worker_count: int, retention_seconds: int):
+        self.worker_count = worker_count
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, WebsiteJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"website-job-worker-{index}")
+            for index in range(self.worker_count)
+        ]
+        logging.info(f"Started {self.worker_count} website generation workers")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job: WebsiteJob) -> WebsiteJob:
+        if self._queue is None:
+            raise RuntimeError("Website job queue has not been started")
+        self._prune()
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job.id)
+        logging.info(f"Queued website job {job.id} for project {job.project_id} ({len(job.to_generate)} sections to generate)")
+        return job
+
+    def get(self, job_id: str) -> Optional[WebsiteJob]:
+        return self._jobs.get(job_id)
+
+    def _prune(self) -> None:
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.is_expired(self.retention_seconds)]:
+            del self._jobs[job_id]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            try:
+                if job is not None:
+                    await self._run(job)
+            except Exception as e:
+                logging.error(f"Website job {job_id} failed: {e}", exc_info=True)
+                job.mark_finished(JobStatus.FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: WebsiteJob) -> None:
+        job.status = JobStatus.RUNNING
+        current_route.set("JOB /website/jobs")
+        logging.info(f"Running website job {job.id} for project {job.project_id}")
+
+        with request_budget(settings.WEBSITE_REQUEST_BUDGET_SECONDS):
+            tasks = [
+                asyncio.create_task(unit)
+                for unit in build_generation_units(job.to_generate, job.project_context, job.batch_by_page)
+            ]
+        for next_done in asyncio.as_completed(tasks):
+            for page_id, section_id, html_content in await next_done:
+                job.section_html_map[(page_id, section_id)] = html_content
+
+        site_styles = build_site_styles(job.section_html_map.values())
+        for page in job.pages:
+            page_id_str = str(page.id)
+            job.page_html_map[page_id_str] = assemble_page_html(page, job.page_section_map[page_id_str], job.section_html_map, job.project_context, site_styles)
+
+        await asyncio.to_thread(
+            persist_website_in_new_session,
+            job.project_id, job.sitemap_id, job.sitemap, job.fingerprints,
+            job.section_html_map, job.project_context, job.user_id
+        )
+        job.mark_finished(JobStatus.COMPLETED)
+        logging.info(f"Website job {job.id} completed for project {job.project_id}")
+
+
+website_job_queue = WebsiteJobQueue(
+    worker_count=settings.WEBSITE_JOB_WORKERS,
+    retention_seconds=settings.WEBSITE_JOB_RETENTION_SECONDS,
+)
@@ -0,0 +1,506 @@
+import asyncio
+import json
+import re
+from functools import lru_cache
+from typing import Awaitable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.db_setup import SessionLocal
+from app.core.config import logging
+from app.core.settings import settings
+from app.services.tailwind_css import compile_stylesheet, extract_classes
+from app.services.section_cache import section_html_cache, make_cache_key
+from app.services.llm_router import llm_router, SECTION_TARGETS
+from app.entities.project_entities import Project
+from app.entities.website_entities import Website, WebsiteSection
+from app.models.website_models import SectionData, PageData, SitemapStructure
+
+SECTION_ERROR_MARKER = "Error generating content for"
+
+# Cache keys and fingerprints are tied to the preferred section target, not to whichever
+# target ended up serving a call, so failover does not invalidate stored sections
+SECTION_MODEL_KEY = SECTION_TARGETS[0].key
+
+# Sections that look the same on every page of a site, whatever their description says
+GLOBAL_SECTION_NAMES = {"navbar", "footer"}
+
+
+def build_section_prompts(section: SectionData, page: PageData, project_context: Dict) -> Tuple[str, str]:
+    """Returns the (system, user) prompts used to generate one section."""
+    system_prompt = f"""
+    You are an expert frontend developer creating semantic HTML, potentially using Tailwind CSS.
+    Generate the HTML code *only* for the website section described below.
+    Wrap the output in a '<section id="section-{page.id }-{section.id}">' tag.
+    Use placeholder images (e.g., https://via.placeholder.com/600x400) if needed.
+    Do not include <html>, <head>, or <body> tags. Just the <section>...</section>.
+    """
+
+    user_prompt = f"""
+    Project Context:
+    Business Name: {project_context.get('business_name', 'N/A')}
+    Project Description: {project_context.get('project_description', 'N/A')}
+
+    Page Name: {page.pageName}
+
+    Section Details:
+    Section ID: {section.id}
+    Section Name: {section.sectionName}
+    Section Description: {section.section_description}
+    # Include other details if relevant, like section_outline
+
+    Generate the HTML code for this specific section now.
+    """
+    return system_prompt, user_prompt
+
+
+async def generate_section_html(
+    section: SectionData,
+    page: PageData,
+    project_context: Dict 
+) -> Tuple[str, str, str]: 
+    try:
+        logging.info(f"Generating HTML for section '{section.sectionName}' on page '{page.pageName}'")
+
+        system_prompt, user_prompt = build_section_prompts(section, page, project_context)
+        cache_key = make_cache_key(system_prompt, user_prompt, SECTION_MODEL_KEY)
+        cached_html = await section_html_cache.get(cache_key)
+        if cached_html is not None:
+            logging.info(f"Cache hit for section {section.id} on page {page.id}")
+            return (str(page.id), str(section.id), cached_html)
+
+        # --- Call your LLM function (routed to the fastest healthy provider) ---
+        result = await llm_router.complete(
+            "section",
+            SECTION_TARGETS,
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+        )
+        html_content = result.text
+        # If response_format=SectionHtmlResponse was used:
+        # if isinstance(html_content, SectionHtmlResponse):
+        #    html_content = html_content.html_code
+        # elif not isinstance(html_content, str): 
+        #     raise ValueError("LLM returned unexpected format for section HTML")
+
+        if not html_content or not isinstance(html_content, str):
+             logging.error(f"Failed to generate HTML for section {section.id} on page {page.id}: Empty or invalid response.")
+             return (str(page.id), str(section.id), f"<section id='section-{page.id}-{section.id}' class='bg-red-100 text-red-700 p-4'>Error generating content for '{section.sectionName}'.</section>")
+
+        html_content = html_content.strip()
+        await section_html_cache.set(cache_key, html_content, f"{result.provider}:{result.model}")
+        logging.info(f"Successfully generated HTML for section {section.id} on page {page.id}")
+        return (str(page.id), str(section.id), html_content)
+
+    except Exception as e:
+        logging.error(f"Error generating HTML for section {section.id} on page {page.id}: {e}", exc_info=True)
+        return (str(page.id), str(section.id), f"<section id='section-{page.id}-{section.id}' class='bg-red-100 text-red-700 p-4'>Error generating content for '{section.sectionName}': {e}</section>")
+
+
+def build_page_prompts(page: PageData, sections: List[SectionData], project_context: Dict) -> Tuple[str, str]:
+    """Returns the (system, user) prompts used to generate several sections of one page in a single call."""
+    system_prompt = f"""
+    You are an expert frontend developer creating semantic HTML, potentially using Tailwind CSS.
+    Generate the HTML code *only* for every website section listed below, in the given order.
+    Wrap each section in its own '<section id="section-{page.id}-SECTION_ID">' tag, replacing SECTION_ID with the section's ID.
+    Use placeholder images (e.g., https://via.placeholder.com/600x400) if needed.
+    Do not include <html>, <head>, or <body> tags. Output only the <section>...</section> elements, one after another.
+    """
+
+    section_details = "\n".join(
+        f"""
+    Section ID: {section.id}
+    Section Name: {section.sectionName}
+    Section Description: {section.section_description}
+    """
+        for section in sections
+    )
+    user_prompt = f"""
+    Project Context:
+    Business Name: {project_context.get('business_name', 'N/A')}
+    Project Description: {project_context.get('project_description', 'N/A')}
+
+    Page Name: {page.pageName}
+
+    Sections:
+    {section_details}
+
+    Generate the HTML code for all of these sections now.
+    """
+    return system_prompt, user_prompt
+
+
+def split_batched_sections(page: PageData, sections: List[SectionData], raw_html: str) -> Dict[str, str]:
+    """
+    Splits a batched page response into per-section HTML using the
+    `section-{page.id}-{section.id}` ids. Sections that are missing, or whose
+    <section> tags are unbalanced (typically a truncated response), are left out.
+    """
+    text = re.sub(r"```(?:html)?", "", raw_html)
+    starts: List[Tuple[int, str]] = []
+    for section in sections:
+        match = re.search(
+            rf"""<section\b[^>]*\bid\s*=\s*["']section-{re.escape(str(page.id))}-{re.escape(str(section.id))}["']""",
+            text
+        )
+        if match:
+            starts.append((match.start(), str(section.id)))
+    starts.sort()
+
+    split_html: Dict[str, str] = {}
+    for index, (start, section_id) in enumerate(starts):
+        end = starts[index + 1][0] if index + 1 < len(starts) else len(text)
+        chunk = text[start:end].strip()
+        if chunk.endswith("</section>") and len(re.findall(r"<section\b", chunk)) == chunk.count("</section>"):
+            split_html[section_id] = chunk
+    return split_html
+
+
+async def generate_page_sections_batched(
+    page: PageData,
+    sections: List[SectionData],
+    project_context: Dict
+) -> List[Tuple[str, str, str]]:
+    """
+    Generates several sections of one page with a single LLM call. Cached sections are
+    served from the cache; any section missing or truncated in the batched answer falls
+    back to `generate_section_html` on its own.
+    """
+    page_id_str = str(page.id)
+    results: List[Tuple[str, str, str]] = []
+    cache_keys: Dict[str, str] = {}
+    pending: List[SectionData] = []
+    for section in sections:
+        system_prompt, user_prompt = build_section_prompts(section, page, project_context)
+        cache_key = make_cache_key(system_prompt, user_prompt, SECTION_MODEL_KEY)
+        cached_html = await section_html_cache.get(cache_key)
+        if cached_html is not None:
+            results.append((page_id_str, str(section.id), cached_html))
+        else:
+            cache_keys[str(section.id)] = cache_key
+            pending.append(section)
+
+    if len(pending) < 2:
+        results.extend([await generate_section_html(section, page, project_context) for section in pending])
+        return results
+
+    split_html: Dict[str, str] = {}
+    try:
+        logging.info(f"Generating {len(pending)} sections of page '{page.pageName}' in one batched call")
+        system_prompt, user_prompt = build_page_prompts(page, pending, project_context)
+        result = await llm_router.complete(
+            "page",
+            SECTION_TARGETS,
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+        )
+        if result.text:
+            model_name = f"{result.provider}:{result.model}"
+            split_html = split_batched_sections(page, pending, result.text)
+    except Exception as e:
+        logging.error(f"Batched generation failed for page {page.id}, falling back to per-section calls: {e}", exc_info=True)
+
+    fallback: List[SectionData] = []
+    for section in pending:
+        html_content = split_html.get(str(section.id))
+        if html_content:
+            await section_html_cache.set(cache_keys[str(section.id)], html_content, model_name)
+            results.append((page_id_str, str(section.id), html_content))
+        else:
+            fallback.append(section)
+
+    if fallback:
+        logging.warning(f"Batched response for page {page.id} was missing {len(fallback)} section(s); generating them individually")
+        results.extend(await asyncio.gather(*(generate_section_html(section, page, project_context) for section in fallback)))
+    return results
+
+
+async def _generate_single(section: SectionData, page: PageData, project_context: Dict) -> List[Tuple[str, str, str]]:
+    return [await generate_section_html(section, page, project_context)]
+
+
+def shared_section_key(section: SectionData) -> Tuple[str, ...]:
+    """Sections with the same key on different pages are generated once and reused."""
+    section_name = " ".join(section.sectionName.split()).lower()
+    if section.is_global or section_name in GLOBAL_SECTION_NAMES:
+        return ("global", section_name)
+    return ("same", section_name, " ".join(section.section_description.split()).lower())
+
+
+def dedupe_shared_sections(
+    to_generate: List[Tuple[PageData, SectionData]]
+) -> Tuple[List[Tuple[PageData, SectionData]], Dict[Tuple[str, str], List[Tuple[str, str]]]]:
+    """
+    Keeps one representative per group of equivalent sections across pages.
+
+    Returns the (page, section) pairs that still need generating and, for each
+    representative `(page_id, section_id)`, the other sections that reuse its HTML.
+    Equivalent sections on the same page are left alone.
+    """
+    representatives: Dict[Tuple[str, ...], Tuple[PageData, SectionData]] = {}
+    copies: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+    unique: List[Tuple[PageData, SectionData]] = []
+    for page, section in to_generate:
+        key = shared_section_key(section)
+        representative = representatives.get(key)
+        if representative is None or representative[0].id == page.id:
+            representatives.setdefault(key, (page, section))
+            unique.append((page, section))
+            continue
+        rep_page, rep_section = representative
+        copies.setdefault((str(rep_page.id), str(rep_section.id)), []).append((str(page.id), str(section.id)))
+
+    if copies:
+        logging.info(f"Reusing {sum(len(c) for c in copies.values())} shared sections across pages ({len(unique)} unique sections to generate)")
+    return unique, copies
+
+
+def retarget_section_html(html_content: str, source: Tuple[str, str], target: Tuple[str, str]) -> str:
+    """Rewrites the `section-{page}-{section}` id of a reused section for the page it is copied to."""
+    source_id = f"section-{source[0]}-{source[1]}"
+    target_id = f"section-{target[0]}-{target[1]}"
+    return re.sub(
+        rf"""(["']){re.escape(source_id)}(["'])""",
+        lambda match: f"{match.group(1)}{target_id}{match.group(2)}",
+        html_content,
+        count=1,
+    )
+
+
+async def _with_shared_copies(
+    unit: Awaitable[List[Tuple[str, str, str]]],
+    copies: Dict[Tuple[str, str], List[Tuple[str, str]]]
+) -> List[Tuple[str, str, str]]:
+    results = await unit
+    expanded = list(results)
+    for page_id, section_id, html_content in results:
+        for target in copies.get((page_id, section_id), []):
+            expanded.append((target[0], target[1], retarget_section_html(html_content, (page_id, section_id), target)))
+    return expanded
+
+
+def build_generation_units(
+    to_generate: List[Tuple[PageData, SectionData]],
+    project_context: Dict,
+    batch_by_page: bool = False
+) -> List[Awaitable[List[Tuple[str, str, str]]]]:
+    """
+    Turns the sections to generate into awaitables that each produce a list of
+    `(page_id, section_id, html)` results: one per section, or one per page in batched mode.
+    Sections shared across pages (Navbar, Footer, ...) are generated once and their
+    result is returned for every page that uses them.
+    """
+    to_generate, copies = dedupe_shared_sections(to_generate)
+    return [_with_shared_copies(unit, copies) for unit in _build_units(to_generate, project_context, batch_by_page)]
+
+
+def _build_units(
+    to_generate: List[Tuple[PageData, SectionData]],
+    project_context: Dict,
+    batch_by_page: bool
+) -> List[Awaitable[List[Tuple[str, str, str]]]]:
+    if not batch_by_page:
+        return [_generate_single(section, page, project_context) for page, section in to_generate]
+
+    pages: Dict[str, PageData] = {}
+    sections_by_page: Dict[str, List[SectionData]] = {}
+    for page, section in to_generate:
+        pages.setdefault(str(page.id), page)
+        sections_by_page.setdefault(str(page.id), []).append(section)
+    return [
+        generate_page_sections_batched(pages[page_id], sections, project_context)
+        for page_id, sections in sections_by_page.items()
+    ]
+
+
+BODY_CLASS = "bg-gray-100 font-sans"
+MISSING_SECTION_CLASS = "bg-red-200 p-4 border border-red-400 text-red-800"
+TAILWIND_CDN_SCRIPT = '  <script src="https://cdn.tailwindcss.com"></script>'
+# Stands in for the site's styles in pages streamed before the whole site is known
+SITE_STYLES_PLACEHOLDER = "  <!-- site-styles -->"
+
+
+def build_site_styles(section_htmls: Iterable[str]) -> str:
+    """
+    Returns the <head> styling shared by every page of a site: by default a stylesheet
+    compiled from the classes the site uses, or with TAILWIND_MODE=cdn the Tailwind CDN
+    script. Classes outside the compiler's subset are logged and left unstyled.
+    """
+    if settings.TAILWIND_MODE == "cdn":
+        return TAILWIND_CDN_SCRIPT
+    classes = set(BODY_CLASS.split()) | set(MISSING_SECTION_CLASS.split())
+    for html in section_htmls:
+        classes.update(extract_classes(html))
+    return _inline_styles(frozenset(classes))
+
+
+@lru_cache(maxsize=256)
+def _inline_styles(classes: frozenset) -> str:
+    # Keyed by the site's class set, so re-reading an unchanged site does not recompile it
+    css, unsupported = compile_stylesheet(classes)
+    if unsupported:
+        logging.warning(f"Tailwind classes outside the inline compiler, left unstyled ({len(unsupported)}): {' '.join(unsupported[:20])}")
+    return f"  <style>\n{css}\n  </style>"
+
+
+def assemble_page_html(
+    page: PageData,
+    section_ids: List[str],
+    section_html_map: Dict[Tuple[str, str], str],
+    project_context: Dict,
+    styles: Optional[str] = None
+) -> str:
+    """
+    Wraps a page's sections in the HTML boilerplate. Pass the site's `build_site_styles`
+    as `styles` when assembling several pages; without it the page is styled on its own.
+    """
+    page_id_str = str(page.id)
+    body_parts = []
+
+    # page_html_parts.append(f"\n<!-- Start Page Content: {page.pageName} (ID: {page_id_str}) -->")
+    # page_html_parts.append(f"<main id='page-content-{page_id_str}' class='container mx-auto p-4 md:p-8'>")
+    # page_html_parts.append(f"  <h1 class='text-3xl md:text-4xl font-bold mb-6 md:mb-8 text-gray-800'>{page.pageName}</h1>")
+
+    for section_id_str in section_ids:
+        html_content = section_html_map.get((page_id_str, section_id_str))
+        if html_content:
+            body_parts.append(f"\n    <!-- Section ID: {section_id_str} -->")
+            body_parts.append(f"    {html_content}")
+        else:
+            logging.error(f"Critical: Missing HTML map entry for generated section {section_id_str} on page {page_id_str}")
+            original_section_title = next((s.sectionName for s in page.sections if str(s.id) == section_id_str), 'Unknown Section')
+            body_parts.append(f"    <section id='section-{page_id_str}-{section_id_str}' class='{MISSING_SECTION_CLASS}'>Internal error assembling content for section '{original_section_title}'.</section>")
+
+    body_parts.append("</main>")
+    body_parts.append(f"<!-- End Page Content: {page.pageName} -->\n")
+
+    # HTML Boilerplate
+    page_html_parts = []
+    page_html_parts.append("<!DOCTYPE html>")
+    page_html_parts.append("<html lang='en'>")
+    page_html_parts.append("<head>")
+    page_html_parts.append("  <meta charset='UTF-8'>")
+    # page_html_parts.append("  <meta name='viewport' content='width=device-width, initial-scale=1.0'>")
+    if styles is None:
+        styles = build_site_styles(section_html_map.get((page_id_str, section_id_str), "") for section_id_str in section_ids)
+    page_html_parts.append(styles)
+    page_html_parts.append(f"  <title>{project_context.get('business_name', '')}</title>")
+    page_html_parts.append("</head>")
+    page_html_parts.append(f"<body class='{BODY_CLASS}'>")
+    page_html_parts.extend(body_parts)
+    page_html_parts.append("</body>")
+    page_html_parts.append("</html>")
+
+    return "\n".join(page_html_parts)
+
+
+def is_error_section(html_content: str) -> bool:
+    return SECTION_ERROR_MARKER in html_content
+
+
+def section_fingerprint(section: SectionData, page: PageData, project_context: Dict) -> str:
+    """
+    Identifies everything that influences a section's generated HTML. Two sections with
+    the same fingerprint would be sent the exact same prompts, so their HTML is reusable.
+    """
+    system_prompt, user_prompt = build_section_prompts(section, page, project_context)
+    return make_cache_key(system_prompt, user_prompt, SECTION_MODEL_KEY)
+
+
+def get_active_website(db: Session, project_id: int) -> Optional[Website]:
+    return db.query(Website)\
+             .filter(Website.project_id == project_id, Website.is_active == True)\
+             .order_by(Website.id.desc())\
+             .first()
+
+
+def diff_against_previous(
+    db: Session,
+    project_id: int,
+    pages: List[PageData],
+    project_context: Dict
+) -> Tuple[Dict[Tuple[str, str], str], Dict[Tuple[str, str], str], List[Tuple[PageData, SectionData]]]:
+    """
+    Compares the requested pages with the project's last generated website.
+
+    Returns `(fingerprints, reused_html, to_generate)`: the fingerprint of every requested
+    section, the HTML copied forward for sections that are unchanged since the last
+    generation, and the (page, section) pairs that were added or modified.
+    """
+    previous_sections: Dict[Tuple[str, str], WebsiteSection] = {}
+    previous_website = get_active_website(db, project_id)
+    if previous_website:
+        for stored in previous_website.sections:
+            previous_sections[(stored.page_id, stored.section_id)] = stored
+
+    fingerprints: Dict[Tuple[str, str], str] = {}
+    reused_html: Dict[Tuple[str, str], str] = {}
+    to_generate: List[Tuple[PageData, SectionData]] = []
+    for page in pages:
+        for section in page.sections:
+            key = (str(page.id), str(section.id))
+            fingerprint = section_fingerprint(section, page, project_context)
+            fingerprints[key] = fingerprint
+            stored = previous_sections.get(key)
+            if stored and stored.fingerprint == fingerprint and not stored.has_error:
+                reused_html[key] = stored.html_code
+            else:
+                to_generate.append((page, section))
+
+    logging.info(f"Website diff for project {project_id}: {len(reused_html)} unchanged sections, {len(to_generate)} to generate")
+    return fingerprints, reused_html, to_generate
+
+
+def save_website_version(
+    db: Session,
+    project_id: int,
+    sitemap_id: int,
+    sitemap: SitemapStructure,
+    fingerprints: Dict[Tuple[str, str], str],
+    section_html_map: Dict[Tuple[str, str], str],
+    project_context: Dict,
+    user_id: int
+) -> Website:
+    """
+    Stores the generated sections as the project's new active website version. The
+    project row is locked first so concurrent saves for one project take turns, and
+    the previous version is deactivated in the same transaction as the insert.
+    """
+    try:
+        db.query(Project.id).filter(Project.id == project_id).with_for_update().first()
+        db.query(Website)\
+          .filter(Website.project_id == project_id, Website.is_active == True)\
+          .update({Website.is_active: False}, synchronize_session=False)
+
+        website = Website(
+            project_id=project_id,
+            sitemap_id=sitemap_id,
+            sitemap_structure=json.loads(sitemap.model_dump_json(by_alias=True)),
+            business_name=project_context.get("business_name"),
+            is_active=True,
+            created_by=user_id,
+        )
+        website.sections = [
+            WebsiteSection(
+                page_id=page_id,
+                section_id=section_id,
+                fingerprint=fingerprints[(page_id, section_id)],
+                html_code=html_content,
+                has_error=is_error_section(html_content),
+            )
+            for (page_id, section_id), html_content in section_html_map.items()
+        ]
+        db.add(website)
+        db.commit()
+        logging.info(f"Saved website version (ID: {website.id}) for project {project_id} with {len(website.sections)} sections")
+        return website
+    except Exception:
+        db.rollback()
+        raise
+
+
+def persist_website_in_new_session(*args) -> None:
+    """Runs `save_website_version` on a fresh session, for use outside a request's session."""
+    db = SessionLocal()
+    try:
+        save_website_version(db, *args)
+    finally:
+        db.close()
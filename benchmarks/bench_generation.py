@@ -0,0 +1,210 @@
+"""
+End-to-end generation benchmark, run fully offline against the fake LLM provider.
+
+Drives `/sitemap/generate` and `/website/create-website` in-process through the ASGI
+app, with SQLite standing in for Postgres, across sitemap sizes and request
+concurrency levels. Reports wall-clock time, per-request p50/p99 latency and peak
+memory for each scenario.
+
+    python -m benchmarks.bench_generation --sizes 1,10,50,200 --concurrency 1,4
+
+Provider behaviour is tuned through the usual settings, e.g.
+FAKE_LLM_LATENCY_MEDIAN_SECONDS, FAKE_LLM_FAILURE_RATE, FAKE_LLM_RATE_LIMIT_RATE,
+LLM_MAX_CONCURRENCY.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Dict, List
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,10,50,200", help="Comma-separated section counts per site")
+    parser.add_argument("--concurrency", default="1,4", help="Comma-separated numbers of concurrent requests")
+    parser.add_argument("--sections-per-page", type=int, default=5)
+    parser.add_argument("--batch-by-page", action="store_true", help="Use per-page batched generation")
+    parser.add_argument("--skip-sitemap", action="store_true", help="Only benchmark /website/create-website")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    return parser.parse_args()
+
+
+def configure_environment() -> None:
+    """Points the app at the fake provider before any app module reads its settings."""
+    defaults = {
+        "LLM_SECTION_TARGETS": "fake:fake-html",
+        "LLM_SITEMAP_TARGETS": "fake:fake-sitemap",
+        "SECTION_CACHE_PERSIST": "false",
+        # Measure generation, not near-duplicate reuse of the benchmark's repeated requests
+        "SITEMAP_REUSE_ENABLED": "false",
+        "FAKE_LLM_LATENCY_MEDIAN_SECONDS": "0.05",
+        "DB_USER": "bench",
+        "DB_PASSWORD": "bench",
+        "DB_NAME": "bench",
+        "SECRET_KEY": "bench",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+        # Never used: all calls go to the fake provider
+        "OPENAI_API_KEY": "unused",
+        "GEMINI_API_KEY": "unused",
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def build_sitemap(section_count: int, sections_per_page: int, nonce: str) -> Dict:
+    pages = []
+    for index in range(0, section_count, sections_per_page):
+        page_number = len(pages) + 1
+        pages.append({
+            "id": f"page{page_number}",
+            "label": f"Page {page_number}",
+            "sections": [
+                {"id": section, "title": f"Feature Section {section}", "description": f"Feature block {section} ({nonce})"}
+                for section in range(index + 1, min(index + sections_per_page, section_count) + 1)
+            ],
+        })
+    return {"Pages": pages}
+
+
+async def main() -> None:
+    args = parse_args()
+    configure_environment()
+
+    import httpx
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.main import app
+    from app.core.db_setup import Base, get_db
+    from app.services.auth_service import get_current_user
+    from app.services.section_cache import section_html_cache
+    from app.entities.user_entities import User
+    from app.entities.project_entities import Project
+    from app.entities.sitemap_entities import Sitemap
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    BenchSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with BenchSession() as db:
+        user = User(mail="bench@example.com", password="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    def override_get_db():
+        db = BenchSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def override_current_user():
+        with BenchSession() as db:
+            return db.get(User, user_id)
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_current_user
+
+    def new_sitemap_row() -> int:
+        with BenchSession() as db:
+            project = Project(project_name=f"Bench {uuid.uuid4().hex[:8]}", created_by=user_id)
+            db.add(project)
+            db.flush()
+            sitemap = Sitemap(project_id=project.id, sitemap_data={}, is_active=True, created_by=user_id)
+            db.add(sitemap)
+            db.commit()
+            return sitemap.id
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def run_scenario(name: str, size: int, concurrency: int, make_request) -> None:
+            section_html_cache._memory.clear()
+            tracemalloc.start()
+            latencies: List[float] = []
+            statuses: List[int] = []
+
+            async def one(index: int) -> None:
+                started = time.perf_counter()
+                response = await make_request(index)
+                latencies.append(time.perf_counter() - started)
+                statuses.append(response.status_code)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(index) for index in range(concurrency)))
+            wall = time.perf_counter() - started
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results.append({
+                "scenario": name,
+                "size": size,
+                "concurrency": concurrency,
+                "wall_s": round(wall, 3),
+                "p50_s": round(statistics.median(latencies), 3),
+                "p99_s": round(percentile(latencies, 0.99), 3),
+                "errors": sum(1 for code in statuses if code >= 400),
+                "py_peak_mb": round(traced_peak / (1024 * 1024), 2),
+                "rss_peak_mb": round(peak_rss_mb(), 1),
+            })
+
+        sizes = [int(value) for value in args.sizes.split(",")]
+        levels = [int(value) for value in args.concurrency.split(",")]
+
+        if not args.skip_sitemap:
+            for concurrency in levels:
+                async def sitemap_request(index: int):
+                    return await client.post("/sitemap/generate", json={
+                        "businessName": f"Bench {index}",
+                        "businessDescription": "A benchmark business",
+                        "page": 5,
+                    })
+                await run_scenario("sitemap", 5, concurrency, sitemap_request)
+
+        for size in sizes:
+            for concurrency in levels:
+                sitemap_ids = [new_sitemap_row() for _ in range(concurrency)]
+                nonce = uuid.uuid4().hex
+
+                async def website_request(index: int):
+                    return await client.post("/website/create-website", json={
+                        "project_id": sitemap_ids[index],
+                        "sitemap": build_sitemap(size, args.sections_per_page, f"{nonce}-{index}"),
+                        "business_name": "Bench Co",
+                        "batch_by_page": args.batch_by_page,
+                    })
+                await run_scenario("create-website", size, concurrency, website_request)
+
+    if args.json:
+        for row in results:
+            print(json.dumps(row))
+        return
+
+    columns = ["scenario", "size", "concurrency", "wall_s", "p50_s", "p99_s", "errors", "py_peak_mb", "rss_peak_mb"]
+    print(" ".join(f"{column:>14}" for column in columns))
+    for row in results:
+        print(" ".join(f"{row[column]!s:>14}" for column in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Settings are read at import time; give the required ones harmless values so the
+# app modules import without a .env, and keep every cache in-process.
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+os.environ.setdefault("DB_NAME", "test")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("SECTION_CACHE_PERSIST", "false")
+# Generate offline through the fake provider, with short simulated latency
+os.environ.setdefault("LLM_SECTION_TARGETS", "fake:fake-model")
+os.environ.setdefault("LLM_SITEMAP_TARGETS", "fake:fake-model")
+os.environ.setdefault("FAKE_LLM_LATENCY_MEDIAN_SECONDS", "0.01")
+os.environ.setdefault("FAKE_LLM_LATENCY_SIGMA", "0.1")
+
+
+@pytest.fixture
+def db():
+    """A session on a fresh in-memory SQLite database with every table created."""
+    import app.main  # noqa: F401  (registers every entity, so relationships resolve)
+    from app.core.db_setup import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def user(db):
+    from app.entities.user_entities import User
+
+    user = User(mail="owner@example.com", password="not-a-real-hash")
+    db.add(user)
+    db.commit()
+    return user
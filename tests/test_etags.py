@@ -0,0 +1,118 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.db_setup import get_db
+from app.entities.project_entities import Project
+from app.entities.sitemap_entities import Sitemap
+from app.entities.user_entities import User
+from app.main import app
+from app.routes import project_routes
+from app.services.auth_service import get_current_user
+from app.services.etags import etag_matches, project_etag, sitemap_version_etag
+from app.services.project_cache import ProjectCache
+
+SITEMAP = {"Pages": [{"pageName": "Home", "sections": []}]}
+
+
+@pytest.fixture
+def client(db, user, monkeypatch):
+    """A client authenticated as `user`; set `client.current_user` to act as someone else."""
+    client = TestClient(app)
+    client.current_user = user
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: client.current_user
+    monkeypatch.setattr(project_routes, "project_cache", ProjectCache(enabled=False, max_entries=16, ttl_seconds=60))
+    yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def project(db, user):
+    project = Project(project_name="Bakery", created_by=user.id)
+    db.add(project)
+    db.commit()
+    db.add(Sitemap(project_id=project.id, version_number=1, storage_kind="snapshot", sitemap_data=SITEMAP, is_active=True))
+    db.commit()
+    return project
+
+
+@pytest.fixture
+def stranger(db):
+    stranger = User(mail="stranger@example.com", password="not-a-real-hash")
+    db.add(stranger)
+    db.commit()
+    return stranger
+
+
+def test_if_none_match_uses_the_weak_comparison():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"old", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"old"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_etags_change_with_what_the_representation_depends_on():
+    assert project_etag(1, None, 5) != project_etag(1, None, 6)
+    assert project_etag(1, None, 5) != project_etag(2, None, 5)
+    assert sitemap_version_etag(1, 5, True) != sitemap_version_etag(1, 5, False)
+    assert sitemap_version_etag(1, 5, True) != sitemap_version_etag(2, 5, True)
+
+
+@pytest.mark.parametrize("cache_enabled", [False, True])
+def test_project_read_is_answered_with_304_while_unchanged(client, db, project, monkeypatch, cache_enabled):
+    monkeypatch.setattr(project_routes, "project_cache", ProjectCache(enabled=cache_enabled, max_entries=16, ttl_seconds=60))
+    first = client.get(f"/projects/{project.id}")
+    assert first.status_code == 200 and first.json()["active_sitemap"]["sitemap_data"] == SITEMAP
+    etag = first.headers["ETag"]
+
+    revalidated = client.get(f"/projects/{project.id}", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.headers["ETag"] == etag and revalidated.content == b""
+
+    db.query(Sitemap).filter(Sitemap.project_id == project.id).update({"is_active": False})
+    db.add(Sitemap(project_id=project.id, version_number=2, storage_kind="snapshot", sitemap_data=SITEMAP, is_active=True))
+    db.commit()
+    project_routes.project_cache.invalidate(project.id)
+    changed = client.get(f"/projects/{project.id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("cache_enabled", [False, True])
+def test_matching_etag_from_another_user_is_forbidden_not_304(client, project, stranger, monkeypatch, cache_enabled):
+    monkeypatch.setattr(project_routes, "project_cache", ProjectCache(enabled=cache_enabled, max_entries=16, ttl_seconds=60))
+    etag = client.get(f"/projects/{project.id}").headers["ETag"]
+
+    client.current_user = stranger
+    assert client.get(f"/projects/{project.id}", headers={"If-None-Match": etag}).status_code == 403
+    assert client.get(f"/projects/{project.id}", headers={"If-None-Match": "*"}).status_code == 403
+
+
+def test_deleted_project_is_not_answered_with_304(client, db, project):
+    etag = client.get(f"/projects/{project.id}").headers["ETag"]
+    project.deleted_at = project.created_at
+    db.commit()
+    assert client.get(f"/projects/{project.id}", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_sitemap_version_read_is_answered_with_304_only_for_its_owner(client, db, project, stranger):
+    sitemap_id = project.active_sitemap.id
+    url = f"/sitemap/history/{project.id}/{sitemap_id}"
+    first = client.get(url)
+    assert first.status_code == 200 and first.json()["sitemap_data"] == SITEMAP
+    etag = first.headers["ETag"]
+    assert etag == sitemap_version_etag(project.id, sitemap_id, True)
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    client.current_user = stranger
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 403
+
+
+def test_sitemap_version_of_another_project_is_not_found_even_with_a_wildcard(client, db, user, project):
+    other = Project(project_name="Florist", created_by=user.id)
+    db.add(other)
+    db.commit()
+    url = f"/sitemap/history/{other.id}/{project.active_sitemap.id}"
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 404
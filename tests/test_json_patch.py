@@ -0,0 +1,144 @@
+import importlib.util
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from app.services.json_patch import JsonPatchError, apply_patch, make_patch
+
+MIGRATION = Path(__file__).resolve().parents[1] / "alembic/versions/3e8a1c5f9d27_store_sitemap_versions_as_deltas.py"
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("delta_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    roll = rng.random()
+    if depth >= 3 or roll < 0.3:
+        return rng.choice([0, 1, 1.0, True, False, None, "a", "", "x/y", "~0", "~1"])
+    if roll < 0.65:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 6))]
+    return {rng.choice(["a", "b", "c/d", "e~f", "", "0", "-"]): random_value(rng, depth + 1) for _ in range(rng.randint(0, 5))}
+
+
+def mutate(value, rng: random.Random):
+    """A copy of `value` with a few random edits, like a user editing a sitemap."""
+    if isinstance(value, list) and value and rng.random() < 0.7:
+        value = list(value)
+        index = rng.randrange(len(value))
+        action = rng.choice(["edit", "insert", "delete"])
+        if action == "edit":
+            value[index] = mutate(value[index], rng)
+        elif action == "insert":
+            value.insert(index, random_value(rng, 2))
+        else:
+            del value[index]
+        return value
+    if isinstance(value, dict) and value and rng.random() < 0.7:
+        value = dict(value)
+        key = rng.choice(list(value))
+        value[key] = mutate(value[key], rng)
+        return value
+    return random_value(rng)
+
+
+def as_json(value) -> str:
+    # `==` treats 1, 1.0 and True as equal; their JSON does not
+    return json.dumps(value, sort_keys=True)
+
+
+def sitemap(page_count: int) -> dict:
+    return {
+        "Sitemap": "Home, About",
+        "Pages": [
+            {"pageId": str(index), "pageName": f"Page {index}",
+             "sections": [{"sectionName": name, "section_description": f"{name} {index}"} for name in ("Navbar", "Hero", "Footer")]}
+            for index in range(page_count)
+        ],
+    }
+
+
+def test_identical_documents_need_no_patch():
+    assert make_patch(sitemap(3), sitemap(3)) == []
+
+
+def test_inserting_a_page_is_a_single_add():
+    source = sitemap(5)
+    target = sitemap(5)
+    target["Pages"].insert(2, {"pageId": "new", "pageName": "Pricing", "sections": []})
+    patch = make_patch(source, target)
+    assert patch == [{"op": "add", "path": "/Pages/2", "value": target["Pages"][2]}]
+    assert apply_patch(source, patch) == target
+
+
+def test_removing_a_section_is_a_single_remove():
+    source = sitemap(2)
+    target = sitemap(2)
+    del target["Pages"][1]["sections"][1]
+    assert make_patch(source, target) == [{"op": "remove", "path": "/Pages/1/sections/1"}]
+
+
+def test_keys_are_escaped_in_paths():
+    patch = make_patch({"a/b": 1, "c~d": 1}, {"a/b": 2, "c~d": 2})
+    assert sorted(operation["path"] for operation in patch) == ["/a~1b", "/c~0d"]
+
+
+def test_booleans_and_numbers_are_not_confused():
+    for source, target in (([1, True], [True, 1]), ({"a": [1]}, {"a": [1.0]}), ([{"b": 0}], [{"b": False}])):
+        patch = make_patch(source, target)
+        assert patch != []
+        assert as_json(apply_patch(source, patch)) == as_json(target)
+
+
+def test_apply_patch_does_not_modify_its_input():
+    source = sitemap(2)
+    apply_patch(source, [{"op": "remove", "path": "/Pages/0"}])
+    assert source == sitemap(2)
+
+
+def test_apply_patch_supports_move_copy_and_test():
+    document = {"a": [1, 2], "b": {}}
+    patch = [
+        {"op": "test", "path": "/a/0", "value": 1},
+        {"op": "copy", "from": "/a", "path": "/b/a"},
+        {"op": "move", "from": "/a/1", "path": "/a/-"},
+        {"op": "add", "path": "/a/-", "value": 3},
+    ]
+    assert apply_patch(document, patch) == {"a": [1, 2, 3], "b": {"a": [1, 2]}}
+
+
+@pytest.mark.parametrize("patch", [
+    [{"op": "remove", "path": "/missing"}],
+    [{"op": "add", "path": "/a/9", "value": 1}],
+    [{"op": "test", "path": "/a/0", "value": 2}],
+    [{"op": "replace", "path": "a"}],
+    [{"op": "frobnicate", "path": "/a"}],
+    [{"op": "add", "value": 1}],
+])
+def test_invalid_patches_raise_json_patch_error(patch):
+    with pytest.raises(JsonPatchError):
+        apply_patch({"a": [1]}, patch)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_make_then_apply_round_trips(seed):
+    rng = random.Random(seed)
+    source = random_value(rng)
+    target = mutate(source, rng) if rng.random() < 0.8 else random_value(rng)
+    patch = make_patch(source, target)
+    assert as_json(apply_patch(source, patch)) == as_json(target)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_migration_replay_matches_apply_patch(seed):
+    migration = load_migration()
+    rng = random.Random(seed)
+    source = random_value(rng)
+    target = mutate(source, rng)
+    patch = make_patch(source, target)
+    assert as_json(migration._apply_patch(source, patch)) == as_json(apply_patch(source, patch)) == as_json(target)
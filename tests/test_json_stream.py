@@ -0,0 +1,103 @@
+import json
+import random
+
+import pytest
+
+from app.services.json_stream import StreamingArrayParser, repair_json, strip_code_fences
+
+TRICKY_STRINGS = ['plain', 'with "quotes"', 'braces { [ ] }', 'back\\slash', 'comma, colon:', 'unicode é ☕', '']
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    roll = rng.random()
+    if depth >= 3 or roll < 0.4:
+        return rng.choice([rng.randint(-100, 100), rng.random(), True, False, None, rng.choice(TRICKY_STRINGS)])
+    if roll < 0.7:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {rng.choice(TRICKY_STRINGS) + str(index): random_value(rng, depth + 1) for index in range(rng.randint(0, 4))}
+
+
+def random_sitemap(rng: random.Random) -> dict:
+    pages = [
+        {"pageId": str(index), "pageName": rng.choice(TRICKY_STRINGS), "sections": random_value(rng, 1)}
+        for index in range(rng.randint(0, 6))
+    ]
+    document = {"Sitemap": rng.choice(TRICKY_STRINGS), "Pages": pages}
+    if rng.random() < 0.5:
+        document["Notes"] = random_value(rng)
+    return document
+
+
+def random_chunks(text: str, rng: random.Random):
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 12)
+        yield text[position:position + size]
+        position += size
+
+
+def test_parser_emits_each_page_once_complete():
+    parser = StreamingArrayParser("Pages")
+    assert parser.feed('```json\n{"Sitemap": "Home", "Pages": [{"pageId": "1", "sec') == []
+    assert parser.feed('tions": []}, {"pageId": "2"') == [{"pageId": "1", "sections": []}]
+    assert parser.feed(', "sections": [1]}]}\n```') == [{"pageId": "2", "sections": [1]}]
+
+
+def test_parser_matches_key_case_insensitively_at_the_root_only():
+    parser = StreamingArrayParser("pages")
+    assert parser.feed('{"Meta": {"Pages": [{"x": 1}]}, "PAGES": [{"y": 2}]}') == [{"y": 2}]
+
+
+def test_parser_ignores_text_after_the_root_object():
+    parser = StreamingArrayParser("Pages")
+    assert parser.feed('{"Pages": [{"a": 1}]} {"Pages": [{"b": 2}]}') == [{"a": 1}]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_parser_agrees_with_json_loads_for_any_chunking(seed):
+    rng = random.Random(seed)
+    document = random_sitemap(rng)
+    text = "```json\n" + json.dumps(document, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2])) + "\n```"
+
+    parser = StreamingArrayParser("Pages")
+    emitted = [element for chunk in random_chunks(text, rng) for element in parser.feed(chunk)]
+
+    assert emitted == [page for page in document["Pages"] if isinstance(page, (dict, list))]
+
+
+def test_strip_code_fences():
+    assert strip_code_fences('Here you go:\n```json\n{"a": 1}\n```\nEnjoy') == '{"a": 1}'
+    assert strip_code_fences("no json here") == "no json here"
+
+
+def test_repair_json_reports_whether_a_repair_was_needed():
+    assert repair_json('```json\n{"a": [1, 2]}\n```') == ({"a": [1, 2]}, False)
+    assert repair_json('{"a": [1, 2') == ({"a": [1, 2]}, True)
+    assert repair_json('{"a": "unterminated') == ({"a": "unterminated"}, True)
+    assert repair_json('{"a": 1, "b":') == ({"a": 1, "b": None}, True)
+
+
+def test_repair_json_cuts_back_to_an_element_boundary():
+    value, repaired = repair_json('{"Pages": [{"pageId": "1"}, {"pageId": "2", "sections": [tr')
+    assert repaired
+    assert value["Pages"][0] == {"pageId": "1"}
+
+
+def test_repair_json_raises_when_nothing_is_recoverable():
+    with pytest.raises(json.JSONDecodeError):
+        repair_json("not json at all")
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_repair_json_on_every_prefix(seed):
+    rng = random.Random(seed)
+    document = random_sitemap(rng)
+    text = json.dumps(document)
+
+    assert repair_json(text) == (document, False)
+    for cut in range(1, len(text)):
+        try:
+            value, _ = repair_json(text[:cut])
+        except json.JSONDecodeError:
+            continue
+        assert isinstance(value, (dict, list))
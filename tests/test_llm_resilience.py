@@ -0,0 +1,132 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services import llm_resilience
+from app.services.fake_llm_provider import FakeProviderError
+from app.services.llm_resilience import (BudgetExhaustedError, CallStats, get_latency_tracker, request_budget,
+                                         resilient_call)
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(llm_resilience, "_latency_trackers", {})
+    monkeypatch.setattr("app.core.settings.settings.LLM_RETRY_BASE_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr("app.core.settings.settings.LLM_RETRY_MAX_DELAY_SECONDS", 0.02)
+    monkeypatch.setattr("app.core.settings.settings.LLM_HEDGE_ENABLED", False)
+
+
+class FlakyCall:
+    """Fails with `errors` in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def test_retryable_errors_are_retried_until_success():
+    call, stats = FlakyCall(FakeProviderError("busy", 429), ConnectionError("reset")), CallStats()
+    assert asyncio.run(resilient_call("op", call, call_stats=stats)) == "ok"
+    assert call.calls == stats.attempts == 3 and stats.latency is not None
+
+
+def test_client_errors_are_not_retried():
+    call = FlakyCall(FakeProviderError("bad request", 400))
+    with pytest.raises(FakeProviderError):
+        asyncio.run(resilient_call("op", call))
+    assert call.calls == 1
+
+
+def test_retries_stop_when_the_request_budget_runs_out(monkeypatch):
+    monkeypatch.setattr("app.core.settings.settings.LLM_MAX_RETRIES", 1000)
+    call = FlakyCall(*[ConnectionError("reset")] * 1000)
+
+    async def run():
+        with request_budget(0.3):
+            await resilient_call("op", call)
+
+    started = time.monotonic()
+    with pytest.raises((ConnectionError, BudgetExhaustedError)):
+        asyncio.run(run())
+    assert time.monotonic() - started < 0.5
+    assert 1 < call.calls < 1000
+
+
+def test_waiting_for_admission_is_bounded_by_the_budget_and_not_retried(monkeypatch):
+    monkeypatch.setattr("app.core.settings.settings.LLM_CALL_TIMEOUT_SECONDS", 0.05)
+    call, stats = FlakyCall(), CallStats()
+
+    @asynccontextmanager
+    async def slow_slot():
+        await asyncio.sleep(1)
+        yield
+
+    async def run():
+        with request_budget(0.1):
+            return await resilient_call("op", call, admission=slow_slot, call_stats=stats)
+
+    with pytest.raises(BudgetExhaustedError):
+        asyncio.run(run())
+    assert call.calls == 0 and stats.attempts == 1
+
+
+def test_time_spent_queued_for_admission_is_not_provider_time(monkeypatch):
+    # A queue wait longer than the call timeout must not time the call out
+    monkeypatch.setattr("app.core.settings.settings.LLM_CALL_TIMEOUT_SECONDS", 0.1)
+
+    @asynccontextmanager
+    async def queued_slot():
+        await asyncio.sleep(0.2)
+        yield
+
+    stats = CallStats()
+    assert asyncio.run(resilient_call("op", FlakyCall(), admission=queued_slot, call_stats=stats)) == "ok"
+    assert stats.attempts == 1 and stats.latency < 0.1
+
+
+def test_slow_calls_are_hedged_after_the_p95_latency(monkeypatch):
+    monkeypatch.setattr("app.core.settings.settings.LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr("app.core.settings.settings.LLM_HEDGE_MIN_SAMPLES", 20)
+    tracker = get_latency_tracker("op")
+    for _ in range(20):
+        tracker.record(0.05)
+
+    outcomes = []
+
+    async def call():
+        if not outcomes:
+            outcomes.append("primary started")
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                outcomes.append("primary cancelled")
+                raise
+        return "hedge"
+
+    stats = CallStats()
+    started = time.monotonic()
+    assert asyncio.run(resilient_call("op", call, call_stats=stats)) == "hedge"
+    assert time.monotonic() - started < 1
+    assert stats.hedged and outcomes == ["primary started", "primary cancelled"]
+
+
+def test_calls_are_not_hedged_without_enough_samples(monkeypatch):
+    monkeypatch.setattr("app.core.settings.settings.LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr("app.core.settings.settings.LLM_HEDGE_MIN_SAMPLES", 20)
+    get_latency_tracker("op").record(0.001)
+
+    async def call():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    stats = CallStats()
+    assert asyncio.run(resilient_call("op", call, call_stats=stats)) == "ok"
+    assert not stats.hedged
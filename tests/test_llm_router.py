@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from app.services import llm_resilience, rate_limiter
+from app.services.fake_llm_provider import FakeLLMProvider, FakeProviderError
+from app.services.llm_providers import LLMProvider, LLMResult
+from app.services.llm_router import LLMRouter, LLMTarget, LLMUnavailableError
+
+FAKE = [LLMTarget("fake", "fake-model")]
+BROKEN_THEN_OK = LLMTarget.parse_list("fake:broken, fake:ok")
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+    monkeypatch.setattr(llm_resilience, "_latency_trackers", {})
+    monkeypatch.setattr("app.core.settings.settings.LLM_MAX_RETRIES", 0)
+
+
+class ScriptedProvider(LLMProvider):
+    """Answers instantly with the model's name; models in `failing` raise a 503."""
+
+    name = "fake"
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    async def complete(self, model, system_prompt, user_prompt, response_format=None) -> LLMResult:
+        self.calls.append(model)
+        if model in self.failing:
+            raise FakeProviderError("Simulated provider error", status_code=503)
+        return LLMResult(text=model, provider=self.name, model=model, input_tokens=1, output_tokens=1)
+
+    async def stream(self, model, system_prompt, user_prompt):
+        yield model
+
+
+async def drain(chunks) -> str:
+    return "".join([chunk async for chunk in chunks])
+
+
+def test_stream_start_rate_limit_shrinks_the_concurrency_limit(monkeypatch):
+    monkeypatch.setattr("app.core.settings.settings.FAKE_LLM_RATE_LIMIT_RATE", 1.0)
+    router = LLMRouter(providers={"fake": FakeLLMProvider()})
+    limiter = rate_limiter.get_provider_limiter("fake")
+    initial_limit = limiter.concurrency.limit
+
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(drain(router.stream("sitemap", FAKE, "A bakery")))
+
+    assert limiter.concurrency.limit == initial_limit * limiter.concurrency.decrease_factor
+    # the failed start is not a latency sample and its slot is given back
+    assert limiter.concurrency.latency_ewma is None and limiter.concurrency.in_flight == 0
+
+
+def test_parse_list_reads_provider_model_pairs():
+    assert [target.key for target in LLMTarget.parse_list(" gemini:gemini-2.0-flash, ,openai:gpt-4o-mini ")] == \
+        ["gemini:gemini-2.0-flash", "openai:gpt-4o-mini"]
+
+
+def test_failed_target_fails_over_to_the_next_one():
+    provider = ScriptedProvider(failing={"broken"})
+    router = LLMRouter(providers={"fake": provider})
+
+    assert asyncio.run(router.complete("section", BROKEN_THEN_OK, "prompt")).text == "ok"
+    assert provider.calls == ["broken", "ok"]
+    assert router.health(BROKEN_THEN_OK[0]).consecutive_failures == 1
+
+
+def test_target_with_an_open_breaker_is_skipped_while_another_is_healthy(monkeypatch):
+    monkeypatch.setattr("app.core.settings.settings.LLM_CIRCUIT_FAILURE_THRESHOLD", 2)
+    provider = ScriptedProvider(failing={"broken"})
+    router = LLMRouter(providers={"fake": provider})
+    # measured fastest, so only its breaker keeps it from being tried first
+    router.health(BROKEN_THEN_OK[0]).record_success("section", 0.0)
+
+    async def run():
+        for _ in range(4):
+            await router.complete("section", BROKEN_THEN_OK, "prompt")
+
+    asyncio.run(run())
+    # the breaker opened after two failures; later calls go straight to the healthy target
+    assert provider.calls == ["broken", "ok", "broken", "ok", "ok", "ok"]
+    assert not router.health(BROKEN_THEN_OK[0]).is_healthy()
+    assert [target.key for target in router.rank(BROKEN_THEN_OK, "section")] == ["fake:ok", "fake:broken"]
+
+
+def test_measured_targets_are_ranked_by_latency():
+    router = LLMRouter(providers={"fake": ScriptedProvider()})
+    slow, fast = LLMTarget.parse_list("fake:slow, fake:fast")
+    router.health(slow).record_success("section", 2.0)
+    router.health(fast).record_success("section", 0.5)
+    assert router.rank([slow, fast], "section") == [fast, slow]
+    # latency is tracked per operation
+    assert router.rank([slow, fast], "sitemap") == [slow, fast]
+
+
+def test_all_targets_failing_raises_unavailable():
+    router = LLMRouter(providers={"fake": ScriptedProvider(failing={"broken", "ok"})})
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(router.complete("section", BROKEN_THEN_OK, "prompt"))
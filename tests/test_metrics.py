@@ -0,0 +1,79 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.fake_llm_provider import FakeProviderError
+from app.services.llm_telemetry import LLMTelemetryMiddleware, call_outcome, estimate_cost, record_llm_call
+from app.services.metrics import MetricsRegistry
+
+
+def test_counters_render_in_the_text_exposition_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs by state.", ("state",))
+    counter.inc(state="done")
+    counter.inc(2, state='say "hi"\n')
+
+    assert registry.render() == (
+        "# HELP jobs_total Jobs by state.\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{state="done"} 1\n'
+        'jobs_total{state="say \\"hi\\"\\n"} 2\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.5, 1, 2))
+    for value in (0.2, 0.7, 5):
+        histogram.observe(value, route="/a")
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.5"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="2"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.9',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_registering_a_metric_twice_returns_the_same_one():
+    registry = MetricsRegistry()
+    assert registry.counter("a_total", "A.") is registry.counter("a_total", "A.")
+
+
+def test_call_outcomes_and_costs():
+    assert call_outcome(None) == "success"
+    assert call_outcome(FakeProviderError("slow down", status_code=429)) == "rate_limited"
+    assert call_outcome(asyncio.TimeoutError()) == "timeout"
+    assert call_outcome(FakeProviderError("boom", status_code=503)) == "error"
+    assert estimate_cost("gpt-4o-mini", 1_000_000, 1_000_000) == 0.75
+    assert estimate_cost("unknown-model", 1_000_000, 1_000_000) == 0
+
+
+def test_llm_calls_are_exported_on_metrics_with_the_request_route():
+    async def endpoint(scope, receive, send):
+        record_llm_call("section", "fake", "metrics-test-model", 0.3, attempts=3, input_tokens=120, output_tokens=480)
+        record_llm_call("section", "fake", "metrics-test-model", 0.1, attempts=1, exc=FakeProviderError("slow down", 429))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    asyncio.run(LLMTelemetryMiddleware(endpoint)({"type": "http", "method": "POST", "path": "/website/create-website"}, receive, send))
+
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    labels = 'route="POST /website/create-website",provider="fake",model="metrics-test-model",operation="section"'
+    body = response.text
+    assert f"llm_calls_total{{{labels},outcome=\"success\"}} 1" in body
+    assert f"llm_calls_total{{{labels},outcome=\"rate_limited\"}} 1" in body
+    assert f"llm_tokens_total{{{labels},direction=\"output\"}} 480" in body
+    assert f"llm_retries_total{{{labels}}} 2" in body
+    assert f"llm_call_latency_seconds_count{{{labels}}} 2" in body
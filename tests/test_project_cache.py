@@ -0,0 +1,90 @@
+import pytest
+
+from app.entities.project_entities import Project
+from app.entities.sitemap_entities import Sitemap
+from app.services.project_cache import ACTIVE_SITEMAP_FIELDS, PROJECT_FIELDS, ProjectCache
+
+SITEMAP = {"Pages": [{"pageName": "Home", "sections": []}]}
+
+
+@pytest.fixture
+def cache():
+    return ProjectCache(enabled=True, max_entries=16, ttl_seconds=60)
+
+
+@pytest.fixture
+def project(db, user):
+    project = Project(project_name="Bakery", created_by=user.id)
+    db.add(project)
+    db.commit()
+    db.add(Sitemap(project_id=project.id, version_number=1, storage_kind="snapshot", sitemap_data=SITEMAP, is_active=True))
+    db.commit()
+    return project
+
+
+def activate_new_version(db, project) -> Sitemap:
+    db.query(Sitemap).filter(Sitemap.project_id == project.id).update({"is_active": False})
+    new_version = Sitemap(project_id=project.id, version_number=2, storage_kind="snapshot", sitemap_data=SITEMAP, is_active=True)
+    db.add(new_version)
+    db.commit()
+    return new_version
+
+
+def test_load_caches_only_the_served_fields(db, cache, project):
+    value = cache.load(db, project.id)
+
+    assert cache.get_cached(project.id) == value
+    assert set(value["project"]) == set(PROJECT_FIELDS)
+    assert set(value["active_sitemap"]) == set(ACTIVE_SITEMAP_FIELDS)
+    assert not {"version_number", "storage_kind", "sitemap_patch"} & set(value["active_sitemap"])
+    assert value["active_sitemap"]["sitemap_data"] == SITEMAP
+
+
+def test_invalidate_drops_the_entry(db, cache, project):
+    cache.load(db, project.id)
+    cache.invalidate(project.id)
+    assert cache.get_cached(project.id) is None
+
+
+def test_load_racing_an_invalidation_is_not_cached(db, cache, project):
+    backend_set = cache._backend.set
+
+    def set_after_concurrent_write(key, value):
+        # a save commits and invalidates between our read and our cache write
+        cache.invalidate(project.id)
+        backend_set(key, value)
+
+    cache._backend.set = set_after_concurrent_write
+    assert cache.load(db, project.id)["project"]["id"] == project.id
+    assert cache.get_cached(project.id) is None
+
+
+def test_lookup_by_a_sitemap_that_is_no_longer_active_misses(db, cache, project):
+    old_sitemap_id = cache.load(db, project.id)["active_sitemap"]["id"]
+    assert cache.get_by_active_sitemap(old_sitemap_id)["project"]["id"] == project.id
+
+    new_version = activate_new_version(db, project)
+    cache.invalidate(project.id)
+    cache.load(db, project.id)
+
+    # the old sitemap id still points at the project, whose active sitemap has changed
+    assert cache.get_by_active_sitemap(old_sitemap_id) is None
+    assert cache.get_by_active_sitemap(new_version.id)["active_sitemap"]["id"] == new_version.id
+
+
+def test_deleted_projects_are_not_loaded(db, cache, project):
+    project.deleted_at = project.created_at
+    db.commit()
+    assert cache.load(db, project.id) is None and cache.get_cached(project.id) is None
+
+
+def test_disabled_cache_still_loads_but_never_stores(db, project):
+    cache = ProjectCache(enabled=False, max_entries=16, ttl_seconds=60)
+    assert cache.load(db, project.id)["project"]["id"] == project.id
+    assert cache.get_cached(project.id) is None
+
+
+def test_unreachable_redis_disables_the_cache():
+    # Nothing listens on port 1, so the startup ping fails
+    cache = ProjectCache(enabled=True, max_entries=16, ttl_seconds=60, redis_url="redis://127.0.0.1:1/0")
+    assert cache.enabled is False
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registers every entity, so relationships resolve)
+from app.entities.project_entities import Project
+from app.entities.user_entities import User
+from app.services.keyset import decode_cursor, encode_cursor
+from app.services.project_listing import _escape_like, list_user_projects, search_user_projects
+
+START = datetime(2026, 3, 1, 9, 30)
+
+
+def test_cursor_round_trips():
+    created_at = datetime(2026, 3, 1, 9, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "bm90IGpzb24=", encode_cursor(START, 1)[:-4], "WzEsIDJd"])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def add_projects(db, user, created_ats):
+    projects = [Project(project_name=f"Site {index}", created_by=user.id, created_at=created_at)
+                for index, created_at in enumerate(created_ats)]
+    db.add_all(projects)
+    db.commit()
+    return projects
+
+
+def test_pages_walk_every_project_newest_first_exactly_once(db, user):
+    # Several projects share a created_at, so the id has to break ties across page boundaries
+    created_ats = [START + timedelta(minutes=index // 3) for index in range(10)]
+    projects = add_projects(db, user, created_ats)
+    expected = [project.id for project in sorted(projects, key=lambda p: (p.created_at, p.id), reverse=True)]
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor, total = list_user_projects(db, user.id, limit=4, cursor=cursor)
+        assert total is None
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_listing_skips_other_users_and_deleted_projects(db, user):
+    other = User(mail="other@example.com", password="not-a-real-hash")
+    db.add(other)
+    db.commit()
+    mine = add_projects(db, user, [START, START + timedelta(minutes=1)])
+    add_projects(db, other, [START + timedelta(minutes=2)])
+    mine[1].deleted_at = START + timedelta(hours=1)
+    db.commit()
+
+    rows, next_cursor, total = list_user_projects(db, user.id, limit=10, include_total=True)
+    assert [row.id for row in rows] == [mine[0].id]
+    assert (next_cursor, total) == (None, 1)
+
+
+class RecordingSession(Session):
+    """Captures the search query instead of running it; word_similarity and `<%` need pg_trgm."""
+
+    def __init__(self, rows=()):
+        super().__init__()
+        self.rows = list(rows)
+        self.statements = []
+
+    def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return SimpleNamespace(_attributes={}, all=lambda: self.rows)
+
+    def sql(self) -> str:
+        return str(self.statements[-1].compile(dialect=postgresql.dialect()))
+
+    def params(self) -> dict:
+        return self.statements[-1].compile(dialect=postgresql.dialect()).params
+
+
+def test_like_wildcards_in_the_query_are_matched_literally():
+    assert _escape_like(r"100%_off\sale") == r"100\%\_off\\sale"
+
+
+def test_search_ranks_prefix_matches_before_fuzzy_ones():
+    session = RecordingSession()
+    search_user_projects(session, 1, "  50%  ", limit=5)
+
+    sql, params = session.sql(), session.params()
+    assert "projects.project_name ILIKE %(project_name_1)s ESCAPE" in sql and params["project_name_1"] == "50\\%%"
+    # `<%` is doubled by the pyformat paramstyle
+    assert "%(param_2)s <%% projects.project_name" in sql and params["param_2"] == "50%"
+    order_by = sql[sql.index("ORDER BY"):]
+    assert order_by.index("ILIKE") < order_by.index("word_similarity(") < order_by.index("created_at DESC")
+
+
+def test_short_queries_only_match_prefixes():
+    session = RecordingSession()
+    search_user_projects(session, 1, "ab", limit=5)
+    assert "<%%" not in session.sql()
+
+
+def test_search_returns_the_next_offset_until_the_last_page():
+    assert search_user_projects(RecordingSession(range(6)), 1, "bakery", limit=5, offset=10) == (list(range(5)), 15)
+    assert search_user_projects(RecordingSession(range(5)), 1, "bakery", limit=5, offset=10) == (list(range(5)), None)
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.entities.project_entities import Project
+from app.entities.sitemap_entities import Sitemap
+from app.entities.website_entities import Website, WebsiteSection
+from app.services import project_purge
+from app.services.project_purge import ProjectPurgeWorker
+
+DELETED_AT = datetime(2026, 3, 1, 9, 30)
+
+
+def worker(batch_size=2) -> ProjectPurgeWorker:
+    return ProjectPurgeWorker(enabled=True, interval_seconds=60, grace_seconds=3600, projects_per_run=10,
+                              batch_size=batch_size, batch_pause_seconds=0)
+
+
+def add_project(db, user, deleted_at=DELETED_AT, sitemaps=5, sections=5) -> Project:
+    project = Project(project_name="Bakery", created_by=user.id, deleted_at=deleted_at)
+    db.add(project)
+    db.commit()
+    for version in range(1, sitemaps + 1):
+        db.add(Sitemap(project_id=project.id, version_number=version, storage_kind="snapshot",
+                       sitemap_data={"Pages": []}, is_active=version == sitemaps))
+    db.commit()
+    website = Website(project_id=project.id, sitemap_id=project.active_sitemap.id, sitemap_structure={"Pages": []})
+    website.sections = [WebsiteSection(page_id="1", section_id=str(index), fingerprint="f", html_code="<section></section>")
+                        for index in range(sections)]
+    db.add(website)
+    db.commit()
+    return project
+
+
+def row_counts(db, project_id) -> dict:
+    website_ids = [website.id for website in db.query(Website.id).filter(Website.project_id == project_id)]
+    return {
+        "website_section": db.query(WebsiteSection).filter(WebsiteSection.website_id.in_(website_ids)).count(),
+        "website": len(website_ids),
+        "sitemap": db.query(Sitemap).filter(Sitemap.project_id == project_id).count(),
+        "projects": db.query(Project).filter(Project.id == project_id).count(),
+    }
+
+
+def test_tombstone_is_purged_children_first_in_committed_batches(db, user, monkeypatch):
+    tombstone_id = add_project(db, user).id
+    live_id = add_project(db, user, deleted_at=None).id
+    purge = worker(batch_size=2)
+
+    batches = []
+    delete_rows = ProjectPurgeWorker._delete_rows
+
+    def recording_delete_rows(db, model, conditions, limit=None):
+        deleted = delete_rows(db, model, conditions, limit)
+        batches.append((model.__tablename__, deleted))
+        return deleted
+
+    monkeypatch.setattr(ProjectPurgeWorker, "_delete_rows", staticmethod(recording_delete_rows))
+    purge._purge_project(db, tombstone_id)
+
+    assert batches == [
+        ("website_section", 2), ("website_section", 2), ("website_section", 1),
+        ("website", 1),
+        ("sitemap", 2), ("sitemap", 2), ("sitemap", 1),
+        ("projects", 1),
+    ]
+    assert row_counts(db, tombstone_id) == {"website_section": 0, "website": 0, "sitemap": 0, "projects": 0}
+    assert row_counts(db, live_id) == {"website_section": 5, "website": 1, "sitemap": 5, "projects": 1}
+
+
+def test_purge_ends_with_an_empty_batch_when_a_table_fills_batches_exactly(db, user):
+    tombstone_id = add_project(db, user, sitemaps=4, sections=4).id
+    worker(batch_size=2)._purge_project(db, tombstone_id)
+    assert row_counts(db, tombstone_id) == {"website_section": 0, "website": 0, "sitemap": 0, "projects": 0}
+
+
+def test_project_row_stays_if_its_tombstone_is_cleared(db, user):
+    project = add_project(db, user, deleted_at=None, sitemaps=1, sections=0)
+    ProjectPurgeWorker._delete_rows(db, Project, [Project.id == project.id, Project.deleted_at.is_not(None)])
+    assert db.query(Project).filter(Project.id == project.id).count() == 1
+
+
+def test_only_tombstones_past_the_grace_period_are_selected_oldest_first():
+    statement = worker().expired_tombstones().compile(dialect=postgresql.dialect())
+    sql = str(statement)
+
+    assert "projects.deleted_at IS NOT NULL AND projects.deleted_at < now() - %(now_1)s" in sql
+    assert statement.params["now_1"] == timedelta(hours=1)
+    assert sql.endswith("ORDER BY projects.deleted_at \n LIMIT %(param_1)s") and statement.params["param_1"] == 10
+
+
+def test_purge_once_purges_every_selected_tombstone(db, user, monkeypatch):
+    tombstone_ids = [add_project(db, user).id for _ in range(2)]
+    live_id = add_project(db, user, deleted_at=None).id
+    purge = worker()
+    monkeypatch.setattr(project_purge, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    # SQLite cannot evaluate `now() - interval`; the grace cutoff is covered by the compiled-SQL test above
+    monkeypatch.setattr(purge, "expired_tombstones", lambda: select(Project.id).where(Project.deleted_at.is_not(None)))
+
+    assert purge.purge_once() == 2
+    assert all(row_counts(db, project_id)["projects"] == 0 for project_id in tombstone_ids)
+    assert row_counts(db, live_id)["projects"] == 1
+    assert purge.purge_once() == 0
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.fake_llm_provider import FakeProviderError
+from app.services.rate_limiter import (AdaptiveConcurrencyLimiter, ProviderLimiter, TokenBucket, estimate_tokens,
+                                       is_rate_limit_error)
+
+
+def limiter(initial_limit=4, min_limit=1, max_limit=8) -> AdaptiveConcurrencyLimiter:
+    return AdaptiveConcurrencyLimiter(initial_limit=initial_limit, min_limit=min_limit, max_limit=max_limit)
+
+
+async def complete_call(concurrency: AdaptiveConcurrencyLimiter, latency=0.1, rate_limited=False) -> None:
+    await concurrency.acquire()
+    await concurrency.release(None if rate_limited else latency, rate_limited)
+
+
+def test_successes_grow_the_limit_by_about_one_per_window():
+    concurrency = limiter(initial_limit=4)
+
+    async def run():
+        for _ in range(4):
+            await complete_call(concurrency)
+
+    asyncio.run(run())
+    assert concurrency.limit == pytest.approx(5.0, abs=0.1)
+    assert concurrency.in_flight == 0
+
+
+def test_limit_never_grows_past_the_maximum():
+    concurrency = limiter(initial_limit=8, max_limit=8)
+    asyncio.run(complete_call(concurrency))
+    assert concurrency.limit == 8
+
+
+def test_rate_limits_halve_the_limit_down_to_the_minimum():
+    concurrency = limiter(initial_limit=8, min_limit=2)
+
+    async def run():
+        limits = []
+        for _ in range(4):
+            await complete_call(concurrency, rate_limited=True)
+            limits.append(concurrency.limit)
+        return limits
+
+    assert asyncio.run(run()) == [4, 2, 2, 2]
+
+
+def test_latency_spikes_shrink_the_limit():
+    concurrency = limiter(initial_limit=8)
+
+    async def run():
+        for _ in range(5):
+            await complete_call(concurrency, latency=0.1)
+        grown = concurrency.limit
+        await complete_call(concurrency, latency=concurrency.latency_spike_factor * 0.1 * 2)
+        return grown
+
+    grown = asyncio.run(run())
+    assert concurrency.limit == pytest.approx(grown * concurrency.decrease_factor)
+
+
+def test_acquire_waits_while_the_limit_is_in_use():
+    concurrency = limiter(initial_limit=1, max_limit=1)
+
+    async def run():
+        await concurrency.acquire()
+        waiter = asyncio.ensure_future(concurrency.acquire())
+        await asyncio.sleep(0.05)
+        blocked = not waiter.done()
+        await concurrency.release(0.1, False)
+        await asyncio.wait_for(waiter, timeout=1)
+        return blocked
+
+    assert asyncio.run(run()) is True
+    assert concurrency.in_flight == 1
+
+
+def test_token_bucket_waits_for_refill_and_settles_overruns():
+    bucket = TokenBucket(rate_per_minute=600, capacity=10)  # 10 units per second
+
+    async def run():
+        await bucket.acquire(10)
+        started = time.monotonic()
+        await bucket.acquire(2)
+        return time.monotonic() - started
+
+    assert 0.15 <= asyncio.run(run()) < 1.0
+    # an underestimate pushes the balance negative and delays later callers
+    bucket.adjust(5)
+    assert bucket._tokens < 0
+
+
+def test_slot_reports_rate_limit_errors_and_settles_tokens():
+    provider = ProviderLimiter("fake", requests_per_minute=6000, tokens_per_minute=60000, min_concurrency=1, max_concurrency=4)
+
+    async def run():
+        async with provider.slot(100) as call:
+            call.actual_tokens = 400
+        with pytest.raises(FakeProviderError):
+            async with provider.slot(100):
+                raise FakeProviderError("Simulated rate limit", status_code=429)
+
+    asyncio.run(run())
+    # already at its maximum of 4, so the success leaves it there and the 429 halves it
+    assert provider.concurrency.limit == 2
+    # 100 + 100 estimated, plus the 300 the first call used beyond its estimate
+    assert provider.tokens._tokens == pytest.approx(60000 - 500, abs=100)
+    assert provider.concurrency.in_flight == 0
+
+
+def test_rate_limit_errors_are_recognised():
+    assert is_rate_limit_error(FakeProviderError("slow down", status_code=429))
+    assert not is_rate_limit_error(FakeProviderError("boom", status_code=503))
+    assert estimate_tokens("a" * 40, None, "b" * 8) == 12
@@ -0,0 +1,46 @@
+import asyncio
+
+from app.services.section_cache import SectionHtmlCache, make_cache_key
+
+
+def test_cache_key_is_stable():
+    assert make_cache_key("system", "user", "gemini-2.0-flash") == make_cache_key("system", "user", "gemini-2.0-flash")
+
+
+def test_cache_key_depends_on_every_part():
+    base = make_cache_key("system", "user", "model")
+    assert make_cache_key("system!", "user", "model") != base
+    assert make_cache_key("system", "user!", "model") != base
+    assert make_cache_key("system", "user", "model-2") != base
+
+
+def test_cache_key_parts_do_not_run_together():
+    assert make_cache_key("ab", "c", "m") != make_cache_key("a", "bc", "m")
+    assert make_cache_key("", "abc", "m") != make_cache_key("abc", "", "m")
+
+
+def test_cache_key_handles_unicode():
+    assert make_cache_key("système", "café ☕", "m") != make_cache_key("systeme", "cafe", "m")
+
+
+def test_memory_tier_round_trip():
+    cache = SectionHtmlCache(max_entries=4, ttl_seconds=60, persist=False)
+    key = make_cache_key("system", "user", "model")
+
+    async def scenario():
+        assert await cache.get(key) is None
+        await cache.set(key, "<section>hi</section>", "model")
+        return await cache.get(key)
+
+    assert asyncio.run(scenario()) == "<section>hi</section>"
+
+
+def test_memory_tier_is_bounded():
+    cache = SectionHtmlCache(max_entries=2, ttl_seconds=60, persist=False)
+
+    async def scenario():
+        for index in range(3):
+            await cache.set(f"key-{index}", f"html-{index}", "model")
+        return [await cache.get(f"key-{index}") for index in range(3)]
+
+    assert asyncio.run(scenario()) == [None, "html-1", "html-2"]
@@ -0,0 +1,70 @@
+import asyncio
+
+from app.models.website_models import PageData, SectionData
+from app.services.website_service import (build_generation_units, dedupe_shared_sections,
+                                          retarget_section_html, shared_section_key)
+
+
+def section(section_id, title, description="", is_global=False) -> SectionData:
+    return SectionData(id=section_id, title=title, description=description, isGlobal=is_global)
+
+
+def page(page_id, *sections) -> PageData:
+    return PageData(id=page_id, label=f"Page {page_id}", sections=list(sections))
+
+
+def test_navbar_and_footer_are_global_whatever_their_description():
+    assert shared_section_key(section(1, "Navbar", "links A")) == shared_section_key(section(2, " navbar ", "links B"))
+    assert shared_section_key(section(1, "Footer")) == ("global", "footer")
+
+
+def test_is_global_flag_marks_any_section_shared():
+    assert shared_section_key(section(1, "Newsletter", "x", is_global=True)) == ("global", "newsletter")
+    assert shared_section_key(section(2, "Newsletter", "x"))[0] == "same"
+
+
+def test_other_sections_match_on_name_and_normalised_description():
+    same = shared_section_key(section(1, "CTA Section", "Sign  up today"))
+    assert same == shared_section_key(section(2, "cta section", "sign up   TODAY"))
+    assert same != shared_section_key(section(3, "CTA Section", "Book a demo"))
+
+
+def test_dedupe_keeps_one_representative_per_group_across_pages():
+    home = page("1", section("nav", "Navbar"), section("hero", "Hero Header Section", "Welcome"), section("foot", "Footer"))
+    about = page("2", section("nav", "Navbar"), section("story", "About Section", "Our story"), section("foot", "Footer"))
+    contact = page("3", section("nav2", "Navbar"), section("foot", "Footer"))
+    to_generate = [(p, s) for p in (home, about, contact) for s in p.sections]
+
+    unique, copies = dedupe_shared_sections(to_generate)
+
+    assert [(p.id, str(s.id)) for p, s in unique] == [("1", "nav"), ("1", "hero"), ("1", "foot"), ("2", "story")]
+    assert copies == {("1", "nav"): [("2", "nav"), ("3", "nav2")], ("1", "foot"): [("2", "foot"), ("3", "foot")]}
+
+
+def test_equivalent_sections_on_the_same_page_are_not_merged():
+    home = page("1", section("a", "Feature Section", "Same"), section("b", "Feature Section", "Same"))
+    unique, copies = dedupe_shared_sections([(home, s) for s in home.sections])
+    assert len(unique) == 2 and copies == {}
+
+
+def test_retarget_rewrites_only_the_section_id():
+    html = '<section id="section-1-nav" class="x"><a href="#section-1-nav">top</a></section>'
+    assert retarget_section_html(html, ("1", "nav"), ("3", "nav2")) == \
+        '<section id="section-3-nav2" class="x"><a href="#section-1-nav">top</a></section>'
+
+
+def test_generation_units_return_shared_html_for_every_page():
+    pages = [page(page_id, section("nav", "Navbar"), section(f"body{page_id}", "Feature Section", f"Page {page_id} body")) for page_id in ("1", "2", "3")]
+    to_generate = [(p, s) for p in pages for s in p.sections]
+
+    units = build_generation_units(to_generate, {"business_name": "Acme"})
+
+    async def run():
+        return await asyncio.gather(*units)
+
+    results = [result for unit in asyncio.run(run()) for result in unit]
+    assert len(units) == 4
+    assert sorted((page_id, section_id) for page_id, section_id, _ in results) == sorted((p.id, str(s.id)) for p, s in to_generate)
+    for page_id, section_id, html_content in results:
+        if section_id == "nav":
+            assert f'id="section-{page_id}-nav"' in html_content
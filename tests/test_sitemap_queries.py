@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.core.db_setup import get_db
+from app.main import app
+from app.services.auth_service import get_current_user
+from app.services.sitemap_queries import find_projects_with_section, page_counts, section_usage
+
+ACTIVE_LIVE_OWNED = "sitemap.is_active = true AND projects.created_by = %(created_by_1)s AND projects.deleted_at IS NULL"
+
+
+class RecordingSession:
+    """Captures the executed statement; the JSONB operators only exist in PostgreSQL, so it is compiled, not run."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statement = None
+
+    def execute(self, statement):
+        self.statement = statement
+        return SimpleNamespace(all=lambda: self.rows)
+
+    def compiled(self):
+        return self.statement.compile(dialect=postgresql.dialect())
+
+
+def test_projects_with_section_use_jsonb_containment_on_live_active_sitemaps():
+    session = RecordingSession()
+    find_projects_with_section(session, 7, "Hero", limit=20)
+    statement = session.compiled()
+    sql = str(statement)
+
+    assert ACTIVE_LIVE_OWNED in sql
+    assert "sitemap.sitemap_data @> %(param_1)s::JSONB" in sql
+    assert statement.params["param_1"] == {"Pages": [{"sections": [{"sectionName": "Hero"}]}]}
+    assert statement.params["created_by_1"] == 7 and statement.params["param_2"] == 20
+
+
+def test_section_usage_counts_names_from_the_sitemap_json():
+    session = RecordingSession()
+    section_usage(session, 7)
+    statement = session.compiled()
+    sql = str(statement)
+
+    assert "jsonb_path_query(sitemap.sitemap_data, CAST(%(param_1)s AS JSONPATH)) AS name" in sql
+    assert statement.params["param_1"] == "$.Pages[*].sections[*].sectionName"
+    assert ACTIVE_LIVE_OWNED in sql
+    # unquoted JSON string values are grouped, most used first
+    assert "GROUP BY anon_1.name #>> '{}' ORDER BY count(*) DESC, anon_1.name #>> '{}'" in sql
+
+
+def test_page_counts_filter_on_the_page_count_only_when_bounds_are_given():
+    session = RecordingSession()
+    page_counts(session, 7, min_pages=2, max_pages=5)
+    statement = session.compiled()
+    sql = str(statement)
+    page_count = "jsonb_array_length(jsonb_path_query_array(sitemap.sitemap_data, CAST(%(param_1)s AS JSONPATH)))"
+
+    assert statement.params["param_1"] == "$.Pages[*]" and statement.params["param_2"] == "$.Pages[*].sections[*]"
+    assert f"{page_count} >= %(jsonb_array_length_1)s AND {page_count} <= %(jsonb_array_length_2)s" in sql
+    assert statement.params["jsonb_array_length_1"] == 2 and statement.params["jsonb_array_length_2"] == 5
+
+    page_counts(session, 7, min_pages=0)
+    sql = str(session.compiled())
+    assert ">= %(jsonb_array_length_1)s" in sql and "<=" not in sql
+
+    page_counts(session, 7)
+    assert "jsonb_array_length_1" not in str(session.compiled())
+
+
+def test_analytics_route_returns_rows_for_the_current_user(user):
+    row = SimpleNamespace(_asdict=lambda: {"project_id": 1, "project_name": "Bakery", "sitemap_id": 3})
+    session = RecordingSession([row])
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        response = TestClient(app).get("/sitemap/analytics/projects-with-section", params={"section_name": "Hero"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {"section_name": "Hero", "data": [{"project_id": 1, "project_name": "Bakery", "sitemap_id": 3}]}
+    assert session.compiled().params["created_by_1"] == user.id
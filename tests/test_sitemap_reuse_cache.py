@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from app.models.sitemap_models import SitemapGenerator
+from app.routes import sitemap as sitemap_routes
+from app.services.llm_providers import LLMResult
+from app.services.sitemap_reuse_cache import MinHasher, SimilarityReuseCache, normalize_text, shingles
+
+DESCRIPTION = ("We are a family-run bakery in Lyon baking sourdough bread, croissants and seasonal "
+               "fruit tarts every morning, with a small cafe corner and catering for weddings and events.")
+
+
+def request(name="Maison Dupont", description=DESCRIPTION, page=4, language="en", prompt=None) -> SitemapGenerator:
+    return SitemapGenerator(businessName=name, businessDescription=description, page=page, language=language, prompt=prompt)
+
+
+def estimated_similarity(left: SitemapGenerator, right: SitemapGenerator) -> float:
+    hasher = MinHasher()
+    return MinHasher.similarity(
+        hasher.signature(shingles(SimilarityReuseCache.business_text(left))),
+        hasher.signature(shingles(SimilarityReuseCache.business_text(right))),
+    )
+
+
+def test_normalize_text_ignores_case_punctuation_and_spacing():
+    assert normalize_text("  Hello,   WORLD!! ") == normalize_text("hello world") == "hello world"
+    assert normalize_text(None) == ""
+
+
+def test_minhash_estimates_jaccard_similarity():
+    left = shingles(normalize_text(DESCRIPTION))
+    right = shingles(normalize_text(DESCRIPTION.replace("Lyon", "Paris").replace("weddings", "birthdays")))
+    jaccard = len(left & right) / len(left | right)
+    hasher = MinHasher()
+    assert abs(MinHasher.similarity(hasher.signature(left), hasher.signature(right)) - jaccard) < 0.15
+    assert MinHasher.similarity(hasher.signature(left), hasher.signature(left)) == 1.0
+
+
+def test_cosmetic_differences_are_a_hit():
+    cache = SimilarityReuseCache(threshold=1.0, max_entries=16, ttl_seconds=60)
+    cache.set("sitemap", request(), {"Pages": [1]})
+    assert cache.get("sitemap", request(name="MAISON  DUPONT!", description=DESCRIPTION.upper())) == {"Pages": [1]}
+
+
+def test_threshold_is_the_boundary_between_hit_and_miss():
+    stored = request()
+    similar = request(description=DESCRIPTION.replace("sourdough bread", "rye bread"))
+    similarity = estimated_similarity(stored, similar)
+    assert 0.5 < similarity < 1.0
+
+    at_threshold = SimilarityReuseCache(threshold=similarity, max_entries=16, ttl_seconds=60)
+    at_threshold.set("brief", stored, "brief")
+    assert at_threshold.get("brief", similar) == "brief"
+
+    above_threshold = SimilarityReuseCache(threshold=similarity + 0.01, max_entries=16, ttl_seconds=60)
+    above_threshold.set("brief", stored, "brief")
+    assert above_threshold.get("brief", similar) is None
+
+
+def test_unrelated_business_is_a_miss():
+    cache = SimilarityReuseCache(threshold=0.85, max_entries=16, ttl_seconds=60)
+    cache.set("brief", request(), "brief")
+    assert cache.get("brief", request(name="Apex Legal", description="Corporate law firm advising startups on funding rounds.")) is None
+
+
+def test_sitemaps_must_share_page_count_language_and_prompt_but_briefs_need_not():
+    cache = SimilarityReuseCache(threshold=0.85, max_entries=16, ttl_seconds=60)
+    cache.set("brief", request(), "brief")
+    cache.set("sitemap", request(), "sitemap")
+
+    for other in (request(page=5), request(language="fr"), request(prompt="Add a blog")):
+        assert cache.get("brief", other) == "brief"
+        assert cache.get("sitemap", other) is None
+
+
+def test_hits_are_copies():
+    cache = SimilarityReuseCache(threshold=0.85, max_entries=16, ttl_seconds=60)
+    cache.set("sitemap", request(), {"Pages": [{"pageName": "Home"}]})
+    cache.get("sitemap", request())["Pages"].clear()
+    assert cache.get("sitemap", request()) == {"Pages": [{"pageName": "Home"}]}
+
+
+def test_entries_expire():
+    cache = SimilarityReuseCache(threshold=0.85, max_entries=16, ttl_seconds=0.05)
+    cache.set("brief", request(), "brief")
+    time.sleep(0.1)
+    assert cache.get("brief", request()) is None
+
+
+def test_only_unrepaired_sitemaps_are_cached_for_reuse(monkeypatch):
+    cache = SimilarityReuseCache(threshold=0.85, max_entries=16, ttl_seconds=60)
+    monkeypatch.setattr(sitemap_routes, "sitemap_reuse_cache", cache)
+    monkeypatch.setattr("app.core.settings.settings.SITEMAP_REUSE_ENABLED", True)
+
+    async def truncated(*args, **kwargs):
+        return LLMResult(text='{"Pages": [{"pageName": "Home"}, {"pageName": "Ab', provider="fake", model="fake-model")
+
+    monkeypatch.setattr(sitemap_routes.llm_router, "complete", truncated)
+    assert asyncio.run(sitemap_routes.resolve_sitemap(request(), "prompt"))["Pages"][0] == {"pageName": "Home"}
+    assert cache.get("sitemap", request()) is None
+
+    async def complete(*args, **kwargs):
+        return LLMResult(text='{"Pages": [{"pageName": "Home"}]}', provider="fake", model="fake-model")
+
+    monkeypatch.setattr(sitemap_routes.llm_router, "complete", complete)
+    asyncio.run(sitemap_routes.resolve_sitemap(request(), "prompt"))
+    assert cache.get("sitemap", request()) == {"Pages": [{"pageName": "Home"}]}
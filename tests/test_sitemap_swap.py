@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.entities.project_entities import Project
+from app.entities.sitemap_entities import Sitemap
+from app.services.sitemap_versions import SNAPSHOT, SitemapSwapConflict, get_swap_base, swap_active_sitemap
+
+SITEMAP = {"Pages": [{"pageName": "Home", "sections": [{"sectionName": "Hero"}]}]}
+
+
+class RecordingSession:
+    """Captures the swap statement instead of running it; SQLite cannot execute DML inside a CTE."""
+
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(first=lambda: self.row)
+
+    def sql(self) -> str:
+        return str(self.statements[-1].compile(dialect=postgresql.dialect()))
+
+    def params(self) -> dict:
+        return self.statements[-1].compile(dialect=postgresql.dialect()).params
+
+
+def swap_base(sitemap_id=7, version_number=3, project_name="Bakery"):
+    return SimpleNamespace(created_by=1, project_name=project_name, sitemap_id=sitemap_id,
+                           version_number=version_number, storage_kind=SNAPSHOT, sitemap_data=SITEMAP)
+
+
+def test_swap_base_reads_owner_and_active_version(db, user):
+    project = Project(project_name="Bakery", created_by=user.id)
+    db.add(project)
+    db.commit()
+
+    base = get_swap_base(db, project.id)
+    assert (base.created_by, base.project_name, base.sitemap_id) == (user.id, "Bakery", None)
+
+    db.add(Sitemap(project_id=project.id, version_number=1, storage_kind=SNAPSHOT, sitemap_data=SITEMAP, is_active=False))
+    db.add(Sitemap(project_id=project.id, version_number=2, storage_kind=SNAPSHOT, sitemap_data=SITEMAP, is_active=True))
+    db.commit()
+    base = get_swap_base(db, project.id)
+    assert (base.version_number, base.sitemap_data) == (2, SITEMAP)
+    assert get_swap_base(db, project.id + 1) is None
+
+
+def test_first_version_is_inserted_and_a_racing_first_save_conflicts(db, user):
+    project = Project(project_name="Bakery", created_by=user.id)
+    db.add(project)
+    db.commit()
+    stale_base = get_swap_base(db, project.id)
+
+    new_version = swap_active_sitemap(db, project.id, stale_base, SITEMAP, user.id, no_of_pages=1)
+    db.commit()
+    assert new_version.version_number == 1
+    stored = db.get(Sitemap, new_version.id)
+    assert (stored.is_active, stored.storage_kind, stored.no_of_pages, stored.sitemap_data) == (True, SNAPSHOT, 1, SITEMAP)
+
+    # A second save that also saw no active version hits the partial unique index
+    with pytest.raises(SitemapSwapConflict):
+        swap_active_sitemap(db, project.id, stale_base, SITEMAP, user.id)
+
+
+def test_swap_deactivates_the_base_version_and_inserts_in_one_statement():
+    session = RecordingSession(SimpleNamespace(id=8, version_number=4))
+    assert swap_active_sitemap(session, 1, swap_base(), SITEMAP, 1).id == 8
+
+    sql = session.sql()
+    assert len(session.statements) == 1
+    assert sql.startswith("WITH deactivated AS \n(UPDATE sitemap SET ")
+    deactivate = sql.split("INSERT INTO")[0]
+    assert "is_active=%(param_1)s" in deactivate and session.params()["param_1"] is False
+    # a delta drops its materialized copy when it stops being active
+    assert "sitemap_data=CASE WHEN (sitemap.storage_kind = %(storage_kind_1)s) THEN NULL" in deactivate
+    assert "WHERE sitemap.id = %(id_1)s AND sitemap.is_active = true RETURNING sitemap.id)" in sql
+    assert "INSERT INTO sitemap" in sql and "WHERE EXISTS (SELECT deactivated.id \nFROM deactivated)" in sql
+    assert sql.endswith("RETURNING sitemap.id, sitemap.version_number")
+    assert "renamed" not in sql
+
+
+def test_rename_joins_the_swap_only_when_the_name_changes():
+    session = RecordingSession(SimpleNamespace(id=8, version_number=4))
+    swap_active_sitemap(session, 1, swap_base(), SITEMAP, 1, project_name="Bakery")
+    assert "renamed" not in session.sql()
+
+    swap_active_sitemap(session, 1, swap_base(), SITEMAP, 1, project_name="Corner Bakery")
+    assert "renamed AS \n(UPDATE projects SET project_name=" in session.sql()
+
+
+def test_swap_conflicts_when_the_base_version_was_already_replaced():
+    with pytest.raises(SitemapSwapConflict):
+        swap_active_sitemap(RecordingSession(None), 1, swap_base(), SITEMAP, 1)
@@ -0,0 +1,41 @@
+from app.entities.project_entities import Project
+from app.entities.sitemap_entities import Sitemap
+from app.services.json_patch import make_patch
+from app.services.sitemap_versions import DELTA, SNAPSHOT, choose_storage, load_sitemap_data
+
+
+def sitemap(page_names) -> dict:
+    return {"Pages": [{"pageName": name, "sections": [{"sectionName": "Navbar"}, {"sectionName": "Footer"}]} for name in page_names]}
+
+
+def test_first_version_and_interval_versions_are_snapshots(monkeypatch):
+    monkeypatch.setattr("app.core.settings.settings.SITEMAP_SNAPSHOT_INTERVAL", 3)
+    previous, current = sitemap(["Home", "About"] * 10), sitemap(["Home", "About"] * 10 + ["Blog"])
+
+    assert choose_storage(1, None, current) == (SNAPSHOT, None)
+    assert choose_storage(4, previous, current) == (SNAPSHOT, None)
+    kind, patch = choose_storage(5, previous, current)
+    assert kind == DELTA and patch == make_patch(previous, current)
+
+
+def test_large_changes_are_stored_as_snapshots():
+    assert choose_storage(2, sitemap(["Home"]), {"Pages": []})[0] == SNAPSHOT
+
+
+def test_dematerialized_versions_are_rebuilt_from_the_nearest_snapshot(db, user):
+    project = Project(project_name="Bakery", created_by=user.id)
+    db.add(project)
+    db.commit()
+
+    documents = [sitemap(["Home"] * 8 + [f"Page {index}"]) for index in range(4)]
+    db.add(Sitemap(project_id=project.id, version_number=1, storage_kind=SNAPSHOT, sitemap_data=documents[0], is_active=False))
+    for version in (2, 3):
+        db.add(Sitemap(project_id=project.id, version_number=version, storage_kind=DELTA, sitemap_data=None,
+                       sitemap_patch=make_patch(documents[version - 2], documents[version - 1]), is_active=False))
+    # The active version is a delta too, but stays materialized
+    db.add(Sitemap(project_id=project.id, version_number=4, storage_kind=DELTA, sitemap_data=documents[3],
+                   sitemap_patch=make_patch(documents[2], documents[3]), is_active=True))
+    db.commit()
+
+    versions = db.query(Sitemap).filter(Sitemap.project_id == project.id).order_by(Sitemap.version_number).all()
+    assert [load_sitemap_data(db, version) for version in versions] == documents
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.website_models import PageData, SectionData, SitemapStructure
+from app.routes import website_routes
+from app.services.tailwind_css import compile_class, compile_stylesheet, extract_classes
+from app.services.website_service import (SITE_STYLES_PLACEHOLDER, TAILWIND_CDN_SCRIPT, _inline_styles,
+                                          build_site_styles)
+
+
+def rule(class_name: str) -> str:
+    return compile_class(class_name)[2]
+
+
+def test_extract_classes_reads_class_and_classname_attributes():
+    html = """<div class="p-4  md:p-8"><span className='text-sm'>x</span><p id="class">y</p></div>"""
+    assert extract_classes(html) == {"p-4", "md:p-8", "text-sm"}
+
+
+@pytest.mark.parametrize("class_name, expected", [
+    ("hover:bg-blue-600", ".hover\\:bg-blue-600:hover{background-color: #2563eb}"),
+    ("focus:ring-2", ".focus\\:ring-2:focus{box-shadow: 0 0 0 2px var(--tw-ring-color)}"),
+    ("group-hover:text-white", ".group:hover .group-hover\\:text-white{color: #ffffff}"),
+    ("dark:bg-gray-900", "@media (prefers-color-scheme: dark){.dark\\:bg-gray-900{background-color: #111827}}"),
+    ("!mt-0", ".\\!mt-0{margin-top: 0px !important}"),
+    ("-mt-4", ".-mt-4{margin-top: calc(1rem * -1)}"),
+    ("-z-10", ".-z-10{z-index: -10}"),
+    ("placeholder:text-gray-400", ".placeholder\\:text-gray-400::placeholder{color: #9ca3af}"),
+    ("space-y-4", ".space-y-4 > :not([hidden]) ~ :not([hidden]){margin-top: 1rem}"),
+    ("divide-y", ".divide-y > :not([hidden]) ~ :not([hidden]){border-top-width: 1px}"),
+    ("divide-gray-200", ".divide-gray-200 > :not([hidden]) ~ :not([hidden]){border-color: #e5e7eb}"),
+    ("placeholder-gray-400", ".placeholder-gray-400::placeholder{color: #9ca3af}"),
+    ("backdrop-blur-sm", ".backdrop-blur-sm{-webkit-backdrop-filter: blur(4px);backdrop-filter: blur(4px)}"),
+    ("bg-black/50", ".bg-black\\/50{background-color: rgb(0 0 0 / 0.5)}"),
+    ("w-1/2", ".w-1\\/2{width: 50%}"),
+])
+def test_variants_and_utilities(class_name, expected):
+    assert rule(class_name) == expected
+
+
+def test_line_clamp():
+    assert "-webkit-line-clamp: 3" in rule("line-clamp-3") and "display: -webkit-box" in rule("line-clamp-3")
+
+
+@pytest.mark.parametrize("class_name, expected", [
+    ("w-[37px]", ".w-\\[37px\\]{width: 37px}"),
+    ("bg-[#0a0a0a]", ".bg-\\[\\#0a0a0a\\]{background-color: #0a0a0a}"),
+    ("text-[22px]", ".text-\\[22px\\]{font-size: 22px}"),
+    ("grid-cols-[1fr_2fr]", None),
+    ("md:bg-[url(/img/a:b.png)]", ".md\\:bg-\\[url\\(\\/img\\/a\\:b\\.png\\)\\]{background-image: url(/img/a:b.png)}"),
+])
+def test_arbitrary_values(class_name, expected):
+    compiled = compile_class(class_name)
+    assert (compiled[2] if compiled else None) == expected
+
+
+def test_breakpoints_become_ordered_media_queries():
+    css, unsupported = compile_stylesheet(["lg:p-8", "p-2", "sm:p-4", "md:p-6", "container"])
+    assert unsupported == []
+    positions = [css.index(f"@media (min-width: {width})") for width in ("640px", "768px", "1024px")]
+    assert css.index(".p-2{") < positions[0] < positions[1] < positions[2]
+    sm_block = css[positions[0]:positions[1]]
+    # the container's max-width opens each breakpoint, before the utilities that may override it
+    assert sm_block.index(".container{max-width:640px}") < sm_block.index(".sm\\:p-4{")
+
+
+def test_shorthands_come_before_sides_so_later_utilities_win():
+    css, _ = compile_stylesheet(["pt-0", "p-4", "px-2", "hover:p-6"])
+    assert css.index(".p-4{") < css.index(".px-2{") < css.index(".pt-0{") < css.index(".hover\\:p-6:hover{")
+
+
+def test_unknown_classes_and_variants_are_reported_and_skipped():
+    css, unsupported = compile_stylesheet(["p-4", "group", "fancy-thing", "peer-checked:p-2", "bg-chartreuse-500"])
+    assert unsupported == ["bg-chartreuse-500", "fancy-thing", "peer-checked:p-2"]
+    assert ".p-4{padding: 1rem}" in css and "fancy" not in css
+
+
+def test_site_styles_are_inlined_even_when_some_classes_are_unsupported(monkeypatch, caplog):
+    monkeypatch.setattr("app.core.settings.settings.TAILWIND_MODE", "inline")
+    _inline_styles.cache_clear()
+    with caplog.at_level(logging.WARNING):
+        styles = build_site_styles(['<div class="p-4 fancy-thing">a</div>', '<p class="md:text-lg">b</p>'])
+
+    assert styles.startswith("  <style>") and "cdn.tailwindcss.com" not in styles
+    assert ".p-4{padding: 1rem}" in styles and ".md\\:text-lg{" in styles
+    # body and error-section classes are always included
+    assert ".bg-gray-100{" in styles and ".bg-red-200{" in styles
+    assert "fancy-thing" in caplog.text
+
+
+def test_cdn_mode_ships_the_tailwind_script(monkeypatch):
+    monkeypatch.setattr("app.core.settings.settings.TAILWIND_MODE", "cdn")
+    assert build_site_styles(['<div class="p-4">a</div>']) == TAILWIND_CDN_SCRIPT
+
+
+def test_streamed_pages_share_one_site_stylesheet_sent_at_the_end(monkeypatch):
+    monkeypatch.setattr("app.core.settings.settings.TAILWIND_MODE", "inline")
+    monkeypatch.setattr(website_routes, "persist_website_in_new_session", lambda *args: None)
+    home = PageData(id="1", label="Home", sections=[SectionData(id="hero", title="Hero Header Section", description="Headline")])
+    about = PageData(id="2", label="About", sections=[SectionData(id="team", title="Team Section", description="Founders")])
+    reused_html = {("1", "hero"): '<section class="p-4">hi</section>', ("2", "team"): '<section class="md:p-8">us</section>'}
+
+    async def collect():
+        events = website_routes.stream_website_events(
+            SimpleNamespace(sitemap=SitemapStructure(Pages=[home, about]), batch_by_page=False), 3,
+            [home, about], {"1": ["hero"], "2": ["team"]}, {"business_name": "Acme"}, 7, {}, reused_html, [], 1)
+        return [json.loads(event) async for event in events]
+
+    events = asyncio.run(collect())
+    assert [event["event"] for event in events] == ["section", "page", "section", "page", "styles", "done"]
+    pages = [event["html"] for event in events if event["event"] == "page"]
+    assert all(SITE_STYLES_PLACEHOLDER in html and "<style>" not in html for html in pages)
+    styles = events[4]
+    assert styles["placeholder"] == SITE_STYLES_PLACEHOLDER
+    assert ".p-4{" in styles["html"] and ".md\\:p-8{" in styles["html"]
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from app.models.website_models import JobStatus, PageData, SectionData, SitemapStructure
+from app.services import website_jobs
+from app.services.website_jobs import WebsiteJob, WebsiteJobQueue
+
+
+def make_job() -> WebsiteJob:
+    hero = SectionData(id="hero", title="Hero Header Section", description="Big headline")
+    features = SectionData(id="features", title="Feature Section", description="Three features")
+    page = PageData(id="1", label="Home", sections=[hero, features])
+    return WebsiteJob(
+        user_id=1,
+        project_id=7,
+        sitemap_id=3,
+        sitemap=SitemapStructure(Pages=[page]),
+        pages=[page],
+        page_section_map={"1": ["hero", "features"]},
+        project_context={"business_name": "Acme"},
+        fingerprints={("1", "hero"): "f-hero", ("1", "features"): "f-features"},
+        reused_html={("1", "hero"): '<section id="section-1-hero">kept</section>'},
+        to_generate=[(page, features)],
+    )
+
+
+async def run_to_completion(queue: WebsiteJobQueue, job: WebsiteJob) -> None:
+    await queue.start()
+    try:
+        queue.submit(job)
+        while job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+            await asyncio.sleep(0.01)
+    finally:
+        await queue.stop()
+
+
+def test_submit_requires_a_started_queue():
+    with pytest.raises(RuntimeError):
+        WebsiteJobQueue(worker_count=1, retention_seconds=60).submit(make_job())
+
+
+def test_job_generates_missing_sections_and_persists(monkeypatch):
+    saved = []
+    monkeypatch.setattr(website_jobs, "persist_website_in_new_session", lambda *args: saved.append(args))
+    queue = WebsiteJobQueue(worker_count=2, retention_seconds=60)
+    job = make_job()
+
+    asyncio.run(asyncio.wait_for(run_to_completion(queue, job), timeout=10))
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.section_html_map[("1", "hero")] == '<section id="section-1-hero">kept</section>'
+    assert 'id="section-1-features"' in job.section_html_map[("1", "features")]
+    assert "section-1-hero" in job.page_html_map["1"] and "section-1-features" in job.page_html_map["1"]
+    assert len(saved) == 1 and saved[0][0] == job.project_id
+
+    response = job.to_response(include_html=False)
+    assert (response.total_sections, response.completed_sections, response.failed_sections) == (2, 2, 0)
+    assert response.page_html_map == {} and all(section.html_code is None for section in response.sections)
+    assert queue.get(job.id) is job
+
+
+def test_job_failure_is_reported(monkeypatch):
+    def fail(*args):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(website_jobs, "persist_website_in_new_session", fail)
+    job = make_job()
+
+    asyncio.run(asyncio.wait_for(run_to_completion(WebsiteJobQueue(worker_count=1, retention_seconds=60), job), timeout=10))
+
+    assert job.status == JobStatus.FAILED
+    assert "database unavailable" in job.error
+    assert job.finished_at is not None
+
+
+def test_finished_jobs_are_pruned_after_retention():
+    async def scenario():
+        # No workers: jobs stay queued, only bookkeeping is exercised
+        queue = WebsiteJobQueue(worker_count=0, retention_seconds=0)
+        await queue.start()
+        old = queue.submit(make_job())
+        old.mark_finished(JobStatus.COMPLETED)
+        time.sleep(0.01)
+        new = queue.submit(make_job())
+        return queue.get(old.id), queue.get(new.id)
+
+    old, new = asyncio.run(scenario())
+    assert old is None and new is not None